@@ -0,0 +1,74 @@
+"""Command storm benchmark.
+
+Executes a scripted storm of commands (card insert, state changes, status
+displays) through `SkiLiftController.execute`. Reports the memory held per
+in-flight command (descriptor and result kept alive), measured with
+tracemalloc, the garbage collections triggered per thousand in-flight
+commands and the time per command.
+
+No broker is needed: the producer of the remote communicator is not
+started.
+
+Usage: python -m benchmarks.command_storm [<commands>]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, List
+
+from benchmarks.dispatch import create_controller
+from ski_lift.core.command.descriptor.factory import CommandDescriptorFactory
+from ski_lift.core.command.descriptor.object import (
+    ChangeStateCommandDescriptor, CommandDescriptor)
+from ski_lift.core.command.result.object import CommandResult
+
+STORM: List[Callable[[datetime], CommandDescriptor]] = [
+    lambda now: CommandDescriptorFactory.create_insert_card(card_to_insert='card-1', time=now),
+    lambda now: CommandDescriptorFactory.create_change_state(
+        user_card='card-1', time=now, new_state=ChangeStateCommandDescriptor.Option.HALF_STEAM,
+    ),
+    lambda now: CommandDescriptorFactory.create_display_status(user_card='card-1', time=now),
+    lambda now: CommandDescriptorFactory.create_change_state(
+        user_card='card-1', time=now, new_state=ChangeStateCommandDescriptor.Option.FULL_STEAM,
+    ),
+]
+
+
+def main() -> int:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    controller = create_controller()
+    now: datetime = datetime.now()
+    for create_command in STORM:
+        controller.execute(create_command(now))
+
+    in_flight: List[CommandResult] = []
+    gc.collect()
+    collections: int = gc.get_stats()[0]['collections']
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for index in range(count):
+        in_flight.append(controller.execute(STORM[index % len(STORM)](now)))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    collections = gc.get_stats()[0]['collections'] - collections
+    size: int = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    in_flight.clear()
+
+    start: float = time.perf_counter()
+    for index in range(count):
+        controller.execute(STORM[index % len(STORM)](now))
+    elapsed: float = time.perf_counter() - start
+
+    print(
+        f'{size / count:7.1f} bytes per in-flight command '
+        f'{collections / count * 1000:5.2f} gen0 collections per 1000 in-flight '
+        f'{elapsed / count * 1e6:6.2f} us per command'
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Command dispatch benchmark.
+
+Executes commands through `SkiLiftController.execute`, with a result
+serializer attached as a result monitor, once with the visitor double
+dispatch (`accept`) and once with the dispatch tables of `DispatchRegistry`.
+Reports the Python calls made and the deepest call stack reached per
+command, measured with a profile hook, and the time per command.
+
+No broker is needed: the producer of the remote communicator is not
+started.
+
+Usage: python -m benchmarks.dispatch [<commands>]
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+from unittest import mock
+
+from ski_lift.app.entity import SkiLiftAuthorizer, SkiLiftController
+from ski_lift.core.auth import InMemoryAuthenticator
+from ski_lift.core.command.descriptor.factory import CommandDescriptorFactory
+from ski_lift.core.command.descriptor.object import (
+    ChangeStateCommandDescriptor, CommandDescriptor)
+from ski_lift.core.command.descriptor.processor import DescriptorProcessor
+from ski_lift.core.command.result.object import CommandResult
+from ski_lift.core.command.result.processor import ResultProcessor
+from ski_lift.core.command.result.serializer import PythonDictResultSerializer
+from ski_lift.core.engine import Engine
+from ski_lift.core.monitor.result.delivery import (SYNCHRONOUS_DELIVERY,
+                                                   DeliveryPolicy)
+from ski_lift.core.monitor.result.result_monitor import CommandResultMonitor
+from ski_lift.core.remote import PikaProducer, RabbitMQCommunicator
+from ski_lift.use_cases import create_erlang_c_model
+
+
+class SerializingMonitor(CommandResultMonitor):
+    """Result monitor serializing every result, like the command loggers."""
+
+    def __init__(self):
+        self._serializer = PythonDictResultSerializer()
+
+    def process_result_universally(self, result: CommandResult) -> None:
+        self._serializer.serialize(result)
+
+
+def create_controller(result_delivery: DeliveryPolicy = SYNCHRONOUS_DELIVERY) -> SkiLiftController:
+    authenticator = InMemoryAuthenticator()
+    authenticator.add('card-1')
+    controller = SkiLiftController(
+        lift_id='lift-1',
+        engine=Engine(state='FULL_STEAM'),
+        authorizer=SkiLiftAuthorizer(authenticator=authenticator),
+        remote_communicator=RabbitMQCommunicator(
+            producer=PikaProducer('topic_skilift', 'topic', connection_parameters=None),
+        ),
+        queue_status=create_erlang_c_model(),
+        result_delivery=result_delivery,
+    )
+    controller.register_result_monitor(SerializingMonitor())
+    return controller
+
+
+def create_commands() -> List[CommandDescriptor]:
+    return [
+        CommandDescriptorFactory.create_insert_card(card_to_insert='card-1'),
+        CommandDescriptorFactory.create_change_state(
+            user_card='card-1', new_state=ChangeStateCommandDescriptor.Option.HALF_STEAM,
+        ),
+        CommandDescriptorFactory.create_display_status(user_card='card-1'),
+        CommandDescriptorFactory.create_change_state(
+            user_card='card-1', new_state=ChangeStateCommandDescriptor.Option.FULL_STEAM,
+        ),
+    ]
+
+
+@contextmanager
+def visitor_dispatch() -> Iterator[None]:
+    """Dispatch through `accept`, as before the dispatch tables."""
+    with mock.patch.object(DescriptorProcessor, 'process_descriptor', lambda self, command: command.accept(self)), \
+            mock.patch.object(ResultProcessor, 'process_result', lambda self, result: result.accept(self)):
+        yield
+
+
+def count_calls(execute: Callable[[CommandDescriptor], CommandResult], command: CommandDescriptor):
+    calls: int = 0
+    depth: int = 0
+    max_depth: int = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls, depth, max_depth
+        if event == 'call':
+            calls += 1
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif event == 'return':
+            depth -= 1
+
+    sys.setprofile(profile)
+    try:
+        execute(command)
+    finally:
+        sys.setprofile(None)
+    return calls, max_depth
+
+
+def measure(name: str, count: int) -> None:
+    controller: SkiLiftController = create_controller()
+    commands: List[CommandDescriptor] = create_commands()
+    for command in commands:
+        controller.execute(command)
+    profiles = [count_calls(controller.execute, command) for command in commands]
+    calls: float = sum(calls for calls, _ in profiles) / len(profiles)
+    depth: int = max(depth for _, depth in profiles)
+
+    start: float = time.perf_counter()
+    for index in range(count):
+        controller.execute(commands[index % len(commands)])
+    elapsed: float = time.perf_counter() - start
+
+    print(f'{name:16} {calls:6.1f} calls {depth:3} max depth {elapsed / count * 1e6:6.2f} us per command')
+
+
+def main() -> int:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with visitor_dispatch():
+        measure('visitor', count)
+    measure('dispatch table', count)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Simulated lifts load test.
+
+Starts the in-process fake broker and a number of simulated lifts, each with
+its own connection and producer publishing sensor readings through the
+`RabbitMQObserver`. Optionally drops every connection in the middle of the
+run. Reports the publish throughput, the confirm latencies and the number of
+messages left unconfirmed.
+
+Usage: python -m benchmarks.fake_lifts [<lifts>] [<seconds>] [--disconnect]
+"""
+
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+import pika
+
+from ski_lift.core.remote.rabbitmq import (ConnectionManager, FakeBroker,
+                                           PikaProducer)
+from ski_lift.core.remote.rabbitmq.backoff import ExponentialBackoff
+from ski_lift.core.sensor import RabbitMQObserver
+from ski_lift.core.sensor.factory.base_sensor import SensorReading
+
+SENSOR_TYPES: List[str] = ['sensor.temperature', 'sensor.wind', 'sensor.humidity']
+
+
+def main() -> int:
+    arguments: List[str] = [argument for argument in sys.argv[1:] if not argument.startswith('--')]
+    lifts: int = int(arguments[0]) if len(arguments) > 0 else 100
+    seconds: float = float(arguments[1]) if len(arguments) > 1 else 5
+    disconnect: bool = '--disconnect' in sys.argv
+
+    with FakeBroker() as broker:
+        parameters = pika.ConnectionParameters(host=broker.host, port=broker.port)
+        producers: List[PikaProducer] = [
+            PikaProducer(
+                'topic_skilift',
+                'topic',
+                connection_manager=ConnectionManager(parameters, reconnect_backoff=ExponentialBackoff(0.1, 1)),
+            )
+            for _ in range(lifts)
+        ]
+        observers: List[RabbitMQObserver] = [RabbitMQObserver(producer) for producer in producers]
+        for producer in producers:
+            producer.start()
+
+        published: int = 0
+        start: float = time.monotonic()
+        disconnected: bool = False
+        while time.monotonic() - start < seconds:
+            for lift, observer in enumerate(observers):
+                for sensor_type in SENSOR_TYPES:
+                    observer.update(SensorReading(f'lift-{lift}', sensor_type, 'base', 1.0, datetime.now()))
+                    published += 1
+            if disconnect and not disconnected and time.monotonic() - start > seconds / 2:
+                broker.disconnect_all()
+                disconnected = True
+            time.sleep(0.01)
+        elapsed: float = time.monotonic() - start
+
+        # give the producers time to catch up before stopping them
+        deadline: float = time.monotonic() + 10
+        while time.monotonic() < deadline and broker.stats.published < published:
+            time.sleep(0.1)
+        acked: int = sum(producer.confirm_statistics.acked for producer in producers)
+        max_latency: float = max(producer.confirm_statistics.max_latency for producer in producers)
+        unconfirmed: int = sum(producer.unconfirmed_count for producer in producers)
+        for producer in producers:
+            producer.stop()
+
+    print(f'lifts: {lifts}, messages: {published} in {elapsed:.1f} s ({published / elapsed:.0f}/s)')
+    print(f'broker: {broker.stats}')
+    print(f'acked: {acked}, unconfirmed: {unconfirmed}, max confirm latency: {max_latency * 1000:.1f} ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
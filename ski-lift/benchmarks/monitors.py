@@ -0,0 +1,78 @@
+"""Result monitor fan-out benchmark.
+
+Executes commands through `SkiLiftController.execute` with a slow result
+monitor attached (sleeping for every result, like a slow file write or a
+blocked producer), once delivering the results synchronously and once per
+overflow policy of the asynchronous delivery. Reports the mean and the 99th
+percentile latency of `execute`, the results dropped by the monitor queue
+and the time taken by `close_result_monitors` to deliver the queued results.
+
+No broker is needed: the producer of the remote communicator is not
+started.
+
+Usage: python -m benchmarks.monitors [<commands>] [<monitor delay ms>]
+"""
+
+import sys
+import time
+from typing import List
+
+from benchmarks.dispatch import create_commands, create_controller
+from ski_lift.core.command.descriptor.object import CommandDescriptor
+from ski_lift.core.command.result.object import CommandResult
+from ski_lift.core.monitor.result.delivery import (SYNCHRONOUS_DELIVERY,
+                                                   DeliveryPolicy,
+                                                   OverflowPolicy)
+from ski_lift.core.monitor.result.result_monitor import CommandResultMonitor
+
+
+class SlowMonitor(CommandResultMonitor):
+    """Result monitor taking `delay` seconds for every result."""
+
+    def __init__(self, delay: float):
+        self._delay: float = delay
+        self.received: int = 0
+
+    def process_result_universally(self, result: CommandResult) -> None:
+        time.sleep(self._delay)
+        self.received += 1
+
+
+def measure(name: str, policy: DeliveryPolicy, count: int, delay: float) -> None:
+    controller = create_controller()
+    monitor = SlowMonitor(delay)
+    controller.register_result_monitor(monitor, policy)
+    commands: List[CommandDescriptor] = create_commands()
+
+    latencies: List[float] = []
+    for index in range(count):
+        start: float = time.perf_counter()
+        controller.execute(commands[index % len(commands)])
+        latencies.append(time.perf_counter() - start)
+        # commands arrive a bit faster than the monitor can keep up with
+        time.sleep(delay / 2)
+    start = time.perf_counter()
+    controller.close_result_monitors()
+    flushed: float = time.perf_counter() - start
+
+    latencies.sort()
+    print(
+        f'{name:12} {sum(latencies) / count * 1e6:8.1f} us mean '
+        f'{latencies[int(count * 0.99)] * 1e6:8.1f} us p99 '
+        f'{count - monitor.received:5} dropped {flushed * 1e3:7.1f} ms flush'
+    )
+
+
+def main() -> int:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    delay: float = (float(sys.argv[2]) if len(sys.argv) > 2 else 1) / 1000
+    measure('synchronous', SYNCHRONOUS_DELIVERY, count, delay)
+    measure('block', DeliveryPolicy(max_pending=100, overflow=OverflowPolicy.BLOCK), count, delay)
+    measure('drop oldest', DeliveryPolicy(max_pending=100, overflow=OverflowPolicy.DROP_OLDEST), count, delay)
+    measure('sample', DeliveryPolicy(max_pending=100, overflow=OverflowPolicy.SAMPLE), count, delay)
+    measure('unbounded', DeliveryPolicy(max_pending=count), count, delay)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
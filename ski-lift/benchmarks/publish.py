@@ -0,0 +1,106 @@
+"""Publish hot path benchmark.
+
+Compares publishing sensor readings with `publish_payload` (routing key,
+headers and properties built for every message) and with `RabbitMQObserver`,
+which uses cached `Publisher` handles. Reports the memory blocks allocated
+per message, measured with tracemalloc, and the time per message.
+
+No broker is needed: the producer is not started and the IO loop side
+(`_publish`) is driven directly with a channel that keeps every published
+frame, like the unconfirmed messages are kept until the broker confirms them.
+
+Usage: python -m benchmarks.publish [<messages>]
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, List
+
+from ski_lift.core.remote.rabbitmq import Lane, PikaProducer
+from ski_lift.core.sensor import RabbitMQObserver
+from ski_lift.core.sensor.factory.base_sensor import SensorReading
+
+
+class RecordingChannel(object):
+    """Channel keeping the arguments of every `basic_publish` call."""
+
+    def __init__(self):
+        self.published: List[tuple] = []
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        self.published.append((routing_key, body, properties))
+
+
+def create_producer() -> PikaProducer:
+    producer = PikaProducer('topic_skilift', 'topic', connection_parameters=None)
+    producer._channel = RecordingChannel()
+    return producer
+
+
+def drain(producer: PikaProducer) -> None:
+    while producer._publish_queue:
+        producer._publish(producer._publish_queue.popleft())
+
+
+def payload_publisher(producer: PikaProducer) -> Callable[[SensorReading], None]:
+    def update(reading: SensorReading) -> None:
+        reading_type: str = reading.sensor_type.split('.')[1]
+        producer.publish_payload(
+            routing_key=f'skilift.{reading.lift_id}.logs.sensor.{reading_type}',
+            payload={
+                'messageKind': 'sensor',
+                'type': reading_type,
+                'value': reading.value,
+                'timestamp': reading.timestamp.isoformat(),
+                'location': reading.location,
+            },
+            headers={'lift_id': reading.lift_id},
+            lane=Lane.TELEMETRY,
+        )
+    return update
+
+
+def handle_publisher(producer: PikaProducer) -> Callable[[SensorReading], None]:
+    return RabbitMQObserver(producer).update
+
+
+def measure(name: str, create_publish: Callable, count: int) -> None:
+    reading = SensorReading('lift-1', 'sensor.temperature', 'base', 0.5, datetime.now())
+    producer: PikaProducer = create_producer()
+    publish: Callable[[SensorReading], None] = create_publish(producer)
+    publish(reading)
+    drain(producer)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(count):
+        publish(reading)
+    drain(producer)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    blocks: int = sum(stat.count_diff for stat in stats)
+    size: int = sum(stat.size_diff for stat in stats)
+
+    producer = create_producer()
+    publish = create_publish(producer)
+    start: float = time.perf_counter()
+    for _ in range(count):
+        publish(reading)
+    drain(producer)
+    elapsed: float = time.perf_counter() - start
+
+    print(f'{name:16} {blocks / count:6.1f} blocks {size / count:7.1f} bytes {elapsed / count * 1e6:6.2f} us per message')
+
+
+def main() -> int:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    measure('publish_payload', payload_publisher, count)
+    measure('publisher handle', handle_publisher, count)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
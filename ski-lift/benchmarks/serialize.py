@@ -0,0 +1,158 @@
+"""Serialization benchmark.
+
+Serializes the results of every command kind with the result serializers
+(python dict, JSON bytes, pretty string), once through the visitor process
+functions and once through the generated per-class functions. Reports the
+time per result.
+
+Then executes commands on a controller with several loggers attached
+(sharing the pretty string and the camel case dict formats), once
+serializing every result for every logger and once through the
+`SERIALIZATION_CACHE`. Reports the serializations and the time per command.
+
+No broker is needed: the producer of the remote communicator is not
+started.
+
+Usage: python -m benchmarks.serialize [<results>]
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, List
+from unittest import mock
+
+from camel_converter import dict_to_camel
+
+from benchmarks.dispatch import create_commands, create_controller
+from ski_lift.core.auth import BaseAuthenticator
+from ski_lift.core.command.descriptor.factory import CommandDescriptorFactory
+from ski_lift.core.command.descriptor.object import (
+    ChangeStateCommandDescriptor, CommandDescriptor)
+from ski_lift.core.command.descriptor_result_factory import \
+    DESCRIPTOR_RESULT_FACTORY
+from ski_lift.core.command.result.object import CommandResult
+from ski_lift.core.command.result.serializer import (
+    BaseResultSerializer, JSONBytesResultSerializer,
+    PrettyResultStringSerializer, PythonDictResultSerializer,
+    SerializationCache)
+from ski_lift.core.monitor.logger.base import BaseCommandLogger
+
+
+class DiscardingLogger(BaseCommandLogger):
+    """Logger serializing every result without writing it anywhere."""
+
+    def process_result_universally(self, result: CommandResult) -> None:
+        self.serialize_result(result)
+
+
+def create_results() -> List[CommandResult]:
+    now: datetime = datetime.now()
+    commands: List[CommandDescriptor] = [
+        CommandDescriptorFactory.create_insert_card(card_to_insert='card-1', time=now),
+        CommandDescriptorFactory.create_remove_card(user_card='card-1', time=now),
+        CommandDescriptorFactory.create_change_state(
+            user_card='card-1', time=now, new_state=ChangeStateCommandDescriptor.Option.HALF_STEAM,
+        ),
+        CommandDescriptorFactory.create_display_status(user_card='card-1', time=now),
+        CommandDescriptorFactory.create_abort_command(user_card='card-1', time=now, command_to_abort=1),
+        CommandDescriptorFactory.create_emergency_stop(user_card='card-1', time=now),
+    ]
+    return [
+        DESCRIPTOR_RESULT_FACTORY.build(command, outcome, exception)
+        for command in commands
+        for outcome, exception in [
+            (CommandResult.OutCome.SUCCESSFUL, None),
+            (CommandResult.OutCome.FAILED, BaseAuthenticator.NotAuthenticatedError()),
+        ]
+    ]
+
+
+def visitor_dict(camel: bool) -> Callable[[CommandResult], dict]:
+    serializer = PythonDictResultSerializer(camel)
+    if camel:
+        return lambda result: dict_to_camel(BaseResultSerializer.serialize(serializer, result))
+    return lambda result: BaseResultSerializer.serialize(serializer, result)
+
+
+def visitor_json(camel: bool) -> Callable[[CommandResult], bytes]:
+    serialize = visitor_dict(camel)
+    return lambda result: json.dumps(serialize(result)).encode('utf-8')
+
+
+def visitor_pretty() -> Callable[[CommandResult], str]:
+    serializer = PrettyResultStringSerializer()
+    return lambda result: BaseResultSerializer.serialize(serializer, result)
+
+
+def measure(name: str, serialize: Callable[[CommandResult], object], results: List[CommandResult], count: int) -> None:
+    for result in results:
+        serialize(result)
+    start: float = time.perf_counter()
+    for index in range(count):
+        serialize(results[index % len(results)])
+    elapsed: float = time.perf_counter() - start
+    print(f'{name:24} {elapsed / count * 1e6:6.2f} us per result')
+
+
+def measure_loggers(name: str, count: int) -> None:
+    controller = create_controller()
+    serializers: List[BaseResultSerializer] = [
+        PrettyResultStringSerializer(),
+        PrettyResultStringSerializer(),
+        PythonDictResultSerializer(convert_to_camel=True),
+        PythonDictResultSerializer(convert_to_camel=True),
+    ]
+    for serializer in serializers:
+        DiscardingLogger(serializer).attach_to(controller)
+    commands: List[CommandDescriptor] = create_commands()
+    for command in commands:
+        controller.execute(command)
+
+    serializations: int = 0
+    serialize_pretty = PrettyResultStringSerializer.serialize
+    serialize_dict = PythonDictResultSerializer.serialize
+
+    def counted(serialize: Callable[[Any, CommandResult], Any]) -> Callable[[Any, CommandResult], Any]:
+        def wrapper(serializer: Any, result: CommandResult) -> Any:
+            nonlocal serializations
+            serializations += 1
+            return serialize(serializer, result)
+        return wrapper
+
+    with mock.patch.object(PrettyResultStringSerializer, 'serialize', counted(serialize_pretty)), \
+            mock.patch.object(PythonDictResultSerializer, 'serialize', counted(serialize_dict)):
+        for command in commands:
+            controller.execute(command)
+
+    start: float = time.perf_counter()
+    for index in range(count):
+        controller.execute(commands[index % len(commands)])
+    elapsed: float = time.perf_counter() - start
+
+    print(
+        f'{name:24} {serializations / len(commands):4.1f} serializations '
+        f'{elapsed / count * 1e6:6.2f} us per command'
+    )
+
+
+def main() -> int:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    results: List[CommandResult] = create_results()
+    measure('dict visitor', visitor_dict(False), results, count)
+    measure('dict generated', PythonDictResultSerializer().serialize, results, count)
+    measure('camel dict visitor', visitor_dict(True), results, count)
+    measure('camel dict generated', PythonDictResultSerializer(True).serialize, results, count)
+    measure('json visitor', visitor_json(True), results, count)
+    measure('json generated', JSONBytesResultSerializer(True).serialize, results, count)
+    measure('pretty visitor', visitor_pretty(), results, count)
+    measure('pretty generated', PrettyResultStringSerializer().serialize, results, count)
+    with mock.patch.object(SerializationCache, 'acquire', lambda self, result, references=1: None):
+        measure_loggers('loggers uncached', count // 5)
+    measure_loggers('loggers cached', count // 5)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Monitor subscription benchmark.
+
+Executes commands through `SkiLiftController.execute` with many result and
+descriptor monitors attached, each of them processing only emergency stops.
+Once the monitors are subscribed to every command type (as before the type
+index), once only to the emergency stops, derived from their overridden
+process functions. Reports the time per command with synchronous and with
+asynchronous result delivery.
+
+No broker is needed: the producer of the remote communicator is not
+started.
+
+Usage: python -m benchmarks.subscriptions [<commands>] [<monitors>]
+"""
+
+import sys
+import time
+from typing import List, Type
+
+from benchmarks.dispatch import create_commands, create_controller
+from ski_lift.core.command.descriptor.object import (
+    CommandDescriptor, EmergencyStopCommandDescriptor)
+from ski_lift.core.command.result.object import (CommandResult,
+                                                 EmergencyStopCommandResult)
+from ski_lift.core.monitor.descriptor.descriptor_monitor import \
+    CommandDescriptorMonitor
+from ski_lift.core.monitor.result.delivery import (SYNCHRONOUS_DELIVERY,
+                                                   DeliveryPolicy)
+from ski_lift.core.monitor.result.result_monitor import CommandResultMonitor
+
+
+class EmergencyStopResultMonitor(CommandResultMonitor):
+    """Result monitor counting the emergency stops."""
+
+    def __init__(self):
+        self.count: int = 0
+
+    def process_emergency_stop_result(self, result: EmergencyStopCommandResult) -> None:
+        self.count += 1
+
+
+class EmergencyStopDescriptorMonitor(CommandDescriptorMonitor):
+    """Descriptor monitor counting the emergency stops."""
+
+    def __init__(self):
+        self.count: int = 0
+
+    def process_emergency_stop_descriptor(self, command: EmergencyStopCommandDescriptor) -> None:
+        self.count += 1
+
+
+class BroadResultMonitor(EmergencyStopResultMonitor):
+    result_types = (CommandResult,)
+
+
+class BroadDescriptorMonitor(EmergencyStopDescriptorMonitor):
+    command_types = (CommandDescriptor,)
+
+
+def measure(
+    name: str,
+    result_monitor: Type[CommandResultMonitor],
+    descriptor_monitor: Type[CommandDescriptorMonitor],
+    policy: DeliveryPolicy,
+    count: int,
+    monitors: int,
+) -> None:
+    controller = create_controller(policy)
+    for _ in range(monitors):
+        controller.register_result_monitor(result_monitor())
+        controller.register_descriptor_monitor(descriptor_monitor())
+    commands: List[CommandDescriptor] = create_commands()
+    for command in commands:
+        controller.execute(command)
+
+    start: float = time.perf_counter()
+    for index in range(count):
+        controller.execute(commands[index % len(commands)])
+    elapsed: float = time.perf_counter() - start
+    controller.close_result_monitors()
+
+    print(f'{name:24} {elapsed / count * 1e6:7.2f} us per command')
+
+
+def main() -> int:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    monitors: int = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    for delivery, policy in (('synchronous', SYNCHRONOUS_DELIVERY), ('asynchronous', DeliveryPolicy(max_pending=count))):
+        measure(f'{delivery} every type', BroadResultMonitor, BroadDescriptorMonitor, policy, count, monitors)
+        measure(
+            f'{delivery} subscribed',
+            EmergencyStopResultMonitor, EmergencyStopDescriptorMonitor, policy, count, monitors,
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,7 +13,7 @@ from ski_lift.use_cases import (attach_loggers_to, create_controller,
 def main() -> int:
     lift_id: str = get_lift_id_or_exit()
 
-    with create_pika_producer() as producer:
+    with create_pika_producer(lift_id=lift_id) as producer:
         with create_controller(lift_id=lift_id, producer=producer) as controller:
             attach_loggers_to(controller, producer)            
             # todo: refactor to be inside controller
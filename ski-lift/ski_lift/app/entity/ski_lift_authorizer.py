@@ -7,10 +7,6 @@ from ski_lift.core.auth.authorizer.base_authorizer import BaseAuthorizer
 from ski_lift.core.command.descriptor.object import (
     CommandDescriptor, InsertCardCommandDescriptor,
     RemoveCardCommandDescriptor)
-from ski_lift.core.command.descriptor_result_factory import \
-    DescriptorResultFactory
-from ski_lift.core.command.result.object import (CommandResult,
-                                                 InsertCardCommandResult)
 
 
 class SkiLiftAuthorizer(BaseAuthorizer):
@@ -28,15 +24,13 @@ class SkiLiftAuthorizer(BaseAuthorizer):
     def __init__(self, authenticator: BaseAuthenticator, *args, **kwargs):
         super().__init__(authenticator=authenticator ,*args, **kwargs)
 
-    def process_insert_card_descriptor(self, command: InsertCardCommandDescriptor) -> InsertCardCommandResult:
+    def process_insert_card_descriptor(self, command: InsertCardCommandDescriptor) -> None:
         self._authenticator.authenticate(command.card_to_insert)
-        return DescriptorResultFactory().build(command=command, outcome=CommandResult.OutCome.SUCCESSFUL)
 
-    def process_remove_card_descriptor(self, command: RemoveCardCommandDescriptor) -> RemoveCardCommandDescriptor:
+    def process_remove_card_descriptor(self, command: RemoveCardCommandDescriptor) -> None:
         self._authenticator.de_authenticate()
-        return DescriptorResultFactory().build(command=command, outcome=CommandResult.OutCome.SUCCESSFUL)
 
-    def process_descriptor_universally(self, command: CommandDescriptor) -> CommandResult:
+    def process_descriptor_universally(self, command: CommandDescriptor) -> None:
         """Process descriptors universally.
 
         If a secret is present use secret based authentication. If the secret
@@ -30,12 +30,24 @@ class SkiLiftController(Controller):
 
     The EmergencyStop, InsertCard and RemoveCard commands does not require
     authentication (inserted card) everything else does.
+
+    Delayed commands get a one-time secret, which is revoked if the command
+    is collapsed into another pending one. Secrets are not journaled, a
+    command recovered from the journal after a restart gets a new one.
     """
 
     def handle_delayed(self, command: CommandDescriptor):
         self.authenticate_delayed(command)
         return super().handle_delayed(command)
 
+    def handle_collapsed(self, command: CommandDescriptor):
+        self.revoke_delayed(command)
+        return super().handle_collapsed(command)
+
+    def handle_recovered(self, command: CommandDescriptor):
+        self.authenticate_delayed(command)
+        return super().handle_recovered(command)
+
     @monitor_result
     @monitor_descriptor
     def execute(self, command: CommandDescriptor) -> CommandResult:
@@ -135,6 +135,18 @@ class BaseAuthenticator(ABC):
             self._secrets.remove(secret)
         else:
             self.raise_invalid_secret_error(secret)
+
+    def revoke_secret(self, secret: str):
+        """Revoke secret.
+
+        Remove a one-time secret which will never be used (e.g. the secret of
+        a collapsed delayed command). Unknown secrets are ignored.
+
+        Args:
+            secret (str): Secret being revoked.
+        """
+        if secret in self._secrets:
+            self._secrets.remove(secret)
     
     @classmethod
     def raise_not_authenticated_error(cls):
@@ -2,12 +2,14 @@
 
 from abc import ABC, abstractmethod
 from functools import wraps
-from typing import Callable
+from typing import Callable, Optional
 
 from ski_lift.core.auth.authenticator.base_authenticator import \
     BaseAuthenticator
 from ski_lift.core.command.descriptor.executor.base import CommandExecutor
 from ski_lift.core.command.descriptor.object import CommandDescriptor
+from ski_lift.core.command.descriptor_result_factory import \
+    DESCRIPTOR_RESULT_FACTORY
 from ski_lift.core.command.result.object import CommandResult
 
 
@@ -26,6 +28,11 @@ class BaseAuthorizer(CommandExecutor):
     The `authorize` function only exists to make a more fitting name for the
     context. The base `execute` function could have been used as
     well.
+
+    Authorized commands are processed into `None` instead of a successful
+    result (see `process_descriptor_universally`), so `check` can authorize
+    a command without allocating a result which would be thrown away. The
+    successful result is only built by `execute`.
     """
 
 
@@ -40,6 +47,34 @@ class BaseAuthorizer(CommandExecutor):
     def authorize(self, command: CommandDescriptor) -> CommandResult:
         return self.execute(command)
 
+    def check(self, command: CommandDescriptor) -> Optional[CommandResult]:
+        """Authorize a command without building a successful result.
+
+        Args:
+            command (CommandDescriptor): Command to authorize.
+
+        Returns:
+            Optional[CommandResult]: `None` if the command is authorized,
+                otherwise the failed result.
+        """
+        try:
+            result: Optional[CommandResult] = self.process_descriptor(command)
+        except Exception as exc:
+            return DESCRIPTOR_RESULT_FACTORY.build(command, CommandResult.OutCome.FAILED, exc)
+        if result is None or result.is_successful:
+            return None
+        return result
+
+    def execute(self, command: CommandDescriptor) -> CommandResult:
+        result: Optional[CommandResult] = self.check(command)
+        if result is None:
+            return DESCRIPTOR_RESULT_FACTORY.build(command, CommandResult.OutCome.SUCCESSFUL)
+        return result
+
+    def process_descriptor_universally(self, command: CommandDescriptor) -> Optional[CommandResult]:
+        """By default each command is authorized."""
+        return None
+
     def authenticate_delayed(self, command: CommandDescriptor) -> None:
         """Authenticate delayed.
 
@@ -51,6 +86,16 @@ class BaseAuthorizer(CommandExecutor):
         """
         command.secret = self._authenticator.generate_secret()
 
+    def revoke_delayed(self, command: CommandDescriptor) -> None:
+        """Revoke the one-time secret of a delayed command that won't run.
+
+        Args:
+            command (CommandDescriptor): Command with the one-time only secret.
+        """
+        if command.secret is not None:
+            self._authenticator.revoke_secret(command.secret)
+            command.secret = None
+
 class CommandAuthorizable(ABC):
     """Command authorizable.
     
@@ -73,8 +118,15 @@ class CommandAuthorizable(ABC):
     def authenticate_delayed(self, command: CommandDescriptor) -> None:
         self._authorizer.authenticate_delayed(command)
 
+    def revoke_delayed(self, command: CommandDescriptor) -> None:
+        self._authorizer.revoke_delayed(command)
+
     def send_through_auth(self, command: CommandDescriptor) -> CommandResult:
         return self._authorizer.authorize(command)
+
+    def check_auth(self, command: CommandDescriptor) -> Optional[CommandResult]:
+        """Authorize a command, returns `None` or the failed result."""
+        return self._authorizer.check(command)
         
 
 def send_through_auth(func: Callable[[CommandAuthorizable, CommandDescriptor], CommandResult]):
@@ -84,7 +136,8 @@ def send_through_auth(func: Callable[[CommandAuthorizable, CommandDescriptor], C
     commands before execution. First the command will be sent to the authorizer
     class to check whether its alright to execute the function or not. If the
     result received is successful then command is executed normally otherwise
-    the failed result from the authorizer is returned.
+    the failed result from the authorizer is returned. The decorator uses the
+    `check_auth` fast path, which does not build a successful result.
 
     Decorated functions are marked with a `_send_through_auth` attribute
     which makes them filterable for example in test cases via the inspect
@@ -96,8 +149,8 @@ def send_through_auth(func: Callable[[CommandAuthorizable, CommandDescriptor], C
     func._send_through_auth = True
     @wraps(func)
     def wrapper(self: CommandAuthorizable, command: CommandDescriptor) -> CommandResult:
-        result: CommandResult = self.send_through_auth(command)
-        if result.is_successful:
+        failed_result: Optional[CommandResult] = self.check_auth(command)
+        if failed_result is None:
             return func(self, command)
-        return result
+        return failed_result
     return wrapper
\ No newline at end of file
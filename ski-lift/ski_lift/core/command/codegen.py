@@ -0,0 +1,231 @@
+"""Serializer code generation.
+
+The default serializers do not walk the `process_*` functions for every
+command, they run a function generated once per command class, with the
+constant parts precomputed. The dict and JSON serializers generate it from a
+declaration of the serialized fields (`descriptor_fields`, `result_fields`),
+the pretty string serializers from their templates.
+
+The output is the same as of the `process_*` functions, which are used
+instead whenever a subclass overrides any of them. The field declarations
+must be changed together with the `process_*` functions, the tests compare
+the two for every command class.
+"""
+
+import json
+from datetime import datetime
+from json.encoder import encode_basestring_ascii
+from string import Template
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Sequence,
+                    Tuple)
+
+from ski_lift.core.utils import class_name_to_snake
+
+# kinds of the serialized fields
+CONSTANT = 'constant'  # value is the constant itself
+TEXT = 'text'  # value is an expression always evaluating to a str
+VALUE = 'value'  # value is an expression evaluating to any JSON value
+OBJECT = 'object'  # value is a nested sequence of fields
+
+# (key, kind, value)
+Field = Tuple[str, str, Any]
+
+
+def compile_function(name: str, source: str, namespace: Dict[str, Any]) -> Callable:
+    """Compile the source of a function named `name` in the given namespace."""
+    scope: Dict[str, Any] = dict(namespace)
+    exec(compile(source, f'<generated {name}>', 'exec'), scope)
+    return scope[name]
+
+
+def overrides_any(cls: type, base: type, names: Iterable[str]) -> bool:
+    """Whether `cls` overrides any of the named functions of `base`."""
+    return any(getattr(cls, name) is not getattr(base, name) for name in names)
+
+
+def json_literal(value: Any) -> str:
+    """JSON text of a constant, as `json.dumps` would emit it."""
+    return json.dumps(value)
+
+
+def format_literal(text: str) -> str:
+    """Escape a text to be a literal part of an f-string."""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def template_to_fstring(template: str, fields: Dict[str, Tuple[str, Any]]) -> str:
+    """Convert a `string.Template` into the body of an equivalent f-string.
+
+    Args:
+        template (str): `string.Template` text.
+        fields (Dict[str, Tuple[str, Any]]): Kind and value of each
+            placeholder (see `Field`), constants are inlined, expressions
+            are converted with `!s` like `Template.substitute` does.
+
+    Raises:
+        KeyError: If a placeholder has no field.
+        ValueError: If the template has an invalid placeholder.
+    """
+    parts: List[str] = []
+    position: int = 0
+    for match in Template.pattern.finditer(template):
+        parts.append(format_literal(template[position:match.start()]))
+        position = match.end()
+        if match.group('escaped') is not None:
+            parts.append('$')
+        elif match.group('invalid') is not None:
+            raise ValueError(f'Invalid placeholder in template: {template!r}')
+        else:
+            kind, value = fields[match.group('named') or match.group('braced')]
+            if kind == CONSTANT:
+                parts.append(format_literal(str(value)))
+            else:
+                parts.append('{' + value + '!s}')
+    parts.append(format_literal(template[position:]))
+    return ''.join(parts)
+
+
+class SnakeNames(object):
+    """Cache of `class_name_to_snake` results per class."""
+
+    def __init__(self, to_remove: Optional[str] = None, upper: bool = False):
+        self._to_remove: Optional[str] = to_remove
+        self._upper: bool = upper
+        self._names: Dict[type, str] = {}
+
+    def __call__(self, obj: Any) -> str:
+        name: Optional[str] = self._names.get(type(obj))
+        if name is None:
+            name = class_name_to_snake(obj, to_remove=self._to_remove)
+            if self._upper:
+                name = name.upper()
+            self._names[type(obj)] = name
+        return name
+
+
+class TimeFormatter(object):
+    """`datetime.strftime` remembering the last formatted second.
+
+    Formats without sub-second directives give the same text for every time
+    within a second, so command bursts format the time once.
+    """
+
+    def __init__(self, time_format: str):
+        self._time_format: str = time_format
+        self._by_second: bool = '%f' not in time_format
+        self._last: Tuple[Optional[datetime], str] = (None, '')
+
+    def __call__(self, time: datetime) -> str:
+        if not self._by_second:
+            return time.strftime(self._time_format)
+        second: datetime = time.replace(microsecond=0)
+        last_second, text = self._last
+        if second != last_second or second.tzinfo is not last_second.tzinfo:
+            text = time.strftime(self._time_format)
+            self._last = (second, text)
+        return text
+
+
+# names available in generated code
+NAMESPACE: Dict[str, Any] = {
+    'dumps': json.dumps,
+    'encode_string': encode_basestring_ascii,
+}
+
+
+def generate_dict_function(
+    name: str,
+    argument: str,
+    fields: Sequence[Field],
+    prelude: str = '',
+    convert_key: Callable[[str], str] = str,
+    namespace: Optional[Dict[str, Any]] = None,
+) -> Callable[[Any], dict]:
+    """Generate a function building a dict of the given fields.
+
+    Args:
+        name (str): Name of the function.
+        argument (str): Name of the only argument of the function.
+        fields (Sequence[Field]): Fields of the dict in order.
+        prelude (str): Statement run before building the dict.
+        convert_key (Callable[[str], str]): Applied to every key once.
+        namespace (Optional[Dict[str, Any]]): Extra names used by the
+            expressions of the fields.
+    """
+    source: str = f'def {name}({argument}):\n'
+    if prelude:
+        source += f'    {prelude}\n'
+    source += f'    return {_dict_expression(fields, convert_key)}\n'
+    return compile_function(name, source, {**NAMESPACE, **(namespace or {})})
+
+
+def generate_json_function(
+    name: str,
+    argument: str,
+    fields: Sequence[Field],
+    prelude: str = '',
+    convert_key: Callable[[str], str] = str,
+    namespace: Optional[Dict[str, Any]] = None,
+) -> Callable[[Any], bytes]:
+    """Generate a function emitting the JSON bytes of the given fields.
+
+    The output is the same as `json.dumps(<dict>).encode('utf-8')` of the
+    dict built by `generate_dict_function`, with the constant parts encoded
+    once. Arguments are the same as of `generate_dict_function`.
+    """
+    source: str = f'def {name}({argument}):\n'
+    if prelude:
+        source += f'    {prelude}\n'
+    source += f'    return f{_json_template(fields, convert_key)!r}.encode()\n'
+    return compile_function(name, source, {**NAMESPACE, **(namespace or {})})
+
+
+def generate_text_function(
+    name: str,
+    argument: str,
+    body: str,
+    prelude: str = '',
+    namespace: Optional[Dict[str, Any]] = None,
+) -> Callable[[Any], str]:
+    """Generate a function returning an f-string, see `template_to_fstring`.
+
+    Args:
+        name (str): Name of the function.
+        argument (str): Name of the only argument of the function.
+        body (str): Body of the f-string.
+        prelude (str): Statement run before building the string.
+        namespace (Optional[Dict[str, Any]]): Names used by the expressions.
+    """
+    source: str = f'def {name}({argument}):\n'
+    if prelude:
+        source += f'    {prelude}\n'
+    source += f'    return f{body!r}\n'
+    return compile_function(name, source, {**NAMESPACE, **(namespace or {})})
+
+
+def _dict_expression(fields: Sequence[Field], convert_key: Callable[[str], str]) -> str:
+    items: List[str] = []
+    for key, kind, value in fields:
+        if kind == CONSTANT:
+            expression = repr(value)
+        elif kind == OBJECT:
+            expression = _dict_expression(value, convert_key)
+        else:
+            expression = value
+        items.append(f'{convert_key(key)!r}: {expression}')
+    return '{' + ', '.join(items) + '}'
+
+
+def _json_template(fields: Sequence[Field], convert_key: Callable[[str], str]) -> str:
+    items: List[str] = []
+    for key, kind, value in fields:
+        if kind == CONSTANT:
+            text = format_literal(json_literal(value))
+        elif kind == OBJECT:
+            text = _json_template(value, convert_key)
+        elif kind == TEXT:
+            text = '{encode_string(' + value + ')}'
+        else:
+            text = '{dumps(' + value + ')}'
+        items.append(format_literal(json_literal(convert_key(key))) + ': ' + text)
+    return '{{' + ', '.join(items) + '}}'
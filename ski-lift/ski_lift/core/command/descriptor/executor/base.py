@@ -8,7 +8,8 @@ from ski_lift.core.command.descriptor.object import (
     InsertCardCommandDescriptor, RemoveCardCommandDescriptor)
 from ski_lift.core.command.descriptor.processor import DescriptorProcessor
 from ski_lift.core.command.descriptor_result_factory import \
-    DescriptorResultFactory
+    DESCRIPTOR_RESULT_FACTORY
+from ski_lift.core.command.dispatch import falls_back
 from ski_lift.core.command.result.object import (AbortCommandResult,
                                                  ChangeStateCommandResult,
                                                  CommandResult,
@@ -37,7 +38,7 @@ class CommandExecutor(DescriptorProcessor):
     well.
 
     The process functions are implemented again to help the type checker only
-    nothing else.
+    nothing else, they are skipped by the dispatch table.
     """
 
     def execute(self, command: CommandDescriptor) -> CommandResult:
@@ -60,32 +61,39 @@ class CommandExecutor(DescriptorProcessor):
         try:
             return self.process_descriptor(command)
         except Exception as exc:
-            return DescriptorResultFactory().build(command, CommandResult.OutCome.FAILED, exc)
+            return DESCRIPTOR_RESULT_FACTORY.build(command, CommandResult.OutCome.FAILED, exc)
 
     def process_descriptor(self, command: CommandDescriptor) -> CommandResult:
         return super().process_descriptor(command)
 
     def process_descriptor_universally(self, command: CommandDescriptor) -> CommandResult:
         """By default each command will return a successful result."""
-        return DescriptorResultFactory().build(command, CommandResult.OutCome.SUCCESSFUL)
+        return DESCRIPTOR_RESULT_FACTORY.build(command, CommandResult.OutCome.SUCCESSFUL)
     
+    @falls_back
     def process_insert_card_descriptor(self, command: InsertCardCommandDescriptor) -> InsertCardCommandResult:
-        return super().process_insert_card_descriptor(command)
+        return self.process_descriptor_universally(command)
 
+    @falls_back
     def process_remove_card_descriptor(self, command: RemoveCardCommandDescriptor) -> RemoveCardCommandResult:
-        return super().process_remove_card_descriptor(command)
+        return self.process_descriptor_universally(command)
 
+    @falls_back
     def process_change_state_descriptor(self, command: ChangeStateCommandDescriptor) -> ChangeStateCommandResult:
-        return super().process_change_state_descriptor(command)
+        return self.process_descriptor_universally(command)
 
+    @falls_back
     def process_display_status_descriptor(self, command: DisplayStatusCommandDescriptor) -> DisplayStatusCommandResult:
-        return super().process_display_status_descriptor(command)
+        return self.process_descriptor_universally(command)
 
+    @falls_back
     def process_abort_command_descriptor(self, command: AbortCommandDescriptor) -> AbortCommandResult:
-        return super().process_abort_command_descriptor(command)
+        return self.process_descriptor_universally(command)
     
+    @falls_back
     def process_emergency_stop_descriptor(self, command: EmergencyStopCommandDescriptor) -> EmergencyStopCommandResult:
-        return super().process_emergency_stop_descriptor(command)
+        return self.process_descriptor_universally(command)
     
+    @falls_back
     def process_message_report_descriptor(self, command: MessageReportCommandDescriptor) -> MessageReportCommandResult:
-        return super().process_message_report_descriptor(command)
+        return self.process_descriptor_universally(command)
@@ -1,19 +1,27 @@
 
 
+import heapq
+import logging
 import time
-from threading import Event, Lock, Thread
-from typing import List
+from threading import Condition, Thread
+from typing import Dict, List, Optional, Set, Tuple
 
 from ski_lift.core.command.descriptor.executor.base import CommandExecutor
-from ski_lift.core.command.descriptor.object import CommandDescriptor
+from ski_lift.core.command.descriptor.executor.journal import \
+    DelayedCommandJournal
+from ski_lift.core.command.descriptor.object import (
+    ChangeStateCommandDescriptor, CommandDescriptor,
+    EmergencyStopCommandDescriptor)
 from ski_lift.core.command.descriptor_result_factory import \
-    DescriptorResultFactory
+    DESCRIPTOR_RESULT_FACTORY
 from ski_lift.core.command.result.object import CommandResult
 
+logger = logging.getLogger(__name__)
+
 
 class DelayedCommandExecutor(CommandExecutor):
     """Delayed command executor.
-    
+
     This is a special command executor which allows executing delayed commands
     in the future determined with their delay attribute.
 
@@ -21,18 +29,45 @@ class DelayedCommandExecutor(CommandExecutor):
     execution.
 
     The concept is to decide before execution whether a command should run
-    immediately or be delayed. Delayed commands are added to a list, which a
-    background thread periodically processes. When the scheduled time arrives,
-    the commands are executed. To abort a command, it is simply removed from
-    the list.
+    immediately or be delayed. Delayed commands are put into a min-heap keyed
+    by their monotonic deadline. A background thread sleeps on a condition
+    until the earliest deadline (or until an earlier command is scheduled) and
+    executes the due commands outside the lock. To abort a command, it is
+    simply removed from the pending commands by its id, its heap entry is
+    skipped once it reaches the top.
+
+    Redundant pending commands are coalesced and the dropped ones are passed
+    to `handle_collapsed`. A new state change replaces the pending one, which
+    is simply removed, so aborting it later does nothing. Of several pending
+    emergency stops only the one with the earliest deadline is scheduled, the
+    others stay its requesters: aborting one of them only withdraws that
+    request, while aborting the scheduled one cancels it and schedules the
+    earliest remaining requester in its place.
+
+    With a `journal` every change of the pending commands is journaled, and
+    the pending commands are recovered from it on `start`, they are passed to
+    `handle_recovered`. Commands which became due while the process was down
+    are executed right away, except the ones overdue by more than the
+    `max_lateness` of the journal: those are dropped, unless they are
+    emergency stops.
     """
 
-    def __init__(self, *args, **kwargs):
-        self._delayed_commands: List[CommandDescriptor] = []
-        self._lock = Lock()
-        self._stop_event = Event()
+    def __init__(self, *args, journal: Optional[DelayedCommandJournal] = None, **kwargs):
+        # heap of (deadline, id) entries, cancelled entries are removed lazily
+        self._delayed_heap: List[Tuple[float, int]] = []
+        self._delayed_commands: Dict[int, CommandDescriptor] = {}
+        # coalescing key -> id of the pending command of that kind
+        self._coalesced: Dict[str, int] = {}
+        # collapsed id -> id of the pending command it was merged into
+        self._aliases: Dict[int, int] = {}
+        # pending id -> commands collapsed into it
+        self._collapsed: Dict[int, List[CommandDescriptor]] = {}
+        # ids of the commands being executed by the scheduler thread
+        self._due_ids: Set[int] = set()
+        self._condition = Condition()
+        self._stopping = False
+        self._journal: Optional[DelayedCommandJournal] = journal
         self._executor_thread = Thread(target=self._process_delayed_commands, daemon=True)
-        self._abort_in_progress = False
         super().__init__(*args, **kwargs)
 
     def __enter__(self):
@@ -45,14 +80,29 @@ class DelayedCommandExecutor(CommandExecutor):
         self.stop()
         return False
 
+    @property
+    def pending_commands(self) -> List[CommandDescriptor]:
+        """Pending delayed commands in the order of their deadline."""
+        with self._condition:
+            return [
+                self._delayed_commands[id]
+                for _, id in sorted(self._delayed_heap)
+                if id in self._delayed_commands
+            ]
+
     def start(self):
-        """Simply start the execution thread."""
+        """Recover the journaled commands and start the execution thread."""
+        self._recover()
         self._executor_thread.start()
 
     def stop(self):
         """Stop the execution thread and wait for it."""
-        self._stop_event.set()
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
         self._executor_thread.join()
+        if self._journal is not None:
+            self._journal.close()
 
     def execute(self, descriptor: CommandDescriptor) -> CommandResult:
         """Execute commands with delayed support.
@@ -72,54 +122,245 @@ class DelayedCommandExecutor(CommandExecutor):
             return self._create_delayed_result(descriptor)
         else:
             return super().execute(descriptor)
-        
+
     def is_delayed(self, descriptor: CommandDescriptor) -> bool:
-        """A command is delayed if the current is smaller than t"""
-        current_time = time.time()
-        return current_time < descriptor.time.timestamp() + descriptor.delay
-    
+        """A command is delayed if its scheduled time has not come yet.
+
+        Commands fired by the scheduler are never delayed again, even if the
+        wall clock was adjusted in the meantime.
+        """
+        if descriptor.id in self._due_ids:
+            return False
+        return time.time() < descriptor.time.timestamp() + descriptor.delay
+
     def handle_delayed(self, command: CommandDescriptor):
-        Thread(target=self._register_delayed_command, args=(command, ), daemon=True).start()
-    
+        for collapsed_command in self._register_delayed_command(command):
+            self.handle_collapsed(collapsed_command)
+
+    def handle_collapsed(self, command: CommandDescriptor):
+        """Invoked for every command dropped in favour of another pending one."""
+
+    def handle_recovered(self, command: CommandDescriptor):
+        """Invoked for every pending command recovered from the journal."""
+
     def handle_instant(self, command: CommandDescriptor):
-        Thread(target=self._unregister_delayed_command, args=(command, ), daemon=True).start()
+        self._unregister_delayed_command(command)
 
     def abort(self, id: int):
-        self._abort_in_progress = True
         self.remove(id)
-        self._abort_in_progress = False
 
     def remove(self, id: int):
-        with self._lock:
-            self._delayed_commands = [
-                command
-                for command in self._delayed_commands
-                if command.id != int(id)
-            ]
+        with self._condition:
+            id = int(id)
+            if id in self._aliases:
+                self._detach(id)
+            command: Optional[CommandDescriptor] = self._delayed_commands.pop(id, None)
+            if command is not None:
+                successors: List[CommandDescriptor] = self._forget(command)
+                self._journal_removed(command)
+                if successors:
+                    self._promote(successors)
+            # drop the cancelled entries once they dominate the heap
+            if len(self._delayed_heap) > 2 * len(self._delayed_commands) + 64:
+                self._delayed_heap = [
+                    entry for entry in self._delayed_heap if entry[1] in self._delayed_commands
+                ]
+                heapq.heapify(self._delayed_heap)
+
+    def _register_delayed_command(self, command: CommandDescriptor) -> List[CommandDescriptor]:
+        with self._condition:
+            if command.id in self._delayed_commands or command.id in self._aliases:
+                return []
+            key: Optional[str] = self._coalescing_key(command)
+            pending: Optional[CommandDescriptor] = (
+                self._delayed_commands.get(self._coalesced[key]) if key in self._coalesced else None
+            )
+            if pending is not None and not self._replaces(command, pending):
+                self._merge(command, into=pending)
+                if self._journal is not None:
+                    self._journal.append_collapsed(command, pending.id)
+                    self._compact_journal()
+                return [command]
+            if isinstance(pending, EmergencyStopCommandDescriptor):
+                del self._delayed_commands[pending.id]
+                self._merge(pending, into=command)
+            elif pending is not None:
+                # a replaced state change is not a requester of the new one
+                del self._delayed_commands[pending.id]
+                self._forget(pending)
+            self._schedule(command, self._deadline(command))
+            if self._journal is not None:
+                self._journal.append_registered(command)
+                if isinstance(pending, EmergencyStopCommandDescriptor):
+                    self._journal.append_collapsed(pending, command.id)
+                elif pending is not None:
+                    self._journal.append_removed(pending.id)
+                self._compact_journal()
+            return [pending] if pending is not None else []
+
+    @staticmethod
+    def _deadline(command: CommandDescriptor) -> float:
+        """The wall clock deadline of a command converted to the monotonic clock."""
+        return time.monotonic() + command.time.timestamp() + command.delay - time.time()
+
+    def _schedule(self, command: CommandDescriptor, deadline: float) -> None:
+        key: Optional[str] = self._coalescing_key(command)
+        if key is not None:
+            self._coalesced[key] = command.id
+        self._delayed_commands[command.id] = command
+        heapq.heappush(self._delayed_heap, (deadline, command.id))
+        if self._delayed_heap[0][1] == command.id:
+            # the new command is the earliest, wake up the scheduler
+            self._condition.notify()
 
-    def _register_delayed_command(self, command: CommandDescriptor):
-        with self._lock:
-            if command not in self._delayed_commands:
-                self._delayed_commands.append(command)
+    def _recover(self) -> None:
+        if self._journal is None:
+            return
+        commands, collapsed = self._journal.replay()
+        expired: List[CommandDescriptor] = [command for command in commands if self._is_expired(command)]
+        for command in expired:
+            logger.warning('Dropped delayed command %s, it was due %.0f seconds ago.', command.id, self._lateness(command))
+            commands.remove(command)
+            collapsed.pop(command.id, None)
+        with self._condition:
+            for command in commands:
+                self._schedule(command, self._deadline(command))
+            for into, collapsed_commands in collapsed.items():
+                self._collapsed[into] = collapsed_commands
+                for collapsed_command in collapsed_commands:
+                    self._aliases[collapsed_command.id] = into
+            self._journal.compact(list(self._delayed_commands.values()), self._collapsed)
+        for command in commands:
+            self.handle_recovered(command)
+
+    def _is_expired(self, command: CommandDescriptor) -> bool:
+        """Whether a recovered command is too late to be executed."""
+        if self._journal.max_lateness is None or isinstance(command, EmergencyStopCommandDescriptor):
+            return False
+        return self._lateness(command) > self._journal.max_lateness
+
+    @staticmethod
+    def _lateness(command: CommandDescriptor) -> float:
+        return time.time() - command.time.timestamp() - command.delay
+
+    def _journal_removed(self, command: CommandDescriptor) -> None:
+        if self._journal is not None:
+            self._journal.append_removed(command.id)
+            self._compact_journal()
+
+    def _compact_journal(self) -> None:
+        if self._journal.needs_compaction(len(self._delayed_commands) + len(self._aliases)):
+            self._journal.compact(list(self._delayed_commands.values()), self._collapsed)
+
+    @staticmethod
+    def _coalescing_key(command: CommandDescriptor) -> Optional[str]:
+        if isinstance(command, EmergencyStopCommandDescriptor):
+            return 'emergency_stop'
+        if isinstance(command, ChangeStateCommandDescriptor):
+            return 'change_state'
+        return None
+
+    @staticmethod
+    def _replaces(command: CommandDescriptor, pending: CommandDescriptor) -> bool:
+        """Whether a new command replaces the pending one of the same kind."""
+        if isinstance(command, EmergencyStopCommandDescriptor):
+            # the earliest emergency stop wins
+            return command.time.timestamp() + command.delay < pending.time.timestamp() + pending.delay
+        # the latest state change wins
+        return True
+
+    def _merge(self, command: CommandDescriptor, into: CommandDescriptor) -> None:
+        """Make a collapsed command (and the ones collapsed into it) requesters of another."""
+        merged: List[CommandDescriptor] = self._collapsed.pop(command.id, []) + [command]
+        self._collapsed.setdefault(into.id, []).extend(merged)
+        for merged_command in merged:
+            self._aliases[merged_command.id] = into.id
+
+    def _detach(self, id: int) -> None:
+        """Withdraw a collapsed command from the pending command it requests."""
+        into: int = self._aliases.pop(id)
+        self._collapsed[into] = [command for command in self._collapsed[into] if command.id != id]
+        if not self._collapsed[into]:
+            del self._collapsed[into]
+        if self._journal is not None:
+            self._journal.append_removed(id)
+            self._compact_journal()
+
+    def _promote(self, commands: List[CommandDescriptor]) -> None:
+        """Schedule the earliest of the requesters of a cancelled command in its place."""
+        successor: CommandDescriptor = min(commands, key=lambda command: command.time.timestamp() + command.delay)
+        requesters: List[CommandDescriptor] = [command for command in commands if command is not successor]
+        self._schedule(successor, self._deadline(successor))
+        if requesters:
+            self._collapsed[successor.id] = requesters
+            for command in requesters:
+                self._aliases[command.id] = successor.id
+        if self._journal is not None:
+            self._journal.append_registered(successor)
+            for command in requesters:
+                self._journal.append_collapsed(command, successor.id)
+            self._compact_journal()
+
+    def _forget(self, command: CommandDescriptor) -> List[CommandDescriptor]:
+        """Drop the coalescing state of a command leaving the pending ones.
+
+        Returns:
+            List[CommandDescriptor]: The commands collapsed into it.
+        """
+        collapsed: List[CommandDescriptor] = self._collapsed.pop(command.id, [])
+        for collapsed_command in collapsed:
+            self._aliases.pop(collapsed_command.id, None)
+        key: Optional[str] = self._coalescing_key(command)
+        if key is not None and self._coalesced.get(key) == command.id:
+            del self._coalesced[key]
+        return collapsed
 
     def _unregister_delayed_command(self, command: CommandDescriptor):
-        with self._lock:
-            if command in self._delayed_commands:
-                self.remove(command)
+        self.remove(command.id)
+
+    def _pop_due_commands(self) -> List[CommandDescriptor]:
+        """Wait for the earliest deadline and pop every due command.
+
+        Must be called with the condition held, returns an empty list once
+        stopping.
+        """
+        while not self._stopping:
+            while self._delayed_heap and self._delayed_heap[0][1] not in self._delayed_commands:
+                heapq.heappop(self._delayed_heap)
+            if not self._delayed_heap:
+                self._condition.wait()
+                continue
+            timeout: float = self._delayed_heap[0][0] - time.monotonic()
+            if timeout > 0:
+                self._condition.wait(timeout)
+                continue
+            due: List[CommandDescriptor] = []
+            now: float = time.monotonic()
+            while self._delayed_heap and self._delayed_heap[0][0] <= now:
+                _, id = heapq.heappop(self._delayed_heap)
+                command = self._delayed_commands.pop(id, None)
+                if command is not None:
+                    self._forget(command)
+                    self._journal_removed(command)
+                    due.append(command)
+            return due
+        return []
 
     def _process_delayed_commands(self):
-        while not self._stop_event.is_set():
-            time.sleep(1)
-            with self._lock:
-                to_keep = []
-                for command in self._delayed_commands:
-                    if self.is_delayed(command):
-                        to_keep.append(command)
-                    elif not self._abort_in_progress:
-                        self.execute(command)
-                    else:
-                        to_keep.append(command)
-                self._delayed_commands = to_keep
+        while True:
+            with self._condition:
+                due: List[CommandDescriptor] = self._pop_due_commands()
+            if not due:
+                return
+            for command in due:
+                self._due_ids.add(command.id)
+                try:
+                    self.execute(command)
+                except Exception:
+                    # keep the scheduler alive for the other commands
+                    logger.exception('Executing delayed command %s failed.', command.id)
+                finally:
+                    self._due_ids.discard(command.id)
 
     def _create_delayed_result(self, command: CommandDescriptor) -> CommandResult:
-        return DescriptorResultFactory().build(command, CommandResult.OutCome.DELAYED)
+        return DESCRIPTOR_RESULT_FACTORY.build(command, CommandResult.OutCome.DELAYED)
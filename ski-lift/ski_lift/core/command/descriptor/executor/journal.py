@@ -0,0 +1,198 @@
+"""Delayed command journal."""
+
+import dataclasses
+import json
+import os
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, Type
+
+from ski_lift.core.command.descriptor.object import CommandDescriptor
+
+# one-time secrets are never written to the disk, recovered commands get new ones
+_NOT_JOURNALED = frozenset({'secret'})
+
+
+def _descriptor_classes() -> Dict[str, Type[CommandDescriptor]]:
+    classes: Dict[str, Type[CommandDescriptor]] = {}
+    pending: List[Type[CommandDescriptor]] = [CommandDescriptor]
+    while pending:
+        cls = pending.pop()
+        classes[cls.__name__] = cls
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def encode_command(command: CommandDescriptor) -> dict:
+    """Encode a command descriptor, including its id but not its secret, into a dict."""
+    fields: Dict[str, Any] = {}
+    for field in dataclasses.fields(command):
+        if field.name in _NOT_JOURNALED:
+            continue
+        value: Any = getattr(command, field.name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Enum):
+            value = value.value
+        fields[field.name] = value
+    return {'kind': type(command).__name__, 'fields': fields}
+
+
+def decode_command(data: dict) -> CommandDescriptor:
+    """Decode a command descriptor encoded by `encode_command`.
+
+    The id of the command is restored, and the id counter is moved past it so
+    new commands do not reuse it.
+
+    Raises:
+        ValueError: If the kind of the command is unknown.
+    """
+    cls: Optional[Type[CommandDescriptor]] = _descriptor_classes().get(data['kind'])
+    if cls is None:
+        raise ValueError(f'Unknown command kind: {data["kind"]}')
+    kwargs: Dict[str, Any] = {}
+    for field in dataclasses.fields(cls):
+        if not field.init or field.name in _NOT_JOURNALED or field.name not in data['fields']:
+            continue
+        value: Any = data['fields'][field.name]
+        if value is not None and field.type is datetime:
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(field.type, type) and issubclass(field.type, Enum):
+            value = field.type(value)
+        kwargs[field.name] = value
+    command: CommandDescriptor = cls(**kwargs)
+    command.id = data['fields']['id']
+    CommandDescriptor._advance_id_counter(command.id)
+    return command
+
+
+class DelayedCommandJournal(object):
+    """Append-only journal of the delayed commands.
+
+    Every registration, collapse (see `DelayedCommandExecutor`) and removal
+    (execution or abort) of a delayed command is appended to a JSON lines
+    file, so the pending commands, together with their ids, survive a restart.
+    Their one-time secrets are not journaled. Once the file has more than
+    `compact_threshold` records and more than twice as many as there are live
+    ones, it is rewritten with the pending commands only, so replaying it on
+    startup takes time proportional to the pending commands.
+
+    Commands other than emergency stops which are overdue by more than
+    `max_lateness` seconds on recovery are dropped instead of being executed
+    late (see `DelayedCommandExecutor`), by default they are all executed.
+
+    Not thread-safe, the executor only uses it while holding its lock.
+    """
+
+    def __init__(self, path: str, compact_threshold: int = 1000, max_lateness: Optional[float] = None):
+        self._path: str = path
+        self._compact_threshold: int = compact_threshold
+        self._max_lateness: Optional[float] = max_lateness
+        self._file: Optional[TextIO] = None
+        self._record_count: int = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def max_lateness(self) -> Optional[float]:
+        return self._max_lateness
+
+    def needs_compaction(self, live_count: int) -> bool:
+        """Whether the journal should be compacted.
+
+        Args:
+            live_count (int): Number of pending and collapsed commands.
+        """
+        return self._record_count > max(self._compact_threshold, 2 * live_count)
+
+    def append_registered(self, command: CommandDescriptor) -> None:
+        self._append({'op': 'register', 'command': encode_command(command)})
+
+    def append_collapsed(self, command: CommandDescriptor, into: int) -> None:
+        self._append({'op': 'collapse', 'id': command.id, 'into': into, 'command': encode_command(command)})
+
+    def append_removed(self, id: int) -> None:
+        """Journal the removal of a pending command or of a collapsed one."""
+        self._append({'op': 'remove', 'id': id})
+
+    def replay(self) -> Tuple[List[CommandDescriptor], Dict[int, List[CommandDescriptor]]]:
+        """Read the pending commands from the journal.
+
+        Returns:
+            Tuple[List[CommandDescriptor], Dict[int, List[CommandDescriptor]]]:
+                The pending commands in registration order and the commands
+                collapsed into them (pending id -> collapsed commands).
+        """
+        pending: Dict[int, CommandDescriptor] = {}
+        collapsed: Dict[int, List[CommandDescriptor]] = {}
+        # collapsed id -> pending id
+        aliases: Dict[int, int] = {}
+        for record in self._read():
+            match record['op']:
+                case 'register':
+                    command: CommandDescriptor = decode_command(record['command'])
+                    pending[command.id] = command
+                case 'collapse':
+                    command = pending.pop(record['id'], None) or decode_command(record['command'])
+                    merged: List[CommandDescriptor] = collapsed.pop(command.id, []) + [command]
+                    collapsed.setdefault(record['into'], []).extend(merged)
+                    for merged_command in merged:
+                        aliases[merged_command.id] = record['into']
+                case 'remove':
+                    pending.pop(record['id'], None)
+                    for removed in collapsed.pop(record['id'], []):
+                        aliases.pop(removed.id, None)
+                    into: Optional[int] = aliases.pop(record['id'], None)
+                    if into is not None:
+                        collapsed[into] = [
+                            command for command in collapsed[into] if command.id != record['id']
+                        ]
+        return list(pending.values()), {
+            into: commands for into, commands in collapsed.items() if into in pending and commands
+        }
+
+    def compact(self, commands: List[CommandDescriptor], collapsed: Dict[int, List[CommandDescriptor]]) -> None:
+        """Rewrite the journal with the given pending and collapsed commands."""
+        self.close()
+        directory: str = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path: str = self._path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for command in commands:
+                file.write(json.dumps({'op': 'register', 'command': encode_command(command)}) + '\n')
+            for into, collapsed_commands in collapsed.items():
+                for command in collapsed_commands:
+                    file.write(json.dumps({
+                        'op': 'collapse', 'id': command.id, 'into': into, 'command': encode_command(command),
+                    }) + '\n')
+        os.replace(temp_path, self._path)
+        self._record_count = len(commands) + sum(map(len, collapsed.values()))
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _append(self, record: dict) -> None:
+        if self._file is None:
+            directory: str = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self._path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        self._record_count += 1
+
+    def _read(self) -> Iterator[dict]:
+        if not os.path.exists(self._path):
+            return
+        with open(self._path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # torn last line of a crashed process
+                    return
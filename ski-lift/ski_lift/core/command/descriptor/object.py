@@ -8,13 +8,14 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum, auto
+from threading import Lock
 from typing import TYPE_CHECKING, Any, ClassVar, Optional
 
 if TYPE_CHECKING:
     from ski_lift.core.command.descriptor.processor import DescriptorProcessor
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CommandDescriptor(ABC):
     """Base class for command descriptors.
 
@@ -31,6 +32,10 @@ class CommandDescriptor(ABC):
     session or run, so it should not be used in databases or any form of
     permanent storage. If you need to use it for such purposes, combining the
     `time` and `id` attributes will guarantee uniqueness.
+
+    Descriptors are slotted, they can not be extended with new attributes at
+    runtime. Ids are generated under a lock, so commands created by several
+    threads (e.g. the IO loop of the consumer and the CLI) get distinct ids.
     """
 
     id: int = field(init=False)
@@ -40,6 +45,7 @@ class CommandDescriptor(ABC):
     secret: Optional[str] = None
 
     _id_counter: ClassVar[int] = 0
+    _id_lock: ClassVar[Lock] = Lock()
 
     def __post_init__(self):
         """Set and increment the id."""
@@ -52,10 +58,17 @@ class CommandDescriptor(ABC):
 
     @classmethod
     def _generate_next_id(cls):
-        cls._id_counter += 1
-        return cls._id_counter
+        with CommandDescriptor._id_lock:
+            CommandDescriptor._id_counter += 1
+            return CommandDescriptor._id_counter
+
+    @classmethod
+    def _advance_id_counter(cls, id: int):
+        """Make sure new ids are greater than the given (e.g. restored) id."""
+        with CommandDescriptor._id_lock:
+            CommandDescriptor._id_counter = max(CommandDescriptor._id_counter, id)
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class InsertCardCommandDescriptor(CommandDescriptor):
     """Command descriptor for inserting a user card into the control panel.
     
@@ -70,7 +83,7 @@ class InsertCardCommandDescriptor(CommandDescriptor):
         return processor.process_insert_card_descriptor(self)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class RemoveCardCommandDescriptor(CommandDescriptor):
     """Command descriptor for removing cards from the control panel."""
     
@@ -79,7 +92,7 @@ class RemoveCardCommandDescriptor(CommandDescriptor):
         return processor.process_remove_card_descriptor(self)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ChangeStateCommandDescriptor(CommandDescriptor):
     """Command descriptor for changing the state of the engine.
     
@@ -105,7 +118,7 @@ class ChangeStateCommandDescriptor(CommandDescriptor):
         return processor.process_change_state_descriptor(self)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class DisplayStatusCommandDescriptor(CommandDescriptor):
     """Command descriptor for displaying current status of the engine."""
     
@@ -114,7 +127,7 @@ class DisplayStatusCommandDescriptor(CommandDescriptor):
         return processor.process_display_status_descriptor(self)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class AbortCommandDescriptor(CommandDescriptor):
     """Command descriptor for aborting a delayed command.
     
@@ -129,7 +142,7 @@ class AbortCommandDescriptor(CommandDescriptor):
         return processor.process_abort_command_descriptor(self)
     
 
-@dataclass
+@dataclass(slots=True)
 class EmergencyStopCommandDescriptor(CommandDescriptor):
     """Command descriptor for emergency stop."""
 
@@ -138,7 +151,7 @@ class EmergencyStopCommandDescriptor(CommandDescriptor):
         return processor.process_emergency_stop_descriptor(self)
     
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class MessageReportCommandDescriptor(CommandDescriptor):
     """Command descriptor for reporting messages to the central room.
     
@@ -8,6 +8,20 @@ from ski_lift.core.command.descriptor.object import (
     DisplayStatusCommandDescriptor, EmergencyStopCommandDescriptor,
     InsertCardCommandDescriptor, MessageReportCommandDescriptor,
     RemoveCardCommandDescriptor)
+from ski_lift.core.command.dispatch import DispatchRegistry, falls_back
+
+DESCRIPTOR_DISPATCH = DispatchRegistry(
+    handler_names={
+        InsertCardCommandDescriptor: 'process_insert_card_descriptor',
+        RemoveCardCommandDescriptor: 'process_remove_card_descriptor',
+        ChangeStateCommandDescriptor: 'process_change_state_descriptor',
+        DisplayStatusCommandDescriptor: 'process_display_status_descriptor',
+        AbortCommandDescriptor: 'process_abort_command_descriptor',
+        EmergencyStopCommandDescriptor: 'process_emergency_stop_descriptor',
+        MessageReportCommandDescriptor: 'process_message_report_descriptor',
+    },
+    universal_name='process_descriptor_universally',
+)
 
 
 class DescriptorProcessor(ABC):
@@ -18,32 +32,50 @@ class DescriptorProcessor(ABC):
 
     By default each command will be processed via the
     `process_descriptor_universally` which is meant to be a universal solution.
+
+    Instead of calling `accept` on the command, `process_descriptor` looks up
+    the process function in the `DESCRIPTOR_DISPATCH` table of the processor
+    class, see `DispatchRegistry`. Process functions which only call the
+    universal one should be marked with `falls_back`.
     """
 
     def process_descriptor(self, command: CommandDescriptor) -> Any:
-        return command.accept(self)
+        # `DESCRIPTOR_DISPATCH.dispatch` inlined
+        handler = (
+            DESCRIPTOR_DISPATCH.tables.get(type(self)) or DESCRIPTOR_DISPATCH.table(type(self))
+        ).get(type(command))
+        if handler is None:
+            return command.accept(self)
+        return handler(self, command)
 
     @abstractmethod
     def process_descriptor_universally(self, command: CommandDescriptor) -> Any:
         pass
     
+    @falls_back
     def process_insert_card_descriptor(self, command: InsertCardCommandDescriptor) -> Any:
         return self.process_descriptor_universally(command)
 
+    @falls_back
     def process_remove_card_descriptor(self, command: RemoveCardCommandDescriptor) -> Any:
         return self.process_descriptor_universally(command)
 
+    @falls_back
     def process_change_state_descriptor(self, command: ChangeStateCommandDescriptor) -> Any:
         return self.process_descriptor_universally(command)
 
+    @falls_back
     def process_display_status_descriptor(self, command: DisplayStatusCommandDescriptor) -> Any:
         return self.process_descriptor_universally(command)
 
+    @falls_back
     def process_abort_command_descriptor(self, command: AbortCommandDescriptor) -> Any:
         return self.process_descriptor_universally(command)
 
+    @falls_back
     def process_emergency_stop_descriptor(self, command: EmergencyStopCommandDescriptor) -> Any:
         return self.process_descriptor_universally(command)
     
+    @falls_back
     def process_message_report_descriptor(self, command: MessageReportCommandDescriptor) -> Any:
         return self.process_descriptor_universally(command)
@@ -1,12 +1,19 @@
 """Command descriptor json serializer."""
 
 import json
+from typing import Callable, Dict, Optional, Tuple
 
-from camel_converter import dict_to_camel
+from camel_converter import dict_to_camel, to_camel
 
+from ski_lift.core.command.codegen import (generate_json_function,
+                                           overrides_any)
 from ski_lift.core.command.descriptor.object import CommandDescriptor
-from ski_lift.core.command.descriptor.serializer.python_dict import \
-    PythonDictDescriptorSerializer
+from ski_lift.core.command.descriptor.processor import DESCRIPTOR_DISPATCH
+from ski_lift.core.command.descriptor.serializer.python_dict import (
+    GENERATED_FOR, PythonDictDescriptorSerializer, descriptor_fields)
+
+# serializer class, descriptor class, convert to camel -> generated function
+_generated: Dict[Tuple[type, type, bool], Optional[Callable[[CommandDescriptor], bytes]]] = {}
 
 
 class JSONBytesDescriptorSerializer(PythonDictDescriptorSerializer):
@@ -23,7 +30,28 @@ class JSONBytesDescriptorSerializer(PythonDictDescriptorSerializer):
         self._convert_to_camel: bool = convert_to_camel
 
     def serialize(self, command: CommandDescriptor) -> bytes:
+        key: Tuple[type, type, bool] = (type(self), type(command), self._convert_to_camel)
+        generated = _generated[key] if key in _generated else self._generate_json(key)
+        if generated is not None:
+            return generated(command)
         command_dict: dict = super().serialize(command)
         if self._convert_to_camel:
             command_dict = dict_to_camel(command_dict)
         return json.dumps(command_dict).encode('utf-8')
+
+    @staticmethod
+    def _generate_json(key: Tuple[type, type, bool]) -> Optional[Callable[[CommandDescriptor], bytes]]:
+        serializer_class, descriptor_class, convert_to_camel = key
+        generated: Optional[Callable[[CommandDescriptor], bytes]] = None
+        if (
+            descriptor_class in DESCRIPTOR_DISPATCH.handler_names
+            and not overrides_any(serializer_class, JSONBytesDescriptorSerializer, GENERATED_FOR)
+        ):
+            generated = generate_json_function(
+                name=f'serialize_{descriptor_class.__name__}',
+                argument='command',
+                fields=descriptor_fields(descriptor_class),
+                convert_key=to_camel if convert_to_camel else str,
+            )
+        _generated[key] = generated
+        return generated
@@ -3,13 +3,23 @@
 
 from dataclasses import dataclass
 from string import Template
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Optional
 
+from camel_converter import to_snake
+
+from ski_lift.core.command.codegen import (CONSTANT, TEXT, VALUE,
+                                           TimeFormatter,
+                                           generate_text_function,
+                                           overrides_any,
+                                           template_to_fstring)
 from ski_lift.core.command.descriptor.object import (
     ChangeStateCommandDescriptor, CommandDescriptor,
     InsertCardCommandDescriptor)
+from ski_lift.core.command.descriptor.processor import DESCRIPTOR_DISPATCH
 from ski_lift.core.command.descriptor.serializer.base import \
     BaseDescriptorSerializer
+from ski_lift.core.command.descriptor.serializer.python_dict import \
+    DESCRIPTOR_ARGS
 from ski_lift.core.utils import class_name_to_snake
 
 from ..object import MessageReportCommandDescriptor
@@ -49,6 +59,43 @@ class PrettyStringDescriptorSerializer(BaseDescriptorSerializer):
         self._config = config or DEFAULT_CONFIG
         self._template: Template = Template(self._config.template)
         self._arg_template: Template = Template(self._config.arg_template)
+        self._generated: Dict[type, Callable[[CommandDescriptor], str]] = {}
+        self._format_time: TimeFormatter = TimeFormatter(self._config.time_format)
+        self._uses_generated: bool = not overrides_any(
+            type(self),
+            PrettyStringDescriptorSerializer,
+            ('process_descriptor', 'process_descriptor_universally', *DESCRIPTOR_DISPATCH.handler_names.values()),
+        )
+
+    def serialize(self, command: CommandDescriptor) -> str:
+        generated: Optional[Callable[[CommandDescriptor], str]] = self._generated.get(type(command))
+        if generated is not None:
+            return generated(command)
+        if not self._uses_generated or type(command) not in DESCRIPTOR_DISPATCH.handler_names:
+            return super().serialize(command)
+        return self._generate(type(command))(command)
+
+    def _generate(self, command_class: type) -> Callable[[CommandDescriptor], str]:
+        body: str = template_to_fstring(self._config.template, {
+            'id': (VALUE, 'command.id'),
+            'type': (CONSTANT, to_snake(command_class.__name__.replace('CommandDescriptor', ''))),
+            'time': (TEXT, 'format_time(command.time)'),
+            'delay': (VALUE, 'command.delay'),
+            'user': (VALUE, 'command.user_card'),
+        })
+        for arg_name, kind, value in DESCRIPTOR_ARGS.get(command_class, ()):
+            body += template_to_fstring(self._config.arg_template, {
+                'arg_name': (CONSTANT, arg_name),
+                'arg_value': (kind, value),
+            })
+        generated = generate_text_function(
+            name=f'serialize_{command_class.__name__}',
+            argument='command',
+            body=body + '\n',
+            namespace={'format_time': self._format_time},
+        )
+        self._generated[command_class] = generated
+        return generated
 
     def process_descriptor(self, command: CommandDescriptor) -> Any:
         return super().process_descriptor(command) + '\n'
@@ -1,14 +1,56 @@
 """Command descriptor json serializer."""
 
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
+from camel_converter import to_snake
+
+from ski_lift.core.command.codegen import (CONSTANT, OBJECT, TEXT, VALUE,
+                                           Field, generate_dict_function,
+                                           overrides_any)
 from ski_lift.core.command.descriptor.object import (
     ChangeStateCommandDescriptor, CommandDescriptor,
     InsertCardCommandDescriptor, MessageReportCommandDescriptor)
+from ski_lift.core.command.descriptor.processor import DESCRIPTOR_DISPATCH
 from ski_lift.core.command.descriptor.serializer.base import \
     BaseDescriptorSerializer
 from ski_lift.core.utils import class_name_to_snake
 
+# fields of the `args` of the descriptors, see `descriptor_fields`
+DESCRIPTOR_ARGS: Dict[type, Sequence[Field]] = {
+    InsertCardCommandDescriptor: (('card_inserted', VALUE, 'command.card_to_insert'),),
+    ChangeStateCommandDescriptor: (('new_state', TEXT, 'command.new_state.name'),),
+    MessageReportCommandDescriptor: (
+        ('severity', TEXT, 'command.severity.name'),
+        ('message', VALUE, 'command.message'),
+    ),
+}
+
+# functions which must not be overridden to use the generated functions
+GENERATED_FOR: Tuple[str, ...] = (
+    'process_descriptor', 'process_descriptor_universally', *DESCRIPTOR_DISPATCH.handler_names.values(),
+)
+
+# serializer class, descriptor class -> generated function
+_generated: Dict[Tuple[type, type], Optional[Callable[[CommandDescriptor], dict]]] = {}
+
+
+def descriptor_fields(descriptor_class: type) -> List[Field]:
+    """Fields of the serialized descriptors of a class, in order.
+
+    Expressions refer to the descriptor as `command`.
+    """
+    fields: List[Field] = [
+        ('id', VALUE, 'command.id'),
+        ('type', CONSTANT, 'command'),
+        ('kind', CONSTANT, to_snake(descriptor_class.__name__.replace('CommandDescriptor', ''))),
+        ('time', TEXT, 'command.time.isoformat()'),
+        ('delay', VALUE, 'command.delay'),
+        ('user', VALUE, 'command.user_card'),
+    ]
+    if descriptor_class in DESCRIPTOR_ARGS:
+        fields.append(('args', OBJECT, DESCRIPTOR_ARGS[descriptor_class]))
+    return fields
+
 
 class PythonDictDescriptorSerializer(BaseDescriptorSerializer):
     """Python dict descriptor serializer.
@@ -17,6 +59,29 @@ class PythonDictDescriptorSerializer(BaseDescriptorSerializer):
     into python dicts.
     """
 
+    def serialize(self, command: CommandDescriptor) -> dict:
+        key: Tuple[type, type] = (type(self), type(command))
+        generated = _generated[key] if key in _generated else self._generate(key)
+        if generated is not None:
+            return generated(command)
+        return super().serialize(command)
+
+    @staticmethod
+    def _generate(key: Tuple[type, type]) -> Optional[Callable[[CommandDescriptor], dict]]:
+        serializer_class, descriptor_class = key
+        generated: Optional[Callable[[CommandDescriptor], dict]] = None
+        if (
+            descriptor_class in DESCRIPTOR_DISPATCH.handler_names
+            and not overrides_any(serializer_class, PythonDictDescriptorSerializer, GENERATED_FOR)
+        ):
+            generated = generate_dict_function(
+                name=f'serialize_{descriptor_class.__name__}',
+                argument='command',
+                fields=descriptor_fields(descriptor_class),
+            )
+        _generated[key] = generated
+        return generated
+
     def process_descriptor_universally(self, command: CommandDescriptor) -> dict:
         return {
             'id': command.id,
@@ -24,6 +24,9 @@ class DescriptorResultFactory(DescriptorProcessor):
     
     This is a special `DescriptorProcessor` which can produces appropriate
     result for a given command. 
+
+    It has no state, use the shared `DESCRIPTOR_RESULT_FACTORY` instance
+    instead of creating one for every result.
     """
 
     def build(
@@ -59,4 +62,7 @@ class DescriptorResultFactory(DescriptorProcessor):
         return EmergencyStopCommandResult(command=descriptor)
 
     def process_message_report_descriptor(self, descriptor: MessageReportCommandDescriptor) -> MessageReportCommandResult:
-        return MessageReportCommandResult(command=descriptor)
\ No newline at end of file
+        return MessageReportCommandResult(command=descriptor)
+
+
+DESCRIPTOR_RESULT_FACTORY = DescriptorResultFactory()
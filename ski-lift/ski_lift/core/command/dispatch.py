@@ -0,0 +1,85 @@
+"""Type dispatch registry."""
+
+from typing import Any, Callable, Dict, FrozenSet, Type
+
+
+def falls_back(func: Callable) -> Callable:
+    """Falls back decorator.
+
+    Marks a process function which does nothing else than calling the
+    universal process function of the processor (directly or via `super`).
+    The dispatch registry calls the universal function instead, skipping the
+    chain of such functions.
+    """
+    func._falls_back = True
+    return func
+
+
+class DispatchRegistry(object):
+    """Dispatch registry.
+
+    Replacement of the visitor double dispatch (`accept` and the matching
+    process function) with a dispatch table. The table of a processor class
+    is built on its first use, it maps each processed class to the process
+    function of the processor class resolved once, with the functions marked
+    by `falls_back` replaced by the universal process function.
+
+    Objects of classes missing from the table are dispatched through their
+    `accept` function. The functions are looked up on the processor class, so
+    process functions patched on an instance or on the class after its table
+    was built are not used.
+
+    Hot paths can skip the `dispatch` call by looking up the table in
+    `tables` directly and falling back to `table` when it is not built yet.
+    """
+
+    def __init__(self, handler_names: Dict[type, str], universal_name: str):
+        """Create a registry.
+
+        Args:
+            handler_names (Dict[type, str]): Name of the process function of
+                each processed class.
+            universal_name (str): Name of the universal process function.
+        """
+        self._handler_names: Dict[type, str] = handler_names
+        self._universal_name: str = universal_name
+        # processor class -> processed class -> process function
+        self.tables: Dict[type, Dict[type, Callable[[Any, Any], Any]]] = {}
+
+    @property
+    def handler_names(self) -> Dict[type, str]:
+        """Name of the process function of each processed class."""
+        return self._handler_names
+
+    def dispatch(self, processor: Any, obj: Any) -> Any:
+        """Process an object with the matching function of the processor."""
+        handler = (self.tables.get(type(processor)) or self.table(type(processor))).get(type(obj))
+        if handler is None:
+            return obj.accept(processor)
+        return handler(processor, obj)
+
+    def table(self, processor_class: Type) -> Dict[type, Callable[[Any, Any], Any]]:
+        """Get the dispatch table of a processor class, building it if needed."""
+        table = self.tables.get(processor_class)
+        if table is None:
+            universal: Callable = getattr(processor_class, self._universal_name)
+            table = {}
+            for processed_class, name in self._handler_names.items():
+                handler: Callable = getattr(processor_class, name)
+                table[processed_class] = universal if getattr(handler, '_falls_back', False) else handler
+            self.tables[processor_class] = table
+        return table
+
+    def handled_classes(self, processor_class: Type, ignored: Callable) -> FrozenSet[type]:
+        """Get the processed classes a processor class does not leave to `ignored`.
+
+        Args:
+            processor_class (Type): Class of the processor.
+            ignored (Callable): Process function doing nothing, typically the
+                universal process function of a base class.
+        """
+        return frozenset(
+            processed_class
+            for processed_class, handler in self.table(processor_class).items()
+            if handler is not ignored
+        )
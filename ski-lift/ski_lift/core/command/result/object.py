@@ -22,7 +22,7 @@ if TYPE_CHECKING:
 
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CommandResult(ABC):
     """Base class for command results.
 
@@ -74,7 +74,7 @@ class CommandResult(ABC):
         """A result considered successful if its not failed."""
         return self.outcome != self.OutCome.FAILED
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class InsertCardCommandResult(CommandResult):
     """Command result for the insert card command."""
 
@@ -85,7 +85,7 @@ class InsertCardCommandResult(CommandResult):
         return processor.process_insert_card_result(self)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class RemoveCardCommandResult(CommandResult):
     """Command result for the remove card command."""
     
@@ -96,7 +96,7 @@ class RemoveCardCommandResult(CommandResult):
         return processor.process_remove_card_result(self)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ChangeStateCommandResult(CommandResult):
     """Command result for the change state command."""
     
@@ -107,7 +107,7 @@ class ChangeStateCommandResult(CommandResult):
         return processor.process_change_state_result(self)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class DisplayStatusCommandResult(CommandResult):
     """Command result for the display status command."""
     
@@ -119,7 +119,7 @@ class DisplayStatusCommandResult(CommandResult):
         return processor.process_display_status_result(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class AbortCommandResult(CommandResult):
     """Command result for the abort command command."""
 
@@ -130,7 +130,7 @@ class AbortCommandResult(CommandResult):
         return processor.process_abort_command_result(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class EmergencyStopCommandResult(CommandResult):
     """Command result for the emergency stop command."""
     
@@ -141,7 +141,7 @@ class EmergencyStopCommandResult(CommandResult):
         return processor.process_emergency_stop_result(self)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class MessageReportCommandResult(CommandResult):
     """Command result for the message report command."""
 
@@ -11,6 +11,20 @@ from ski_lift.core.command.result.object import (AbortCommandResult,
                                                  InsertCardCommandResult,
                                                  MessageReportCommandResult,
                                                  RemoveCardCommandResult)
+from ski_lift.core.command.dispatch import DispatchRegistry, falls_back
+
+RESULT_DISPATCH = DispatchRegistry(
+    handler_names={
+        InsertCardCommandResult: 'process_insert_card_result',
+        RemoveCardCommandResult: 'process_remove_card_result',
+        ChangeStateCommandResult: 'process_change_state_result',
+        DisplayStatusCommandResult: 'process_display_status_result',
+        AbortCommandResult: 'process_abort_command_result',
+        EmergencyStopCommandResult: 'process_emergency_stop_result',
+        MessageReportCommandResult: 'process_message_report_result',
+    },
+    universal_name='process_result_universally',
+)
 
 
 class ResultProcessor(ABC):
@@ -22,32 +36,50 @@ class ResultProcessor(ABC):
     By default each result will be processed via the
     `process_result_universally` function which is meant to be a universal
     solution.
+
+    Instead of calling `accept` on the result, `process_result` looks up the
+    process function in the `RESULT_DISPATCH` table of the processor class,
+    see `DispatchRegistry`. Process functions which only call the universal
+    one should be marked with `falls_back`.
     """
     
     def process_result(self, result: CommandResult) -> Any:
-        return result.accept(self)
+        # `RESULT_DISPATCH.dispatch` inlined
+        handler = (
+            RESULT_DISPATCH.tables.get(type(self)) or RESULT_DISPATCH.table(type(self))
+        ).get(type(result))
+        if handler is None:
+            return result.accept(self)
+        return handler(self, result)
 
     @abstractmethod
     def process_result_universally(self, result: CommandResult) -> Any:
         pass
     
+    @falls_back
     def process_insert_card_result(self, result: InsertCardCommandResult) -> Any:
         return self.process_result_universally(result)
 
+    @falls_back
     def process_remove_card_result(self, result: RemoveCardCommandResult) -> Any:
         return self.process_result_universally(result)
 
+    @falls_back
     def process_change_state_result(self, result: ChangeStateCommandResult) -> Any:
         return self.process_result_universally(result)
 
+    @falls_back
     def process_display_status_result(self, result: DisplayStatusCommandResult) -> Any:
         return self.process_result_universally(result)
 
+    @falls_back
     def process_abort_command_result(self, result: AbortCommandResult) -> Any:
         return self.process_result_universally(result)
 
+    @falls_back
     def process_emergency_stop_result(self, result: EmergencyStopCommandResult) -> Any:
         return self.process_result_universally(result)
     
+    @falls_back
     def process_message_report_result(self, result: MessageReportCommandResult) -> Any:
         return self.process_result_universally(result)
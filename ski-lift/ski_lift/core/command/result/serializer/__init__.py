@@ -1,4 +1,5 @@
 from .base import BaseResultSerializer
+from .cache import SERIALIZATION_CACHE, SerializationCache
 from .json_bytes import JSONBytesResultSerializer
 from .pretty_string import (PrettyResultSerializerConfig,
                             PrettyResultStringSerializer)
@@ -1,7 +1,7 @@
 """Command result descriptor serializer."""
 
 
-from typing import Any
+from typing import Any, Hashable, Optional
 
 from ski_lift.core.command.result.object import CommandResult
 from ski_lift.core.command.result.processor import ResultProcessor
@@ -18,6 +18,16 @@ class BaseResultSerializer(ResultProcessor):
     well.
     """
 
+    @property
+    def format_key(self) -> Optional[Hashable]:
+        """Key of the output format of the serializer.
+
+        Serializers with equal keys must produce the same output for every
+        result, the key lets the `SerializationCache` share the output. None
+        (the default) means the output is not cached.
+        """
+        return None
+
     def serialize(self, result: CommandResult) -> Any:
         """Serializer the result into a specified format."""
         return self.process_result(result)
@@ -0,0 +1,82 @@
+"""Result serialization cache."""
+
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+
+from ski_lift.core.command.result.object import CommandResult
+from ski_lift.core.command.result.serializer.base import BaseResultSerializer
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    references: int
+    # format key -> serialized result
+    representations: Dict[Hashable, Any] = field(default_factory=dict)
+
+
+class SerializationCache(object):
+    """Serialization cache.
+
+    Keeps the serialized forms of the results being monitored, so each format
+    (see `BaseResultSerializer.format_key`) is serialized once per result no
+    matter how many monitors ask for it.
+
+    A result is cached between `acquire` and the matching `release` calls,
+    it is reference counted, usually one reference per monitor, and its
+    serialized forms are dropped with the last release. Serializing a result
+    which is not acquired, or with a serializer without a format key, is not
+    cached.
+
+    The serialized forms are shared by the monitors, they must not be
+    modified.
+
+    Use the shared `SERIALIZATION_CACHE` instance.
+    """
+
+    def __init__(self) -> None:
+        self._lock: Lock = Lock()
+        # id of the result -> entry, the acquired results are kept alive by
+        # their holders so their ids are unique
+        self._entries: Dict[int, _CacheEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def acquire(self, result: CommandResult, references: int = 1) -> None:
+        """Cache the serialized forms of a result until it is released.
+
+        Args:
+            result (CommandResult): Result to cache.
+            references (int): Number of `release` calls dropping the result.
+        """
+        with self._lock:
+            entry: Optional[_CacheEntry] = self._entries.get(id(result))
+            if entry is None:
+                self._entries[id(result)] = _CacheEntry(references)
+            else:
+                entry.references += references
+
+    def release(self, result: CommandResult) -> None:
+        """Drop a reference of a result, and its serialized forms with the last one."""
+        with self._lock:
+            entry: Optional[_CacheEntry] = self._entries.get(id(result))
+            if entry is not None:
+                entry.references -= 1
+                if entry.references <= 0:
+                    del self._entries[id(result)]
+
+    def serialize(self, serializer: BaseResultSerializer, result: CommandResult) -> Any:
+        """Serialize a result, or get its cached serialized form."""
+        key: Optional[Hashable] = serializer.format_key
+        entry: Optional[_CacheEntry] = self._entries.get(id(result))
+        if key is None or entry is None:
+            return serializer.serialize(result)
+        serialized: Any = entry.representations.get(key)
+        if serialized is None:
+            # racing monitors may both serialize, the first form is kept
+            serialized = entry.representations.setdefault(key, serializer.serialize(result))
+        return serialized
+
+
+SERIALIZATION_CACHE: SerializationCache = SerializationCache()
@@ -1,12 +1,20 @@
 """Command result json serializer."""
 
 import json
+from typing import Callable, Dict, Optional, Tuple
 
-from camel_converter import dict_to_camel
+from camel_converter import to_camel
 
+from ski_lift.core.command.codegen import (generate_json_function,
+                                           overrides_any)
 from ski_lift.core.command.result.object import CommandResult
-from ski_lift.core.command.result.serializer.python_dict import \
-    PythonDictResultSerializer
+from ski_lift.core.command.result.processor import RESULT_DISPATCH
+from ski_lift.core.command.result.serializer.python_dict import (
+    GENERATED_FOR, RESULT_NAMESPACE, PythonDictResultSerializer,
+    result_fields)
+
+# serializer class, result class, convert to camel -> generated function
+_generated: Dict[Tuple[type, type, bool], Optional[Callable[[CommandResult], bytes]]] = {}
 
 
 class JSONBytesResultSerializer(PythonDictResultSerializer):
@@ -21,10 +29,30 @@ class JSONBytesResultSerializer(PythonDictResultSerializer):
     
     
     def __init__(self, convert_to_camel: bool = True) -> None:
-        self._convert_to_camel: bool = convert_to_camel
+        super().__init__(convert_to_camel=convert_to_camel)
 
     def serialize(self, result: CommandResult) -> bytes:
-        command_dict: dict = super().serialize(result)
-        if self._convert_to_camel:
-            command_dict = dict_to_camel(command_dict)
-        return json.dumps(command_dict).encode('utf-8')
+        key: Tuple[type, type, bool] = (type(self), type(result), self._convert_to_camel)
+        generated = _generated[key] if key in _generated else self._generate_json(key)
+        if generated is not None:
+            return generated(result)
+        return json.dumps(super().serialize(result)).encode('utf-8')
+
+    @staticmethod
+    def _generate_json(key: Tuple[type, type, bool]) -> Optional[Callable[[CommandResult], bytes]]:
+        serializer_class, result_class, convert_to_camel = key
+        generated: Optional[Callable[[CommandResult], bytes]] = None
+        if (
+            result_class in RESULT_DISPATCH.handler_names
+            and not overrides_any(serializer_class, JSONBytesResultSerializer, GENERATED_FOR)
+        ):
+            generated = generate_json_function(
+                name=f'serialize_{result_class.__name__}',
+                argument='result',
+                prelude='command = result.command',
+                fields=result_fields(result_class),
+                convert_key=to_camel if convert_to_camel else str,
+                namespace=RESULT_NAMESPACE,
+            )
+        _generated[key] = generated
+        return generated
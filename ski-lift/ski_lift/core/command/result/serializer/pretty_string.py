@@ -3,9 +3,15 @@
 
 from dataclasses import dataclass
 from string import Template
-from typing import Optional
+from typing import Callable, Optional, Tuple
 
+from ski_lift.core.command.codegen import (TEXT, VALUE, SnakeNames,
+                                           TimeFormatter,
+                                           generate_text_function,
+                                           overrides_any,
+                                           template_to_fstring)
 from ski_lift.core.command.result.object import CommandResult
+from ski_lift.core.command.result.processor import RESULT_DISPATCH
 from ski_lift.core.command.result.serializer.base import BaseResultSerializer
 from ski_lift.core.utils import class_name_to_snake
 
@@ -44,6 +50,38 @@ class PrettyResultStringSerializer(BaseResultSerializer):
         self._config = config or DEFAULT_CONFIG
         self._template: Template = Template(self._config.template)
         self._arg_template: Template = Template(self._config.arg_template)
+        self._generated: Optional[Callable[[CommandResult], str]] = None
+        self._uses_generated: bool = not overrides_any(
+            type(self),
+            PrettyResultStringSerializer,
+            ('process_result', 'process_result_universally', *RESULT_DISPATCH.handler_names.values()),
+        )
+
+    @property
+    def format_key(self) -> Tuple[type, str, str, str]:
+        return (type(self), self._config.template, self._config.arg_template, self._config.time_format)
+
+    def serialize(self, result: CommandResult) -> str:
+        if not self._uses_generated or type(result) not in RESULT_DISPATCH.handler_names:
+            return super().serialize(result)
+        if self._generated is None:
+            self._generated = generate_text_function(
+                name='serialize_result',
+                argument='result',
+                prelude='command = result.command',
+                body=template_to_fstring(self._config.template, {
+                    'id': (VALUE, 'command.id'),
+                    'time': (TEXT, 'format_time(result.time)'),
+                    'user': (VALUE, 'command.user_card'),
+                    'outcome': (TEXT, 'result.outcome.name'),
+                    'exception': (TEXT, 'exception_name(result.exception)'),
+                }) + '\n',
+                namespace={
+                    'format_time': TimeFormatter(self._config.time_format),
+                    'exception_name': SnakeNames(),
+                },
+            )
+        return self._generated(result)
 
     def process_result(self, result: CommandResult) -> str:
         return super().process_result(result) + '\n'
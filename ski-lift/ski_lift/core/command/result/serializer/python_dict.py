@@ -1,15 +1,63 @@
 """Command result python dict serializer."""
 
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
+from camel_converter import dict_to_camel, to_camel, to_snake
+
+from ski_lift.core.command.codegen import (CONSTANT, OBJECT, TEXT, VALUE,
+                                           Field, SnakeNames,
+                                           generate_dict_function,
+                                           overrides_any)
 from ski_lift.core.command.result.object import (AbortCommandResult,
                                                  ChangeStateCommandResult,
                                                  CommandResult,
                                                  InsertCardCommandResult,
                                                  MessageReportCommandResult)
+from ski_lift.core.command.result.processor import RESULT_DISPATCH
 from ski_lift.core.command.result.serializer.base import BaseResultSerializer
 from ski_lift.core.utils import class_name_to_snake
 
+# fields of the `args` of the results, see `result_fields`
+RESULT_ARGS: Dict[type, Sequence[Field]] = {
+    InsertCardCommandResult: (('card_inserted', VALUE, 'command.card_to_insert'),),
+    ChangeStateCommandResult: (('new_state', TEXT, 'command.new_state.name'),),
+    AbortCommandResult: (('command_to_abort', VALUE, 'command.command_to_abort'),),
+    MessageReportCommandResult: (
+        ('severity', TEXT, 'command.severity.name'),
+        ('message', VALUE, 'command.message'),
+    ),
+}
+
+# names used by the expressions of `result_fields`
+RESULT_NAMESPACE: Dict[str, Any] = {'exception_name': SnakeNames(upper=True)}
+
+# functions which must not be overridden to use the generated functions
+GENERATED_FOR: Tuple[str, ...] = (
+    'process_result', 'process_result_universally', *RESULT_DISPATCH.handler_names.values(),
+)
+
+# serializer class, result class, convert to camel -> generated function
+_generated: Dict[Tuple[type, type, bool], Optional[Callable[[CommandResult], dict]]] = {}
+
+
+def result_fields(result_class: type) -> List[Field]:
+    """Fields of the serialized results of a class, in order.
+
+    Expressions refer to the result as `result` and to its command as
+    `command`.
+    """
+    fields: List[Field] = [
+        ('messageKind', CONSTANT, 'command'),
+        ('type', CONSTANT, to_snake(result_class.__name__.replace('CommandResult', ''))),
+        ('timestamp', TEXT, 'result.time.isoformat()'),
+        ('user', VALUE, 'command.user_card'),
+        ('outcome', TEXT, 'result.outcome.name'),
+        ('exception', TEXT, 'exception_name(result.exception)'),
+    ]
+    if result_class in RESULT_ARGS:
+        fields.append(('args', OBJECT, RESULT_ARGS[result_class]))
+    return fields
+
 
 class PythonDictResultSerializer(BaseResultSerializer):
     """Python dict descriptor serializer.
@@ -19,8 +67,46 @@ class PythonDictResultSerializer(BaseResultSerializer):
 
     This serializer was created specifically to match the structure of the
     rabbitMQ messages discussed previously.
+
+    Optionally the keys can be converted into camel case (from snake case).
     """
 
+    def __init__(self, convert_to_camel: bool = False) -> None:
+        self._convert_to_camel: bool = convert_to_camel
+
+    @property
+    def format_key(self) -> Tuple[type, bool]:
+        return (type(self), self._convert_to_camel)
+
+    def serialize(self, result: CommandResult) -> dict:
+        key: Tuple[type, type, bool] = (type(self), type(result), self._convert_to_camel)
+        generated = _generated[key] if key in _generated else self._generate(key)
+        if generated is not None:
+            return generated(result)
+        command_dict: dict = super().serialize(result)
+        if self._convert_to_camel:
+            command_dict = dict_to_camel(command_dict)
+        return command_dict
+
+    @staticmethod
+    def _generate(key: Tuple[type, type, bool]) -> Optional[Callable[[CommandResult], dict]]:
+        serializer_class, result_class, convert_to_camel = key
+        generated: Optional[Callable[[CommandResult], dict]] = None
+        if (
+            result_class in RESULT_DISPATCH.handler_names
+            and not overrides_any(serializer_class, PythonDictResultSerializer, GENERATED_FOR)
+        ):
+            generated = generate_dict_function(
+                name=f'serialize_{result_class.__name__}',
+                argument='result',
+                prelude='command = result.command',
+                fields=result_fields(result_class),
+                convert_key=to_camel if convert_to_camel else str,
+                namespace=RESULT_NAMESPACE,
+            )
+        _generated[key] = generated
+        return generated
+
     def process_result_universally(self, result: CommandResult) -> dict:
         return {
             'messageKind': 'command',
@@ -1,12 +1,17 @@
 """Controller implementation."""
 
+from typing import Optional
+
 from ski_lift.core.auth import BaseAuthorizer, CommandAuthorizable
 from ski_lift.core.command.descriptor.executor.delayed import \
     DelayedCommandExecutor
+from ski_lift.core.command.descriptor.executor.journal import \
+    DelayedCommandJournal
 from ski_lift.core.engine import Engine, EngineState
 from ski_lift.core.math.erlang_c import ErlangCModel
 from ski_lift.core.monitor.descriptor.descriptor_monitor import \
     CommandDescriptorMonitorSource
+from ski_lift.core.monitor.result.delivery import DeliveryPolicy
 from ski_lift.core.monitor.result.result_monitor import \
     CommandResultMonitorSource
 from ski_lift.core.remote.communicator import RemoteCommunicator
@@ -27,7 +32,9 @@ class Controller(
 
     The class itself is also a result and descriptor monitor source which means
     that commands and their results can be monitored via the registered
-    monitors.
+    monitors. Results are delivered to the monitors asynchronously according
+    to the `result_delivery` policy, the queued results are delivered on exit
+    before the remote communicator is stopped.
 
     Check the super classes for more information.
     """
@@ -39,13 +46,15 @@ class Controller(
         authorizer: BaseAuthorizer,
         remote_communicator: RemoteCommunicator,
         queue_status: ErlangCModel,
+        journal: Optional[DelayedCommandJournal] = None,
+        result_delivery: Optional[DeliveryPolicy] = None,
     ):
         self._lift_id = lift_id
         self._engine = engine
         self._remote_communicator = remote_communicator
         self._remote_communicator.set_controller(self)
         self._queue_status = queue_status
-        super().__init__(authorizer=authorizer)
+        super().__init__(authorizer=authorizer, journal=journal, result_delivery=result_delivery)
 
     def __enter__(self):
         super().__enter__()
@@ -54,6 +63,7 @@ class Controller(
     
     def __exit__(self, exc_type, exc_value, traceback):
         super().__exit__(exc_type, exc_value, traceback)
+        self.close_result_monitors()
         self._remote_communicator.stop()
         return False
 
@@ -1,10 +1,11 @@
 """Command descriptor monitor."""
 
 from functools import wraps
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
 
 from ski_lift.core.command.descriptor.object import CommandDescriptor
-from ski_lift.core.command.descriptor.processor import DescriptorProcessor
+from ski_lift.core.command.descriptor.processor import (
+    DESCRIPTOR_DISPATCH, DescriptorProcessor)
 
 
 class CommandDescriptorMonitor(DescriptorProcessor):
@@ -20,11 +21,46 @@ class CommandDescriptorMonitor(DescriptorProcessor):
     The `monitor_descriptor` function only exists to make a more fitting name for the
     context. The base `process_descriptor` function could have been used as
     well.
+
+    Monitors only receive the commands they are interested in, see
+    `subscribed_command_types`. Set `command_types` to declare them
+    explicitly.
     """
 
+    # command classes (and their subclasses) to receive, None means the
+    # classes of the overridden process functions
+    command_types: Optional[Tuple[type, ...]] = None
+
+    @classmethod
+    def subscribed_command_types(cls) -> FrozenSet[type]:
+        """Command classes delivered to the monitors of this class.
+
+        These are the subclasses of the `command_types`, or without those the
+        classes whose process function is overridden (every class if
+        `process_descriptor_universally`, `process_descriptor` or
+        `monitor_descriptor` is overridden). Commands of classes missing from
+        `DESCRIPTOR_DISPATCH` are delivered to every monitor.
+        """
+        if cls.command_types is not None:
+            return frozenset(
+                command_class for command_class in DESCRIPTOR_DISPATCH.handler_names
+                if issubclass(command_class, cls.command_types)
+            )
+        if (
+            cls.monitor_descriptor is not CommandDescriptorMonitor.monitor_descriptor
+            or cls.process_descriptor is not DescriptorProcessor.process_descriptor
+        ):
+            return frozenset(DESCRIPTOR_DISPATCH.handler_names)
+        return DESCRIPTOR_DISPATCH.handled_classes(
+            cls, ignored=CommandDescriptorMonitor.process_descriptor_universally,
+        )
+
     def monitor_descriptor(self, command: CommandDescriptor) -> None:
         self.process_descriptor(command)
 
+    def process_descriptor_universally(self, command: CommandDescriptor) -> Any:
+        pass
+
 
 class CommandDescriptorMonitorSource:
     """Command descriptor monitor source.
@@ -34,23 +70,41 @@ class CommandDescriptorMonitorSource:
     To trigger the monitoring for a given command you can use the
     `forward_command_descriptor` function manually or the
     `monitor_descriptor` decorator for automatic forwarding and monitoring.
+
+    Commands are forwarded only to the monitors subscribed to their class
+    (see `CommandDescriptorMonitor.subscribed_command_types`), looked up in an
+    index rebuilt on every registration.
     """
 
     def __init__(self, *args, **kwargs):
         self._descriptor_monitors: List[CommandDescriptorMonitor] = []
+        # command class -> subscribed monitors
+        self._descriptor_index: Dict[type, List[CommandDescriptorMonitor]] = {}
         super().__init__(*args, **kwargs)
 
     def register_descriptor_monitor(self, command_monitor: CommandDescriptorMonitor):
         self._descriptor_monitors.append(command_monitor)
+        self._index_descriptor_monitors()
 
     def remove_descriptor_monitor(self, command_monitor: CommandDescriptorMonitor):
         if command_monitor in self._descriptor_monitors:
             self._descriptor_monitors.remove(command_monitor)
+            self._index_descriptor_monitors()
 
     def forward_command_descriptor(self, command: CommandDescriptor):
-        for monitor in self._descriptor_monitors:
+        for monitor in self._descriptor_index.get(type(command), self._descriptor_monitors):
             monitor.monitor_descriptor(command)
 
+    def _index_descriptor_monitors(self) -> None:
+        # a new index is built so forwarding never sees a half updated one
+        subscriptions: List[Tuple[CommandDescriptorMonitor, FrozenSet[type]]] = [
+            (monitor, type(monitor).subscribed_command_types()) for monitor in self._descriptor_monitors
+        ]
+        self._descriptor_index = {
+            command_class: [monitor for monitor, types in subscriptions if command_class in types]
+            for command_class in DESCRIPTOR_DISPATCH.handler_names
+        }
+
 
 def monitor_descriptor(func: Callable[[CommandDescriptorMonitorSource, CommandDescriptor], Any]):
     """Monitor descriptor decorator.
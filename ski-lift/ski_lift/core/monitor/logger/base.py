@@ -1,15 +1,18 @@
 """Base command logger."""
 
 
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Optional
 
 from ski_lift.core.command.descriptor.object import CommandDescriptor
 from ski_lift.core.command.descriptor.serializer.base import \
     BaseDescriptorSerializer
 from ski_lift.core.command.result.object import CommandResult
 from ski_lift.core.command.result.serializer.base import BaseResultSerializer
+from ski_lift.core.command.result.serializer.cache import \
+    SERIALIZATION_CACHE
 from ski_lift.core.monitor.descriptor.descriptor_monitor import \
     CommandDescriptorMonitor
+from ski_lift.core.monitor.result.delivery import DeliveryPolicy
 from ski_lift.core.monitor.result.result_monitor import CommandResultMonitor
 
 if TYPE_CHECKING:
@@ -23,15 +26,17 @@ class BaseCommandLogger(CommandResultMonitor):
     log its commands and their results to a specified destination.
 
     It utilizes a result serializer that can be invoked via the
-    `serialize_result` function.
+    `serialize_result` function. Results are serialized through the
+    `SERIALIZATION_CACHE`, so loggers sharing a format serialize a result
+    once.
     """
 
 
     def __init__(self, result_serializer: BaseResultSerializer) -> None:
         self._result_serializer = result_serializer
 
-    def attach_to(self, controller: 'Controller') -> None:
-        controller.register_result_monitor(self)
+    def attach_to(self, controller: 'Controller', policy: Optional[DeliveryPolicy] = None) -> None:
+        controller.register_result_monitor(self, policy)
 
     def serialize_result(self, result: CommandResult) -> Any:
-        return self._result_serializer.serialize(result)
+        return SERIALIZATION_CACHE.serialize(self._result_serializer, result)
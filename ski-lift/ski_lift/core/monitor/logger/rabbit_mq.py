@@ -1,5 +1,6 @@
 """RabbitMQ command logger."""
 
+from typing import Any, Dict
 
 from ski_lift.core.command.descriptor.object import CommandDescriptor
 from ski_lift.core.command.descriptor.serializer.base import \
@@ -7,7 +8,9 @@ from ski_lift.core.command.descriptor.serializer.base import \
 from ski_lift.core.command.result.object import CommandResult
 from ski_lift.core.command.result.serializer.base import BaseResultSerializer
 from ski_lift.core.monitor.logger.base import BaseCommandLogger
+from ski_lift.core.remote.rabbitmq.lane import Lane
 from ski_lift.core.remote.rabbitmq.pika_producer import PikaProducer
+from ski_lift.core.remote.rabbitmq.publisher import Publisher
 
 
 class RabbitMQCommandLogger(BaseCommandLogger):
@@ -18,7 +21,11 @@ class RabbitMQCommandLogger(BaseCommandLogger):
 
     By default, it uses the routing key pattern
     `skilift.<lift_id>.logs.command.<outcome>`. Since the exchange is a topic,
-    this routing key supports various filtering options.
+    this routing key supports various filtering options. Command logs are
+    published on the highest priority lane.
+
+    Serializers producing bytes are published as they are, any other result
+    (e.g. a dict) is encoded by the producer's payload codec.
     """
 
     def __init__(
@@ -29,13 +36,24 @@ class RabbitMQCommandLogger(BaseCommandLogger):
     ) -> None:
         self._pika_producer: PikaProducer = pika_producer
         self._lift_id: str = lift_id
+        self._publishers: Dict[bool, Publisher] = {
+            is_successful: pika_producer.publisher(
+                f'skilift.{lift_id}.logs.command.{outcome}', headers={'lift_id': lift_id}, lane=Lane.COMMAND,
+            )
+            for is_successful, outcome in ((True, 'successful'), (False, 'failed'))
+        }
         super().__init__(result_serializer=result_serializer)
 
 
     def process_result_universally(self, result: CommandResult) -> None:
-        outcome: str = 'successful' if result.is_successful else 'failed'
-        self._pika_producer.publish_message(
-            routing_key=f'skilift.{self._lift_id}.logs.command.{outcome}',
-            message=self.serialize_result(result),
-            headers={'lift_id': self._lift_id}
-        )
+        publisher: Publisher = self._publishers[bool(result.is_successful)]
+        serialized: Any = self.serialize_result(result)
+        if isinstance(serialized, bytes):
+            self._pika_producer.publish_message(
+                routing_key=publisher.routing_key,
+                message=serialized,
+                headers=publisher.headers,
+                lane=Lane.COMMAND,
+            )
+        else:
+            publisher.publish(serialized)
@@ -0,0 +1,2 @@
+from .delivery import (SYNCHRONOUS_DELIVERY, DeliveryPolicy, MonitorWorker,
+                       OverflowPolicy)
@@ -0,0 +1,186 @@
+"""Result monitor delivery."""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum, auto
+from threading import Condition, Thread, current_thread
+from typing import TYPE_CHECKING, Deque, Optional, Tuple
+
+from ski_lift.core.command.result.object import CommandResult
+from ski_lift.core.command.result.serializer.cache import \
+    SERIALIZATION_CACHE
+
+if TYPE_CHECKING:
+    from ski_lift.core.monitor.result.result_monitor import \
+        CommandResultMonitor
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(Enum):
+    """What to do with a result when the queue of a monitor is full.
+
+    Block means the caller waits for a free place.
+    Drop oldest means the oldest queued result is dropped.
+    Sample means only every `sample_every`-th result arriving at a full queue
+    is queued (dropping the oldest one), the others are dropped.
+    """
+
+    BLOCK = auto()
+    DROP_OLDEST = auto()
+    SAMPLE = auto()
+
+
+@dataclass
+class DeliveryPolicy:
+    """Delivery policy of a result monitor.
+
+    Attributes:
+        max_pending (int): Maximum number of queued results, 0 means the
+            results are delivered synchronously by the caller.
+        overflow (OverflowPolicy): Handling of the results arriving at a
+            full queue.
+        sample_every (int): Sampling rate of the `SAMPLE` overflow policy.
+    """
+
+    max_pending: int = 1000
+    overflow: OverflowPolicy = OverflowPolicy.BLOCK
+    sample_every: int = 10
+
+
+SYNCHRONOUS_DELIVERY: DeliveryPolicy = DeliveryPolicy(max_pending=0)
+
+
+class MonitorWorker(object):
+    """Monitor worker.
+
+    Delivers results to a single monitor on its own thread, in the order they
+    were submitted, through a queue bounded according to the delivery policy.
+    Exceptions raised by the monitor are logged.
+
+    Results submitted as cached hold a reference in the `SERIALIZATION_CACHE`
+    until they are delivered or dropped.
+
+    `stop` delivers the queued results before returning, results submitted
+    after that (or with a synchronous policy) are delivered by the caller.
+    """
+
+    def __init__(self, monitor: 'CommandResultMonitor', policy: DeliveryPolicy, name: str = 'result-monitor'):
+        self._monitor: 'CommandResultMonitor' = monitor
+        self._policy: DeliveryPolicy = policy
+        self._queue: Deque[Tuple[CommandResult, bool]] = deque()
+        self._condition: Condition = Condition()
+        self._busy: bool = False
+        self._stopping: bool = policy.max_pending <= 0
+        self._overflow_count: int = 0
+        self._dropped_count: int = 0
+        self._thread: Optional[Thread] = None
+        if not self._stopping:
+            self._thread = Thread(target=self._work, name=name, daemon=True)
+            self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def monitor(self) -> 'CommandResultMonitor':
+        return self._monitor
+
+    @property
+    def dropped_count(self) -> int:
+        """Number of results dropped because the queue was full."""
+        return self._dropped_count
+
+    def submit(self, result: CommandResult, cached: bool = False) -> None:
+        """Queue a result for the monitor, or deliver it once stopped.
+
+        Args:
+            result (CommandResult): Result to deliver.
+            cached (bool): Whether the result is held in the
+                `SERIALIZATION_CACHE` by the caller, the worker then holds
+                its own reference while the result is queued.
+        """
+        if self._thread is None:
+            self._monitor.monitor_result(result)
+            return
+        with self._condition:
+            if not self._stopping:
+                if len(self._queue) >= self._policy.max_pending and not self._overflow(result):
+                    return
+                if not self._stopping:
+                    if cached:
+                        SERIALIZATION_CACHE.acquire(result)
+                    self._queue.append((result, cached))
+                    self._condition.notify_all()
+                    return
+            # keep the order of the results queued before stopping
+            while (self._queue or self._busy) and current_thread() is not self._thread:
+                self._condition.wait()
+        self._monitor.monitor_result(result)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the queued results are delivered.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Deliver the queued results and stop the thread."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not current_thread():
+            self._thread.join(timeout)
+
+    def _overflow(self, result: CommandResult) -> bool:
+        """Make room for a result in the full queue.
+
+        Must be called with the condition held.
+
+        Returns:
+            bool: Whether the result should be queued.
+        """
+        match self._policy.overflow:
+            case OverflowPolicy.BLOCK:
+                if current_thread() is not self._thread:
+                    self._condition.wait_for(
+                        lambda: len(self._queue) < self._policy.max_pending or self._stopping,
+                    )
+                return True
+            case OverflowPolicy.SAMPLE:
+                self._overflow_count += 1
+                if self._overflow_count % self._policy.sample_every:
+                    self._dropped_count += 1
+                    return False
+        self._drop_oldest()
+        return True
+
+    def _drop_oldest(self) -> None:
+        dropped, cached = self._queue.popleft()
+        self._dropped_count += 1
+        if cached:
+            SERIALIZATION_CACHE.release(dropped)
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue:
+                    return
+                result, cached = self._queue.popleft()
+                self._busy = True
+                self._condition.notify_all()
+            try:
+                self._monitor.monitor_result(result)
+            except Exception:
+                logger.exception('Monitoring the result of command %s failed.', result.command.id)
+            finally:
+                if cached:
+                    SERIALIZATION_CACHE.release(result)
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
@@ -1,11 +1,16 @@
 
 
 from functools import wraps
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
 
 from ski_lift.core.command.descriptor.object import CommandDescriptor
 from ski_lift.core.command.result.object import CommandResult
-from ski_lift.core.command.result.processor import ResultProcessor
+from ski_lift.core.command.result.processor import (RESULT_DISPATCH,
+                                                    ResultProcessor)
+from ski_lift.core.command.result.serializer.cache import \
+    SERIALIZATION_CACHE
+from ski_lift.core.monitor.result.delivery import (DeliveryPolicy,
+                                                   MonitorWorker)
 
 
 class CommandResultMonitor(ResultProcessor):
@@ -21,8 +26,37 @@ class CommandResultMonitor(ResultProcessor):
     The `monitor_result` function only exists to make a more fitting name for
     the context. The base `process_result` function could have been used as
     well.
+
+    Monitors only receive the results they are interested in, see
+    `subscribed_result_types`. Set `result_types` to declare them explicitly.
     """
 
+    # result classes (and their subclasses) to receive, None means the
+    # classes of the overridden process functions
+    result_types: Optional[Tuple[type, ...]] = None
+
+    @classmethod
+    def subscribed_result_types(cls) -> FrozenSet[type]:
+        """Result classes delivered to the monitors of this class.
+
+        These are the subclasses of the `result_types`, or without those the
+        classes whose process function is overridden (every class if
+        `process_result_universally`, `process_result` or `monitor_result` is
+        overridden). Results of classes missing from `RESULT_DISPATCH` are
+        delivered to every monitor.
+        """
+        if cls.result_types is not None:
+            return frozenset(
+                result_class for result_class in RESULT_DISPATCH.handler_names
+                if issubclass(result_class, cls.result_types)
+            )
+        if (
+            cls.monitor_result is not CommandResultMonitor.monitor_result
+            or cls.process_result is not ResultProcessor.process_result
+        ):
+            return frozenset(RESULT_DISPATCH.handler_names)
+        return RESULT_DISPATCH.handled_classes(cls, ignored=CommandResultMonitor.process_result_universally)
+
     def monitor_result(self, result: CommandResult) -> None:
         self.process_result(result)
 
@@ -38,22 +72,76 @@ class CommandResultMonitorSource:
     To trigger the monitoring for a given result you can use the
     `forward_command_result` function manually or the
     `monitor_result` decorator for automatic forwarding and monitoring.
+
+    Every monitor gets its own `MonitorWorker`, so results are delivered
+    asynchronously (keeping their order per monitor) and slow monitors do not
+    slow down the source. The queue size and overflow handling are set by the
+    `DeliveryPolicy` given on registration, or by the `result_delivery`
+    policy of the source. `close_result_monitors` delivers the queued results
+    and stops the workers.
+
+    Results are forwarded only to the monitors subscribed to their class
+    (see `CommandResultMonitor.subscribed_result_types`), looked up in an
+    index rebuilt on every registration, so the cost of forwarding depends on
+    the number of subscribers instead of all the monitors.
+
+    With several subscribers, the forwarded result is held in the
+    `SERIALIZATION_CACHE` until every one has received it, so monitors
+    serializing it in the same format share one serialization.
     """
 
-    def __init__(self, *args, **kwargs):
-        self._result_monitors: List[CommandResultMonitor] = []
+    def __init__(self, *args, result_delivery: Optional[DeliveryPolicy] = None, **kwargs):
+        self._result_delivery: DeliveryPolicy = result_delivery or DeliveryPolicy()
+        self._result_monitors: Dict[CommandResultMonitor, MonitorWorker] = {}
+        # result class -> workers of the subscribed monitors
+        self._result_index: Dict[type, List[MonitorWorker]] = {}
         super().__init__(*args, **kwargs)
 
-    def register_result_monitor(self, monitor: CommandResultMonitor):
-        self._result_monitors.append(monitor)
+    def register_result_monitor(self, monitor: CommandResultMonitor, policy: Optional[DeliveryPolicy] = None):
+        if monitor not in self._result_monitors:
+            self._result_monitors[monitor] = MonitorWorker(
+                monitor, policy or self._result_delivery, name=f'result-monitor-{type(monitor).__name__}',
+            )
+            self._index_result_monitors()
 
     def remove_result_monitor(self, monitor: CommandResultMonitor):
-        if monitor in self._result_monitors:
-            self._result_monitors.remove(monitor)
+        worker: Optional[MonitorWorker] = self._result_monitors.pop(monitor, None)
+        if worker is not None:
+            self._index_result_monitors()
+            worker.stop()
+
+    def close_result_monitors(self, timeout: Optional[float] = None):
+        """Deliver the queued results and stop the workers of the monitors.
+
+        Results forwarded afterwards are delivered synchronously.
+        """
+        for worker in list(self._result_monitors.values()):
+            worker.stop(timeout)
 
     def forward_command_result(self, result: CommandResult):
-        for monitor in self._result_monitors:
-            monitor.monitor_result(result)
+        workers: Optional[List[MonitorWorker]] = self._result_index.get(type(result))
+        if workers is None:
+            workers = list(self._result_monitors.values())
+        if len(workers) < 2:
+            for worker in workers:
+                worker.submit(result)
+            return
+        SERIALIZATION_CACHE.acquire(result)
+        try:
+            for worker in workers:
+                worker.submit(result, cached=True)
+        finally:
+            SERIALIZATION_CACHE.release(result)
+
+    def _index_result_monitors(self) -> None:
+        # a new index is built so forwarding never sees a half updated one
+        subscriptions: Dict[MonitorWorker, FrozenSet[type]] = {
+            worker: type(monitor).subscribed_result_types() for monitor, worker in self._result_monitors.items()
+        }
+        self._result_index = {
+            result_class: [worker for worker, types in subscriptions.items() if result_class in types]
+            for result_class in RESULT_DISPATCH.handler_names
+        }
 
 
 def monitor_result(func: Callable[[CommandResultMonitorSource, CommandDescriptor], CommandResult]):
@@ -1,12 +1,17 @@
 """RabbitMQ communicator."""
 
-import json
 from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
 from ski_lift.core.command.descriptor.object import \
     MessageReportCommandDescriptor
 from ski_lift.core.remote.communicator.base import RemoteCommunicator
+from ski_lift.core.remote.rabbitmq.lane import Lane
 from ski_lift.core.remote.rabbitmq.pika_producer import PikaProducer
+from ski_lift.core.remote.rabbitmq.publisher import Publisher
+
+if TYPE_CHECKING:
+    from ski_lift.core.controller import Controller
 
 
 class RabbitMQCommunicator(RemoteCommunicator):
@@ -22,12 +27,27 @@ class RabbitMQCommunicator(RemoteCommunicator):
         - status_update:
             - route: `skilift.<lift_id>.logs.status_update`
             - type: topic
+
+    The publisher handles of both routes are created once the controller (and
+    therefore the lift id) is known.
     """
 
     def __init__(self, producer: PikaProducer, *args, **kwargs) -> None:
         self._producer = producer
+        self._report_publisher: Optional[Publisher] = None
+        self._status_publisher: Optional[Publisher] = None
         super().__init__(*args, **kwargs)
 
+    def set_controller(self, controller: 'Controller') -> None:
+        super().set_controller(controller)
+        headers: dict = {'lift_id': self.lift_id}
+        self._report_publisher = self._producer.publisher(
+            f'skilift.{self.lift_id}.logs.message_report', headers=headers, lane=Lane.REPORT,
+        )
+        self._status_publisher = self._producer.publisher(
+            f'skilift.{self.lift_id}.logs.status_update', headers=headers, lane=Lane.STATUS,
+        )
+
     def send_message_report(self, report: MessageReportCommandDescriptor):
         message_dict = {
             'messageKind': 'messageReport',
@@ -37,11 +57,7 @@ class RabbitMQCommunicator(RemoteCommunicator):
             'message': report.message,
         }
 
-        self._producer.publish_message(
-            routing_key=f'skilift.{self.lift_id}.logs.message_report',
-            message=json.dumps(message_dict).encode('utf-8'),
-            headers={'lift_id': self.lift_id}
-        )
+        self._report_publisher.publish(message_dict)
 
     def send_status_update(self) -> None:
         message_dict = {
@@ -51,9 +67,5 @@ class RabbitMQCommunicator(RemoteCommunicator):
             'skiLiftState': self._controller.engine_state.name,
         }
 
-        self._producer.publish_message(
-            routing_key=f'skilift.{self.lift_id}.logs.status_update',
-            message=json.dumps(message_dict).encode('utf-8'),
-            headers={'lift_id': self.lift_id}
-        )
+        self._status_publisher.publish(message_dict)
     
\ No newline at end of file
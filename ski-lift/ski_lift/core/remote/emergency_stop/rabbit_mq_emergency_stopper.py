@@ -1,18 +1,21 @@
 """RabbitMQ based emergency stop handler."""
 
-import json
+import logging
 from datetime import datetime
 from typing import TYPE_CHECKING
 
 from camel_converter import dict_to_snake
 
 from ski_lift.core.remote.emergency_stop.base import RemoteEmergencyStopHandler
+from ski_lift.core.remote.rabbitmq.codec import decode_payload
 from ski_lift.core.remote.suggestion.suggestion import Suggestion
 
 if TYPE_CHECKING:
     from ski_lift.core.remote.rabbitmq.pika_consumer import PikaConsumer
     from ski_lift.core.view import BaseView
 
+logger = logging.getLogger(__name__)
+
 
 class RabbitMQEmergencyStopHandler(RemoteEmergencyStopHandler):
     """RabbitMQ emergency stopper.
@@ -30,6 +33,9 @@ class RabbitMQEmergencyStopHandler(RemoteEmergencyStopHandler):
             lift_id=view.lift_id,
             callback=self.emergency_stop_callback,
             observer=view,
+            # every emergency stop is acknowledged on its own
+            prefetch_count=1,
+            ack_batch_size=1,
         )
         super().__init__(view=view)
 
@@ -41,7 +47,7 @@ class RabbitMQEmergencyStopHandler(RemoteEmergencyStopHandler):
 
     def emergency_stop_callback(self, ch, method, properties, body):
         try:
-            message: dict = dict_to_snake(json.loads(body.decode('utf-8')))
+            message: dict = dict_to_snake(decode_payload(properties, body))
             abort_time: int = message.get('abort_time', 15)
             self._view.display_suggestion(
                 suggestion=Suggestion(
@@ -54,4 +60,4 @@ class RabbitMQEmergencyStopHandler(RemoteEmergencyStopHandler):
             )
             self._view.emergency_stop(delay=abort_time)
         except Exception:
-            pass
+            logger.exception('Handling a remote emergency stop failed.')
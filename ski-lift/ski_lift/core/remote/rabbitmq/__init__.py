@@ -1,3 +1,14 @@
 from .pika_consumer import PikaConsumer
 from .pika_producer import PikaProducer
-from .connection_event_observer import ConnectionEventObserver
\ No newline at end of file
+from .connection_event_observer import ConnectionEventObserver
+from .outbox import Outbox
+from .batching import BatchPolicy, MessageBatcher, unpack_batch
+from .codec import (CODEC_NAMES, JSONCodec, MsgPackCodec, PayloadCodec,
+                    decode_payload)
+from .connection_manager import ChannelClient, ConnectionManager
+from .lane import Lane
+from .lane_outbox import LaneOutbox
+from .publisher import Publisher
+from .endpoint_pool import BrokerEndpoint, CircuitBreaker, EndpointPool
+from .fake_broker import FakeBroker, FakeBrokerFaults
+from .dedup import DedupIndex
@@ -0,0 +1,47 @@
+"""Acknowledgement tracker."""
+
+from collections import deque
+from typing import Deque, Optional, Set, Tuple
+
+
+class AckTracker(object):
+    """Watermark acknowledgement tracker.
+
+    Messages handled out of order (e.g. by a `KeyedExecutor`) cannot be
+    acknowledged cumulatively right away: `multiple=True` would also ack the
+    older messages which are still being handled. The tracker keeps the
+    delivery tags in delivery order and only advances the watermark (the
+    highest tag whose predecessors are all handled) over completed tags.
+
+    Not thread-safe, meant to be used from a single IO loop thread.
+    """
+
+    def __init__(self):
+        self._delivered: Deque[int] = deque()
+        self._completed: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._delivered)
+
+    def deliver(self, delivery_tag: int) -> None:
+        self._delivered.append(delivery_tag)
+
+    def complete(self, delivery_tag: int) -> Tuple[Optional[int], int]:
+        """Mark a delivery as handled.
+
+        Returns:
+            Tuple[Optional[int], int]: The new watermark (None if it did not
+                move) and the number of deliveries it moved over.
+        """
+        self._completed.add(delivery_tag)
+        watermark: Optional[int] = None
+        count: int = 0
+        while self._delivered and self._delivered[0] in self._completed:
+            watermark = self._delivered.popleft()
+            self._completed.discard(watermark)
+            count += 1
+        return watermark, count
+
+    def reset(self) -> None:
+        self._delivered.clear()
+        self._completed.clear()
@@ -0,0 +1,44 @@
+"""Exponential backoff."""
+
+import math
+import random
+
+
+class ExponentialBackoff(object):
+    """Exponential backoff with full jitter.
+
+    Each call to `next_delay` returns a random delay between zero and the
+    current exponential ceiling (`initial * multiplier ^ attempts`, capped at
+    `maximum`). The first retry therefore happens within `initial` seconds,
+    while the randomization spreads out the reconnect attempts of many
+    clients which lost their connection at the same moment (e.g. every lift
+    after a broker restart).
+
+    Call `reset` once the connection is healthy again.
+    """
+
+    def __init__(self, initial: float = 0.5, maximum: float = 30, multiplier: float = 2):
+        self._initial: float = initial
+        self._maximum: float = maximum
+        self._multiplier: float = multiplier
+        self._attempts: int = 0
+        # the exponent stops growing with the ceiling, a large one would
+        # overflow during long outages
+        self._max_exponent: float = math.inf
+        if multiplier > 1:
+            self._max_exponent = (
+                max(0, math.ceil(math.log(maximum / initial, multiplier))) if 0 < initial < maximum else 0
+            )
+
+    @property
+    def attempts(self) -> int:
+        return self._attempts
+
+    def next_delay(self) -> float:
+        exponent: float = min(self._attempts, self._max_exponent)
+        ceiling: float = min(self._maximum, self._initial * self._multiplier ** exponent)
+        self._attempts += 1
+        return random.uniform(0, ceiling)
+
+    def reset(self) -> None:
+        self._attempts = 0
@@ -0,0 +1,118 @@
+"""Time and size windowed message batching."""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ski_lift.core.remote.rabbitmq.codec import (PayloadCodec, compress,
+                                                 decompress, get_codec)
+from ski_lift.core.remote.rabbitmq.outgoing_message import OutgoingMessage
+from ski_lift.core.remote.rabbitmq.routing import topic_matches
+
+# header carrying the number of messages packed into a batch envelope
+BATCH_HEADER: str = 'x-batch'
+
+
+@dataclass
+class BatchPolicy:
+    """Batch policy.
+
+    A batch is sent when it holds `max_messages` messages or when its oldest
+    message has been waiting for `max_delay_ms` milliseconds.
+
+    Attributes:
+        max_messages (int): Maximum number of messages in one envelope.
+        max_delay_ms (int): Maximum time a message waits for its batch.
+    """
+
+    max_messages: int = 50
+    max_delay_ms: int = 1000
+
+
+class MessageBatcher(object):
+    """Message batcher.
+
+    Collects messages per routing key and packs them into a single envelope
+    message. Only routing keys matching one of the configured topic patterns
+    are batched, everything else passes through untouched.
+
+    The envelope is an array of the original bodies, encoded with the codec
+    of the batched messages (see `PayloadCodec.join`) and compressed above
+    `compress_threshold` bytes. It is published with the routing key, headers
+    and content type of the batched messages plus the `x-batch` header holding
+    the number of packed messages. Consumers can unpack it with
+    `unpack_batch`.
+    """
+
+    def __init__(self, policies: Dict[str, BatchPolicy], compress_threshold: Optional[int] = None):
+        self._policies: Dict[str, BatchPolicy] = policies
+        self._compress_threshold: Optional[int] = compress_threshold
+        self._policy_cache: Dict[str, Optional[BatchPolicy]] = {}
+        self._batches: Dict[str, List[OutgoingMessage]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._batches)
+
+    def policy_for(self, routing_key: str) -> Optional[BatchPolicy]:
+        if routing_key not in self._policy_cache:
+            self._policy_cache[routing_key] = next(
+                (policy for pattern, policy in self._policies.items() if topic_matches(pattern, routing_key)),
+                None,
+            )
+        return self._policy_cache[routing_key]
+
+    def add(self, message: OutgoingMessage) -> Optional[OutgoingMessage]:
+        """Add a message to the batch of its routing key.
+
+        Returns:
+            Optional[OutgoingMessage]: The envelope if the batch became full.
+        """
+        batch: List[OutgoingMessage] = self._batches.setdefault(message.routing_key, [])
+        batch.append(message)
+        if len(batch) >= self.policy_for(message.routing_key).max_messages:
+            return self.flush(message.routing_key)
+        return None
+
+    def flush(self, routing_key: str) -> Optional[OutgoingMessage]:
+        """Pack the batch of the routing key into an envelope."""
+        batch: Optional[List[OutgoingMessage]] = self._batches.pop(routing_key, None)
+        if not batch:
+            return None
+        codec: PayloadCodec = get_codec(batch[0].content_type)
+        body, content_encoding = compress(
+            codec.join([decompress(message.body, message.content_encoding) for message in batch]),
+            self._compress_threshold,
+        )
+        return OutgoingMessage(
+            routing_key=routing_key,
+            body=body,
+            headers={**(batch[0].headers or {}), BATCH_HEADER: len(batch)},
+            content_type=batch[0].content_type,
+            content_encoding=content_encoding,
+            lane=batch[0].lane,
+        )
+
+    def drain(self) -> List[OutgoingMessage]:
+        """Remove and return every batched message without packing them."""
+        messages: List[OutgoingMessage] = [message for batch in self._batches.values() for message in batch]
+        self._batches.clear()
+        return messages
+
+
+def unpack_batch(properties, body: bytes) -> List[bytes]:
+    """Unpack a batch envelope into the bodies of the original messages.
+
+    The returned bodies are always decompressed. Messages which are not batch
+    envelopes are returned as a single body.
+
+    Args:
+        properties (pika.BasicProperties): Properties of the received message.
+        body (bytes): Body of the received message.
+
+    Returns:
+        List[bytes]: Bodies of the original messages.
+    """
+    body = decompress(body, getattr(properties, 'content_encoding', None))
+    headers: dict = getattr(properties, 'headers', None) or {}
+    if BATCH_HEADER not in headers:
+        return [body]
+    return get_codec(getattr(properties, 'content_type', None)).split(body)
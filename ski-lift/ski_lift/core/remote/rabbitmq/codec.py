@@ -0,0 +1,137 @@
+"""Payload codecs."""
+
+import json
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import msgpack
+
+# content encoding of zlib compressed bodies
+ZLIB_ENCODING: str = 'zlib'
+
+
+class PayloadCodec(ABC):
+    """Payload codec.
+
+    Converts message payloads (plain python objects, e.g. dicts) into message
+    bodies and back. Every codec is identified by the `content_type` that is
+    set on the published messages, consumers use it to pick the decoder.
+
+    Codecs also know how to pack several encoded bodies into one (see
+    `MessageBatcher`) and how to split such a body.
+    """
+
+    content_type: str
+
+    @abstractmethod
+    def encode(self, payload: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, body: bytes) -> Any:
+        pass
+
+    @abstractmethod
+    def join(self, bodies: List[bytes]) -> bytes:
+        """Pack encoded bodies into a single encoded array."""
+
+    @abstractmethod
+    def split(self, body: bytes) -> List[bytes]:
+        """Split an encoded array into the encoded bodies of its items."""
+
+
+class JSONCodec(PayloadCodec):
+    """JSON codec, the default wire format."""
+
+    content_type: str = 'application/json'
+
+    def encode(self, payload: Any) -> bytes:
+        return json.dumps(payload).encode('utf-8')
+
+    def decode(self, body: bytes) -> Any:
+        return json.loads(body)
+
+    def join(self, bodies: List[bytes]) -> bytes:
+        return b'[' + b','.join(bodies) + b']'
+
+    def split(self, body: bytes) -> List[bytes]:
+        return [self.encode(item) for item in self.decode(body)]
+
+
+class MsgPackCodec(PayloadCodec):
+    """MessagePack codec, compact binary wire format."""
+
+    content_type: str = 'application/msgpack'
+
+    def encode(self, payload: Any) -> bytes:
+        return msgpack.packb(payload)
+
+    def decode(self, body: bytes) -> Any:
+        return msgpack.unpackb(body)
+
+    def join(self, bodies: List[bytes]) -> bytes:
+        return msgpack.Packer().pack_array_header(len(bodies)) + b''.join(bodies)
+
+    def split(self, body: bytes) -> List[bytes]:
+        return [self.encode(item) for item in self.decode(body)]
+
+
+CODECS: Dict[str, PayloadCodec] = {
+    codec.content_type: codec for codec in (JSONCodec(), MsgPackCodec())
+}
+
+# codecs by their short name, used for configuration
+CODEC_NAMES: Dict[str, PayloadCodec] = {
+    'json': CODECS[JSONCodec.content_type],
+    'msgpack': CODECS[MsgPackCodec.content_type],
+}
+
+
+def get_codec(content_type: Optional[str]) -> PayloadCodec:
+    """Get the codec of a content type.
+
+    Messages without a content type, or with one that has no codec (e.g. the
+    `application/octet-stream` the web client publishes with), are treated
+    as JSON.
+    """
+    return CODECS.get(content_type) or CODECS[JSONCodec.content_type]
+
+
+def compress(body: bytes, threshold: Optional[int]) -> Tuple[bytes, Optional[str]]:
+    """Compress the body if it is larger than the threshold.
+
+    Returns:
+        Tuple[bytes, Optional[str]]: The body and its content encoding.
+    """
+    if threshold is None or len(body) <= threshold:
+        return body, None
+    return zlib.compress(body), ZLIB_ENCODING
+
+
+def decompress(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """Decompress the body according to its content encoding.
+
+    Raises:
+        ValueError: If the content encoding is not supported.
+    """
+    if content_encoding is None:
+        return body
+    if content_encoding == ZLIB_ENCODING:
+        return zlib.decompress(body)
+    raise ValueError(f'Unsupported content encoding: {content_encoding}')
+
+
+def decode_payload(properties, body: bytes) -> Any:
+    """Decode a received message according to its properties.
+
+    Args:
+        properties (pika.BasicProperties): Properties of the received message.
+        body (bytes): Body of the received message.
+
+    Returns:
+        Any: The decoded payload.
+    """
+    content_type: Optional[str] = getattr(properties, 'content_type', None)
+    content_encoding: Optional[str] = getattr(properties, 'content_encoding', None)
+    return get_codec(content_type).decode(decompress(body, content_encoding))
@@ -0,0 +1,274 @@
+"""Shared connection manager."""
+
+import functools
+import logging
+from threading import Lock, Thread
+from typing import Any, Dict, List, Optional, Union
+
+import pika
+from pika.adapters import SelectConnection
+from pika.adapters.select_connection import IOLoop
+from pika.channel import Channel
+from pika.connection import ConnectionParameters
+
+from ski_lift.core.remote.rabbitmq.backoff import ExponentialBackoff
+from ski_lift.core.remote.rabbitmq.endpoint_pool import BrokerEndpoint, EndpointPool
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelClient(object):
+    """Channel client.
+
+    Anything that needs a channel of a `ConnectionManager` (e.g. producers
+    and consumers). Every callback is invoked from the IO loop thread.
+    """
+
+    def on_channel_open(self, channel: Channel) -> None:
+        """Invoked when a (new) channel was opened for the client."""
+
+    def on_channel_closed(self, channel: Channel, reason: Exception) -> None:
+        """Invoked when the channel of the client was closed."""
+
+    def on_connection_error(self, error: Exception) -> None:
+        """Invoked when the connection could not be established."""
+
+    def on_connection_blocked(self) -> None:
+        """Invoked when the broker blocked the connection (resource alarm)."""
+
+    def on_connection_unblocked(self) -> None:
+        """Invoked when the broker unblocked the connection."""
+
+
+class ConnectionManager(object):
+    """Connection manager.
+
+    Owns a single `SelectConnection`, its IO loop and thread, and shares the
+    connection between several `ChannelClient`s, each of them gets its own
+    channel. Lost connections are re-established with exponential backoff
+    and a new channel is opened for every attached client. Channels closed by
+    the broker while the connection is still up are re-opened after
+    `channel_reopen_delay` seconds.
+
+    The connection parameters can also be an `EndpointPool` of several broker
+    nodes. Every connection attempt goes to the endpoint selected by the pool.
+    When an attempt fails or an open connection is lost, the endpoint is
+    reported as failed and the next available endpoint is tried right away,
+    so a failover takes at most one connect timeout (`stack_timeout` of the
+    parameters). Backoff is only applied once every endpoint failed.
+
+    `Connection.Blocked` and `Connection.Unblocked` notifications, sent by
+    the broker on memory or disk alarms, are forwarded to every client.
+
+    The manager is reference counted: clients `acquire` it when they start,
+    the IO loop runs until the last client `release`s it.
+    """
+
+    def __init__(
+        self,
+        connection_parameters: Union[ConnectionParameters, EndpointPool],
+        reconnect_backoff: Optional[ExponentialBackoff] = None,
+        channel_reopen_delay: float = 1,
+    ):
+        self._endpoints: EndpointPool = (
+            connection_parameters if isinstance(connection_parameters, EndpointPool)
+            else EndpointPool([connection_parameters])
+        )
+        self._endpoint: Optional[BrokerEndpoint] = None
+        self._reconnect_backoff: ExponentialBackoff = reconnect_backoff or ExponentialBackoff()
+        self._channel_reopen_delay: float = channel_reopen_delay
+        self._lock: Lock = Lock()
+        self._users: int = 0
+        self._thread: Thread = None
+        self._ioloop: IOLoop = None
+        self._connection: SelectConnection = None
+        self._stopping: bool = False
+        self._is_blocked: bool = False
+        self._reconnect_timer: Any = None
+        self._clients: List[ChannelClient] = []
+        # only accessed from the IO loop thread, None while a channel is opening
+        self._channels: Dict[ChannelClient, Optional[Channel]] = {}
+
+    @property
+    def ioloop(self) -> Optional[IOLoop]:
+        return self._ioloop
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connection is not None and self._connection.is_open
+
+    @property
+    def is_blocked(self) -> bool:
+        return self._is_blocked
+
+    @property
+    def endpoint(self) -> Optional[BrokerEndpoint]:
+        """The endpoint of the current (or last) connection."""
+        return self._endpoint
+
+    def acquire(self) -> None:
+        """Start the IO loop thread unless it is already running."""
+        with self._lock:
+            self._users += 1
+            if self._thread is None:
+                self._stopping = False
+                self._ioloop = IOLoop()
+                self._thread = Thread(target=self.run, daemon=True)
+                self._thread.start()
+
+    def release(self) -> None:
+        """Close the connection and stop the IO loop once the last user left."""
+        with self._lock:
+            self._users -= 1
+            if self._users > 0 or self._thread is None:
+                return
+            thread: Thread = self._thread
+            self._ioloop.add_callback_threadsafe(self.shutdown)
+        thread.join()
+        with self._lock:
+            if self._users == 0:
+                self._thread = None
+                self._ioloop = None
+
+    def call_threadsafe(self, callback) -> bool:
+        """Schedule a callback on the IO loop thread.
+
+        Returns:
+            bool: False if the IO loop is not running.
+        """
+        with self._lock:
+            if self._ioloop is None:
+                return False
+            self._ioloop.add_callback_threadsafe(callback)
+            return True
+
+    def attach(self, client: ChannelClient) -> None:
+        """Attach a client, a channel is opened for it when connected.
+
+        Thread-safe.
+        """
+        if not self.call_threadsafe(functools.partial(self._attach, client)):
+            with self._lock:
+                self._clients.append(client)
+
+    def detach(self, client: ChannelClient) -> None:
+        """Detach a client, its channel is no longer re-opened.
+
+        Must be called from the IO loop thread, the client is responsible for
+        closing its channel.
+        """
+        if client in self._clients:
+            self._clients.remove(client)
+
+    def run(self) -> None:
+        self._connection = self.connect()
+        self._ioloop.start()
+        self._ioloop.close()
+
+    def connect(self) -> SelectConnection:
+        self._endpoint = self._endpoints.select()
+        connection: SelectConnection = pika.SelectConnection(
+            self._endpoint.parameters,
+            on_open_callback=self.on_connection_open,
+            on_open_error_callback=self.on_connection_open_error,
+            on_close_callback=self.on_connection_closed,
+            custom_ioloop=self._ioloop,
+        )
+        connection.add_on_connection_blocked_callback(self.on_connection_blocked)
+        connection.add_on_connection_unblocked_callback(self.on_connection_unblocked)
+        return connection
+
+    def reconnect(self) -> None:
+        self._reconnect_timer = None
+        if not self._stopping:
+            self._connection = self.connect()
+
+    def schedule_reconnect(self) -> None:
+        if self._endpoints.has_available():
+            # fail over to the next endpoint right away
+            self._reconnect_timer = self._ioloop.call_later(0, self.reconnect)
+            return
+        delay: float = self._reconnect_backoff.next_delay()
+        logger.info('Reconnecting to RabbitMQ in %.1f seconds.', delay)
+        self._reconnect_timer = self._ioloop.call_later(delay, self.reconnect)
+
+    def on_connection_open(self, connection) -> None:
+        self._connection = connection
+        self._endpoint.record_success()
+        self._reconnect_backoff.reset()
+        for client in self._clients:
+            self.open_channel(client)
+
+    def on_connection_open_error(self, _unused_connection, err) -> None:
+        logger.info('Could not connect to RabbitMQ at %s: %s', self._endpoint, err)
+        self._endpoint.record_failure()
+        for client in self._clients:
+            client.on_connection_error(err)
+        if self._stopping:
+            self._ioloop.stop()
+        else:
+            self.schedule_reconnect()
+
+    def on_connection_closed(self, _unused_connection, reason) -> None:
+        # the channel close callbacks have already been invoked by pika
+        self._channels.clear()
+        if self._is_blocked:
+            self.on_connection_unblocked(None, None)
+        if self._stopping:
+            self._ioloop.stop()
+        else:
+            logger.info('Lost connection to RabbitMQ at %s: %s', self._endpoint, reason)
+            self._endpoint.record_failure()
+            self.schedule_reconnect()
+
+    def on_connection_blocked(self, _unused_connection, method_frame) -> None:
+        logger.info('RabbitMQ blocked the connection: %s', method_frame.method.reason)
+        self._is_blocked = True
+        for client in self._clients:
+            client.on_connection_blocked()
+
+    def on_connection_unblocked(self, _unused_connection, _unused_method_frame) -> None:
+        logger.info('RabbitMQ unblocked the connection.')
+        self._is_blocked = False
+        for client in self._clients:
+            client.on_connection_unblocked()
+
+    def open_channel(self, client: ChannelClient) -> None:
+        """Open a channel for the client unless it has one or is detached."""
+        if client not in self._clients or client in self._channels or not self.is_connected:
+            return
+        self._channels[client] = None
+        self._connection.channel(on_open_callback=functools.partial(self._on_channel_open, client))
+
+    def _on_channel_open(self, client: ChannelClient, channel: Channel) -> None:
+        if client not in self._clients:
+            # detached while the channel was opening
+            self._channels.pop(client, None)
+            channel.close()
+            return
+        self._channels[client] = channel
+        channel.add_on_close_callback(functools.partial(self._on_channel_closed, client))
+        client.on_channel_open(channel)
+
+    def _on_channel_closed(self, client: ChannelClient, channel: Channel, reason: Exception) -> None:
+        self._channels.pop(client, None)
+        client.on_channel_closed(channel, reason)
+        if not self._stopping and client in self._clients and self.is_connected:
+            logger.info('Channel closed by RabbitMQ: %s', reason)
+            self._ioloop.call_later(self._channel_reopen_delay, functools.partial(self.open_channel, client))
+
+    def _attach(self, client: ChannelClient) -> None:
+        if client not in self._clients:
+            self._clients.append(client)
+        self.open_channel(client)
+
+    def shutdown(self) -> None:
+        """Close the connection from the IO loop thread."""
+        self._stopping = True
+        if self._reconnect_timer is not None:
+            self._ioloop.remove_timeout(self._reconnect_timer)
+            self._reconnect_timer = None
+        if self._connection is None or self._connection.is_closed:
+            self._ioloop.stop()
+        elif not self._connection.is_closing:
+            self._connection.close()
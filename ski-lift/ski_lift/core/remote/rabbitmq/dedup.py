@@ -0,0 +1,62 @@
+"""Message deduplication."""
+
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class DedupIndex(object):
+    """Bounded, time expiring index of seen messages.
+
+    Remembers the keys of the last `max_size` messages for at most `ttl`
+    seconds, the least recently seen keys are evicted first. Used by
+    consumers to drop redelivered and re-sent copies of a message before its
+    body is decoded.
+
+    Not thread-safe, meant to be used from a single IO loop thread.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        self._max_size: int = max_size
+        self._ttl: float = ttl
+        # key -> time it was last seen, ordered by that time
+        self._seen: OrderedDict[Hashable, float] = OrderedDict()
+        self._duplicate_count: int = 0
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    @property
+    def duplicate_count(self) -> int:
+        return self._duplicate_count
+
+    def is_duplicate(self, key: Hashable) -> bool:
+        """Check whether the key was seen within the ttl and remember it."""
+        now: float = time.monotonic()
+        while self._seen and next(iter(self._seen.values())) <= now - self._ttl:
+            self._seen.popitem(last=False)
+        is_duplicate: bool = key in self._seen
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        if len(self._seen) > self._max_size:
+            self._seen.popitem(last=False)
+        if is_duplicate:
+            self._duplicate_count += 1
+        return is_duplicate
+
+    def forget(self, key: Hashable) -> None:
+        """Forget a key, e.g. of a message handed back to the broker."""
+        self._seen.pop(key, None)
+
+    def clear(self) -> None:
+        self._seen.clear()
+
+
+def message_key(properties) -> Optional[Hashable]:
+    """Get the deduplication key of a received message.
+
+    The message id stamped by the producer. Messages published without one
+    (e.g. by the web client) are never duplicates, the same body sent twice
+    is a repeated command.
+    """
+    return getattr(properties, 'message_id', None)
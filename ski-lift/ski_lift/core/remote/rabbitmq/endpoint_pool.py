@@ -0,0 +1,125 @@
+"""Broker endpoint pool."""
+
+import random
+import time
+from typing import List, Optional, Sequence
+
+from pika.connection import ConnectionParameters
+
+
+class CircuitBreaker(object):
+    """Circuit breaker of a broker endpoint.
+
+    Opens after `failure_threshold` consecutive failures, endpoints with an
+    open breaker are skipped for `reset_timeout` seconds. Afterwards the
+    breaker is half open: a single attempt is allowed, which closes the
+    breaker on success and opens it again on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 1, reset_timeout: float = 30):
+        self._failure_threshold: int = failure_threshold
+        self._reset_timeout: float = reset_timeout
+        self._failures: int = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    @property
+    def opened_at(self) -> Optional[float]:
+        return self._opened_at
+
+    def allows(self) -> bool:
+        """Whether an attempt is allowed (closed or half open)."""
+        return self._opened_at is None or time.monotonic() - self._opened_at >= self._reset_timeout
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+class BrokerEndpoint(object):
+    """Broker endpoint with its circuit breaker and health score.
+
+    The health score is an exponentially weighted moving average of the
+    outcomes of the connection attempts (1 success, 0 failure).
+    """
+
+    def __init__(self, parameters: ConnectionParameters, breaker: CircuitBreaker, smoothing: float = 0.5):
+        self.parameters: ConnectionParameters = parameters
+        self.breaker: CircuitBreaker = breaker
+        self._smoothing: float = smoothing
+        self._score: float = 1.0
+
+    def __repr__(self) -> str:
+        return f'{self.parameters.host}:{self.parameters.port}'
+
+    @property
+    def score(self) -> float:
+        return self._score
+
+    def record_success(self) -> None:
+        self._score += self._smoothing * (1.0 - self._score)
+        self.breaker.record_success()
+
+    def record_failure(self) -> None:
+        self._score -= self._smoothing * self._score
+        self.breaker.record_failure()
+
+
+class EndpointPool(object):
+    """Pool of broker endpoints (nodes of a RabbitMQ cluster).
+
+    `select` picks the healthiest endpoint whose circuit breaker allows an
+    attempt, ties are broken round-robin, starting at a random endpoint so
+    that lifts are spread over the nodes. If every breaker is open, the
+    endpoint which failed the longest time ago is returned, the caller is
+    expected to back off in that case (see `has_available`).
+
+    Only used from the IO loop thread, not thread-safe.
+    """
+
+    def __init__(
+        self,
+        parameters: Sequence[ConnectionParameters],
+        failure_threshold: int = 1,
+        reset_timeout: float = 30,
+    ):
+        if not parameters:
+            raise ValueError('At least one broker endpoint is required.')
+        self._endpoints: List[BrokerEndpoint] = [
+            BrokerEndpoint(p, CircuitBreaker(failure_threshold, reset_timeout)) for p in parameters
+        ]
+        self._next: int = random.randrange(len(self._endpoints))
+
+    def __len__(self) -> int:
+        return len(self._endpoints)
+
+    @property
+    def endpoints(self) -> List[BrokerEndpoint]:
+        return list(self._endpoints)
+
+    def has_available(self) -> bool:
+        """Whether any endpoint can be tried right away."""
+        return any(endpoint.breaker.allows() for endpoint in self._endpoints)
+
+    def select(self) -> BrokerEndpoint:
+        count: int = len(self._endpoints)
+        candidates: List[int] = [
+            (self._next + offset) % count
+            for offset in range(count)
+            if self._endpoints[(self._next + offset) % count].breaker.allows()
+        ]
+        if candidates:
+            # max keeps the first of equal scores, i.e. the round-robin order
+            index: int = max(candidates, key=lambda i: self._endpoints[i].score)
+        else:
+            index = min(range(count), key=lambda i: self._endpoints[i].breaker.opened_at)
+        self._next = (index + 1) % count
+        return self._endpoints[index]
@@ -0,0 +1,635 @@
+"""In-process fake AMQP broker.
+
+A minimal AMQP 0-9-1 broker that listens on a local TCP port and speaks just
+enough of the protocol for the pika based producer and consumers of the
+project to connect to it unchanged. It is meant for load testing and for
+exercising reconnect logic without a real RabbitMQ, for example:
+
+    python -m ski_lift.core.remote.rabbitmq.fake_broker --port 5672
+
+Supported: exchange declaration (direct, topic and fanout routing), server
+named and exclusive queues, queue expiry (`x-expires`), bindings, basic qos,
+consume, cancel, publish, ack, nack and reject, publisher confirms and
+`Connection.Blocked`. Like RabbitMQ, a blocked broker stops reading from
+the connections which publish until it is unblocked.
+
+Fault injection is available through `FakeBrokerFaults` (dropped and nacked
+publishes, artificial delays) and the `block_connections` and
+`disconnect_all` functions.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import struct
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Event, Thread
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from pika import frame, spec
+
+from ski_lift.core.remote.rabbitmq.routing import topic_matches
+
+FRAME_MAX: int = 131072
+CHANNEL_MAX: int = 2047
+
+
+@dataclass
+class FakeBrokerFaults:
+    """Fault injection settings of the fake broker.
+
+    Attributes:
+        drop_rate (float): Probability of a publish being confirmed but not
+            routed anywhere.
+        nack_rate (float): Probability of a publish being nacked in confirm
+            mode instead of routed.
+        delay (float): Seconds to wait before handling each incoming frame.
+    """
+
+    drop_rate: float = 0.0
+    nack_rate: float = 0.0
+    delay: float = 0.0
+
+
+@dataclass
+class FakeBrokerStats:
+    """Counters of the fake broker."""
+
+    connections: int = 0
+    published: int = 0
+    routed: int = 0
+    dropped: int = 0
+    nacked: int = 0
+    delivered: int = 0
+    acked: int = 0
+    throttled: int = 0
+    expired: int = 0
+
+
+@dataclass
+class _Message:
+    exchange: str
+    routing_key: str
+    properties: spec.BasicProperties
+    body: bytes
+    redelivered: bool = False
+
+
+@dataclass(eq=False)
+class _Consumer:
+    channel: '_Channel'
+    tag: str
+    no_ack: bool
+
+
+@dataclass
+class _Queue:
+    name: str
+    owner: Optional['_Connection'] = None
+    # seconds the queue may stay unused before it is deleted
+    expires: Optional[float] = None
+    expiry_timer: Optional[asyncio.TimerHandle] = None
+    messages: Deque[_Message] = field(default_factory=deque)
+    consumers: List[_Consumer] = field(default_factory=list)
+
+
+@dataclass
+class _Exchange:
+    name: str
+    type: str
+    bindings: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class _Channel:
+
+    def __init__(self, connection: '_Connection', number: int):
+        self.connection = connection
+        self.number = number
+        self.prefetch_count: int = 0
+        self.confirming: bool = False
+        self.publish_seq: int = 0
+        self.delivery_seq: int = 0
+        self.unacked: Dict[int, Tuple[_Queue, _Message]] = {}
+        self.consumers: Dict[str, _Consumer] = {}
+        self.last_queue: str = ''
+        self.pending_method: Optional[spec.Basic.Publish] = None
+        self.pending_header: Optional[frame.Header] = None
+        self.pending_body: List[bytes] = []
+
+    @property
+    def has_capacity(self) -> bool:
+        return self.prefetch_count == 0 or len(self.unacked) < self.prefetch_count
+
+
+class _Connection(asyncio.Protocol):
+
+    def __init__(self, broker: 'FakeBroker'):
+        self._broker = broker
+        self._buffer = bytearray()
+        self._incoming: asyncio.Queue = asyncio.Queue()
+        self.transport: Optional[asyncio.Transport] = None
+        self.channels: Dict[int, _Channel] = {}
+        self.supports_blocked: bool = False
+        self.frame_max: int = FRAME_MAX
+        self.closed: bool = False
+        self._worker: Optional[asyncio.Task] = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._broker._connections.add(self)
+        self._broker.stats.connections += 1
+        self._worker = asyncio.get_running_loop().create_task(self._process_incoming())
+
+    def connection_lost(self, exc):
+        self.closed = True
+        self._broker._connections.discard(self)
+        self._broker._drop_connection(self)
+        if self._worker is not None:
+            self._worker.cancel()
+
+    def data_received(self, data: bytes):
+        self._buffer.extend(data)
+        offset: int = 0
+        while True:
+            size: Optional[int] = self._frame_size(offset)
+            if size is None or offset + size > len(self._buffer):
+                break
+            # only the bytes of the frame are copied, not the rest of the buffer
+            consumed, decoded = frame.decode_frame(bytes(self._buffer[offset:offset + size]))
+            offset += consumed
+            self._incoming.put_nowait(decoded)
+        del self._buffer[:offset]
+
+    def _frame_size(self, offset: int) -> Optional[int]:
+        """Size of the frame starting at `offset`, None if its header is incomplete."""
+        if self._buffer[offset:offset + 4] == b'AMQP':
+            return 8
+        if len(self._buffer) < offset + spec.FRAME_HEADER_SIZE:
+            return None
+        payload_size: int = struct.unpack_from('>L', self._buffer, offset + 3)[0]
+        return spec.FRAME_HEADER_SIZE + payload_size + spec.FRAME_END_SIZE
+
+    async def _process_incoming(self):
+        while True:
+            decoded = await self._incoming.get()
+            if self._broker.faults.delay:
+                await asyncio.sleep(self._broker.faults.delay)
+            if self._broker.is_blocked and _is_publish(decoded):
+                await self._wait_unblocked()
+            if not self.closed:
+                self._broker._handle_frame(self, decoded)
+
+    async def _wait_unblocked(self) -> None:
+        """Stop reading from the connection until the broker is unblocked."""
+        self._broker.stats.throttled += 1
+        self.transport.pause_reading()
+        try:
+            await self._broker._unblocked.wait()
+        finally:
+            if not self.closed:
+                self.transport.resume_reading()
+
+    def send(self, *frames: frame.Frame) -> None:
+        if not self.closed:
+            self.transport.write(b''.join(f.marshal() for f in frames))
+
+    def send_method(self, channel_number: int, method) -> None:
+        self.send(frame.Method(channel_number, method))
+
+    def send_content(self, channel_number: int, method, properties, body: bytes) -> None:
+        frames = [frame.Method(channel_number, method), frame.Header(channel_number, len(body), properties)]
+        chunk_size = self.frame_max - spec.FRAME_HEADER_SIZE - spec.FRAME_END_SIZE
+        for offset in range(0, len(body), chunk_size):
+            frames.append(frame.Body(channel_number, body[offset:offset + chunk_size]))
+        self.send(*frames)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.transport.close()
+
+
+def _is_publish(decoded: frame.Frame) -> bool:
+    return isinstance(decoded, frame.Method) and isinstance(decoded.method, spec.Basic.Publish)
+
+
+class FakeBroker(object):
+    """Fake AMQP broker.
+
+    Runs an asyncio event loop in a background thread and accepts AMQP 0-9-1
+    connections on the given local port. Use it as a context manager or call
+    `start` and `stop` manually. Port 0 picks a free port, check the `port`
+    property after starting.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, faults: Optional[FakeBrokerFaults] = None):
+        self._host: str = host
+        self._port: int = port
+        self.faults: FakeBrokerFaults = faults or FakeBrokerFaults()
+        self.stats: FakeBrokerStats = FakeBrokerStats()
+        self._exchanges: Dict[str, _Exchange] = {'': _Exchange('', 'direct')}
+        self._queues: Dict[str, _Queue] = {}
+        self._connections: Set[_Connection] = set()
+        self._names = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[Thread] = None
+        self._blocked_reason: Optional[str] = None
+        self._unblocked: Optional[asyncio.Event] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.stop()
+        return False
+
+    @property
+    def host(self) -> str:
+        return self._host
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def is_blocked(self) -> bool:
+        return self._blocked_reason is not None
+
+    def start(self) -> None:
+        started = Event()
+        self._thread = Thread(target=self._run, args=(started, ), daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def disconnect_all(self) -> None:
+        """Forcefully drop every client connection."""
+        self._call(lambda: [connection.close() for connection in list(self._connections)])
+
+    def block_connections(self, reason: str = 'low on memory') -> None:
+        """Send `Connection.Blocked` to every client which supports it.
+
+        Publishes are not processed until `unblock_connections`.
+        """
+        def block():
+            self._blocked_reason = reason
+            self._unblocked.clear()
+            for connection in self._connections:
+                if connection.supports_blocked:
+                    connection.send_method(0, spec.Connection.Blocked(reason=reason))
+        self._call(block)
+
+    def unblock_connections(self) -> None:
+        """Send `Connection.Unblocked` to every client which supports it."""
+        def unblock():
+            self._blocked_reason = None
+            self._unblocked.set()
+            for connection in self._connections:
+                if connection.supports_blocked:
+                    connection.send_method(0, spec.Connection.Unblocked())
+        self._call(unblock)
+
+    def queue_depth(self, name: str) -> int:
+        queue: Optional[_Queue] = self._queues.get(name)
+        return len(queue.messages) if queue is not None else 0
+
+    def has_queue(self, name: str) -> bool:
+        return name in self._queues
+
+    def _call(self, func) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(func)
+
+    def _run(self, started: Event) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._unblocked = asyncio.Event()
+        if self._blocked_reason is None:
+            self._unblocked.set()
+        self._server = self._loop.run_until_complete(
+            self._loop.create_server(lambda: _Connection(self), self._host, self._port)
+        )
+        self._port = self._server.sockets[0].getsockname()[1]
+        started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            for connection in list(self._connections):
+                connection.close()
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+    def _handle_frame(self, connection: _Connection, decoded: frame.Frame) -> None:
+        if isinstance(decoded, frame.ProtocolHeader):
+            connection.send_method(0, spec.Connection.Start(
+                server_properties={
+                    'product': 'SnowPeak fake broker',
+                    'capabilities': {
+                        'publisher_confirms': True,
+                        'basic.nack': True,
+                        'consumer_cancel_notify': True,
+                        'connection.blocked': True,
+                        'exchange_exchange_bindings': True,
+                    },
+                },
+                mechanisms='PLAIN AMQPLAIN',
+                locales='en_US',
+            ))
+        elif isinstance(decoded, frame.Heartbeat):
+            connection.send(frame.Heartbeat())
+        elif isinstance(decoded, frame.Method):
+            self._handle_method(connection, decoded.channel_number, decoded.method)
+        elif isinstance(decoded, frame.Header):
+            channel = connection.channels[decoded.channel_number]
+            channel.pending_header = decoded
+            if decoded.body_size == 0:
+                self._complete_publish(channel)
+        elif isinstance(decoded, frame.Body):
+            channel = connection.channels[decoded.channel_number]
+            channel.pending_body.append(decoded.fragment)
+            if sum(map(len, channel.pending_body)) >= channel.pending_header.body_size:
+                self._complete_publish(channel)
+
+    def _handle_method(self, connection: _Connection, number: int, method) -> None:
+        channel: Optional[_Channel] = connection.channels.get(number)
+        match method:
+            case spec.Connection.StartOk():
+                capabilities = (method.client_properties or {}).get('capabilities', {})
+                connection.supports_blocked = bool(capabilities.get('connection.blocked'))
+                connection.send_method(0, spec.Connection.Tune(
+                    channel_max=CHANNEL_MAX, frame_max=FRAME_MAX, heartbeat=60,
+                ))
+            case spec.Connection.TuneOk():
+                connection.frame_max = method.frame_max or FRAME_MAX
+            case spec.Connection.Open():
+                connection.send_method(0, spec.Connection.OpenOk())
+                if self._blocked_reason is not None and connection.supports_blocked:
+                    connection.send_method(0, spec.Connection.Blocked(reason=self._blocked_reason))
+            case spec.Connection.Close():
+                connection.send_method(0, spec.Connection.CloseOk())
+                connection.close()
+            case spec.Connection.CloseOk():
+                connection.close()
+            case spec.Channel.Open():
+                connection.channels[number] = _Channel(connection, number)
+                connection.send_method(number, spec.Channel.OpenOk())
+            case spec.Channel.Close():
+                self._drop_channel(connection.channels.pop(number, None))
+                connection.send_method(number, spec.Channel.CloseOk())
+            case spec.Channel.CloseOk():
+                self._drop_channel(connection.channels.pop(number, None))
+            case spec.Confirm.Select():
+                channel.confirming = True
+                if not method.nowait:
+                    connection.send_method(number, spec.Confirm.SelectOk())
+            case spec.Exchange.Declare():
+                self._exchanges.setdefault(method.exchange, _Exchange(method.exchange, method.type))
+                if not method.nowait:
+                    connection.send_method(number, spec.Exchange.DeclareOk())
+            case spec.Queue.Declare():
+                self._declare_queue(connection, channel, method)
+            case spec.Queue.Bind():
+                queue_name = method.queue or channel.last_queue
+                exchange = self._exchanges.get(method.exchange)
+                if exchange is None or queue_name not in self._queues:
+                    self._close_channel(connection, number, 404, 'NOT_FOUND', method)
+                    return
+                if (queue_name, method.routing_key) not in exchange.bindings:
+                    exchange.bindings.append((queue_name, method.routing_key))
+                if not method.nowait:
+                    connection.send_method(number, spec.Queue.BindOk())
+            case spec.Basic.Qos():
+                channel.prefetch_count = method.prefetch_count
+                connection.send_method(number, spec.Basic.QosOk())
+                self._dispatch_all()
+            case spec.Basic.Consume():
+                queue: Optional[_Queue] = self._queues.get(method.queue or channel.last_queue)
+                if queue is None:
+                    self._close_channel(connection, number, 404, 'NOT_FOUND', method)
+                    return
+                tag = method.consumer_tag or f'ctag-{next(self._names)}'
+                consumer = _Consumer(channel, tag, method.no_ack)
+                channel.consumers[tag] = consumer
+                queue.consumers.append(consumer)
+                self._touch_queue(queue)
+                if not method.nowait:
+                    connection.send_method(number, spec.Basic.ConsumeOk(consumer_tag=tag))
+                self._dispatch(queue)
+            case spec.Basic.Cancel():
+                self._cancel_consumer(channel, method.consumer_tag)
+                if not method.nowait:
+                    connection.send_method(number, spec.Basic.CancelOk(consumer_tag=method.consumer_tag))
+            case spec.Basic.Publish():
+                channel.pending_method = method
+                channel.pending_header = None
+                channel.pending_body = []
+            case spec.Basic.Ack():
+                self._settle(channel, method.delivery_tag, method.multiple, requeue=None)
+            case spec.Basic.Nack():
+                self._settle(channel, method.delivery_tag, method.multiple, requeue=method.requeue)
+            case spec.Basic.Reject():
+                self._settle(channel, method.delivery_tag, False, requeue=method.requeue)
+
+    def _declare_queue(self, connection: _Connection, channel: _Channel, method: spec.Queue.Declare) -> None:
+        name: str = method.queue or f'amq.gen-{next(self._names)}'
+        queue: Optional[_Queue] = self._queues.get(name)
+        if queue is None:
+            if method.passive:
+                self._close_channel(connection, channel.number, 404, 'NOT_FOUND', method)
+                return
+            expires: Optional[int] = (method.arguments or {}).get('x-expires')
+            queue = self._queues[name] = _Queue(
+                name, connection if method.exclusive else None, expires / 1000 if expires else None,
+            )
+        self._touch_queue(queue)
+        channel.last_queue = name
+        if not method.nowait:
+            connection.send_method(channel.number, spec.Queue.DeclareOk(
+                queue=name, message_count=len(queue.messages), consumer_count=len(queue.consumers),
+            ))
+
+    def _touch_queue(self, queue: _Queue) -> None:
+        """Restart the expiry timer of a queue which was used."""
+        if queue.expiry_timer is not None:
+            queue.expiry_timer.cancel()
+            queue.expiry_timer = None
+        if queue.expires is not None and not queue.consumers:
+            queue.expiry_timer = self._loop.call_later(queue.expires, self._expire_queue, queue)
+
+    def _expire_queue(self, queue: _Queue) -> None:
+        if self._queues.get(queue.name) is queue and not queue.consumers:
+            self.stats.expired += 1
+            self._delete_queue(queue.name)
+
+    def _delete_queue(self, name: str) -> None:
+        queue: _Queue = self._queues.pop(name)
+        if queue.expiry_timer is not None:
+            queue.expiry_timer.cancel()
+        for exchange in self._exchanges.values():
+            exchange.bindings = [binding for binding in exchange.bindings if binding[0] != name]
+
+    def _close_channel(self, connection: _Connection, number: int, code: int, text: str, method) -> None:
+        self._drop_channel(connection.channels.get(number))
+        connection.send_method(number, spec.Channel.Close(
+            reply_code=code, reply_text=text, class_id=method.INDEX >> 16, method_id=method.INDEX & 0xFFFF,
+        ))
+
+    def _complete_publish(self, channel: _Channel) -> None:
+        method: spec.Basic.Publish = channel.pending_method
+        message = _Message(
+            exchange=method.exchange,
+            routing_key=method.routing_key,
+            properties=channel.pending_header.properties,
+            body=b''.join(channel.pending_body),
+        )
+        channel.pending_method, channel.pending_header, channel.pending_body = None, None, []
+        self.stats.published += 1
+        if channel.confirming:
+            channel.publish_seq += 1
+        if random.random() < self.faults.nack_rate and channel.confirming:
+            self.stats.nacked += 1
+            channel.connection.send_method(channel.number, spec.Basic.Nack(delivery_tag=channel.publish_seq))
+            return
+        if random.random() < self.faults.drop_rate:
+            self.stats.dropped += 1
+        else:
+            self._route(message)
+        if channel.confirming:
+            channel.connection.send_method(channel.number, spec.Basic.Ack(delivery_tag=channel.publish_seq))
+
+    def _route(self, message: _Message) -> None:
+        exchange: Optional[_Exchange] = self._exchanges.get(message.exchange)
+        if exchange is None:
+            return
+        if exchange.name == '':
+            targets = {message.routing_key}
+        else:
+            targets = {
+                queue_name
+                for queue_name, binding_key in exchange.bindings
+                if self._matches(exchange.type, binding_key, message.routing_key)
+            }
+        for queue_name in targets:
+            queue: Optional[_Queue] = self._queues.get(queue_name)
+            if queue is not None:
+                queue.messages.append(message)
+                self.stats.routed += 1
+                self._dispatch(queue)
+
+    @staticmethod
+    def _matches(exchange_type: str, binding_key: str, routing_key: str) -> bool:
+        if exchange_type == 'fanout':
+            return True
+        if exchange_type == 'direct':
+            return binding_key == routing_key
+        return topic_matches(binding_key, routing_key)
+
+    def _dispatch_all(self) -> None:
+        for queue in list(self._queues.values()):
+            self._dispatch(queue)
+
+    def _dispatch(self, queue: _Queue) -> None:
+        while queue.messages:
+            consumer: Optional[_Consumer] = next(
+                (consumer for consumer in queue.consumers if consumer.no_ack or consumer.channel.has_capacity),
+                None,
+            )
+            if consumer is None:
+                return
+            # round robin between consumers
+            queue.consumers.remove(consumer)
+            queue.consumers.append(consumer)
+            message: _Message = queue.messages.popleft()
+            channel: _Channel = consumer.channel
+            channel.delivery_seq += 1
+            if not consumer.no_ack:
+                channel.unacked[channel.delivery_seq] = (queue, message)
+            self.stats.delivered += 1
+            channel.connection.send_content(
+                channel.number,
+                spec.Basic.Deliver(
+                    consumer_tag=consumer.tag,
+                    delivery_tag=channel.delivery_seq,
+                    redelivered=message.redelivered,
+                    exchange=message.exchange,
+                    routing_key=message.routing_key,
+                ),
+                message.properties,
+                message.body,
+            )
+
+    def _settle(self, channel: _Channel, delivery_tag: int, multiple: bool, requeue: Optional[bool]) -> None:
+        if multiple:
+            tags = [tag for tag in channel.unacked if delivery_tag == 0 or tag <= delivery_tag]
+        else:
+            tags = [delivery_tag] if delivery_tag in channel.unacked else []
+        for tag in tags:
+            queue, message = channel.unacked.pop(tag)
+            if requeue:
+                message.redelivered = True
+                queue.messages.appendleft(message)
+            elif requeue is None:
+                self.stats.acked += 1
+        self._dispatch_all()
+
+    def _cancel_consumer(self, channel: _Channel, tag: str) -> None:
+        consumer: Optional[_Consumer] = channel.consumers.pop(tag, None)
+        for queue in self._queues.values():
+            if consumer in queue.consumers:
+                queue.consumers.remove(consumer)
+                self._touch_queue(queue)
+
+    def _drop_channel(self, channel: Optional[_Channel]) -> None:
+        if channel is None:
+            return
+        for tag in list(channel.consumers):
+            self._cancel_consumer(channel, tag)
+        for queue, message in channel.unacked.values():
+            message.redelivered = True
+            queue.messages.appendleft(message)
+        channel.unacked.clear()
+        self._dispatch_all()
+
+    def _drop_connection(self, connection: _Connection) -> None:
+        for channel in list(connection.channels.values()):
+            self._drop_channel(channel)
+        connection.channels.clear()
+        for name, queue in list(self._queues.items()):
+            if queue.owner is connection:
+                self._delete_queue(name)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Run a fake AMQP broker for load testing.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5672)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--nack-rate', type=float, default=0.0)
+    parser.add_argument('--delay', type=float, default=0.0)
+    args = parser.parse_args()
+    broker = FakeBroker(
+        host=args.host,
+        port=args.port,
+        faults=FakeBrokerFaults(drop_rate=args.drop_rate, nack_rate=args.nack_rate, delay=args.delay),
+    )
+    with broker:
+        print(f'Fake broker listening on {broker.host}:{broker.port}, CTRL + C to stop')
+        try:
+            Event().wait()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Keyed executor."""
+
+import logging
+from queue import Full, Queue
+from threading import Thread
+from typing import Any, Callable, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class KeyedExecutor(object):
+    """Keyed executor.
+
+    Runs tasks on a fixed pool of `max_workers` threads. Tasks submitted with
+    the same key always run on the same worker, so they are executed one
+    after the other in submission order, while tasks of different keys can
+    run in parallel.
+
+    Every worker has a queue of at most `max_pending` tasks, `submit` blocks
+    while the queue of the key is full, `try_submit` gives up instead.
+    """
+
+    def __init__(self, max_workers: int = 1, max_pending: int = 1000, name: str = 'keyed-executor'):
+        self._name: str = name
+        self._queues: List[Queue] = [Queue(maxsize=max_pending) for _ in range(max_workers)]
+        self._threads: List[Thread] = []
+
+    def start(self) -> None:
+        if not self._threads:
+            self._threads = [
+                Thread(target=self._work, args=(queue,), name=f'{self._name}-{index}', daemon=True)
+                for index, queue in enumerate(self._queues)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def submit(self, key: Hashable, task: Callable, *args: Any) -> None:
+        self._queues[hash(key) % len(self._queues)].put((task, args))
+
+    def try_submit(self, key: Hashable, task: Callable, *args: Any) -> bool:
+        """Submit a task unless the queue of the key is full.
+
+        Returns:
+            bool: Whether the task was submitted.
+        """
+        try:
+            self._queues[hash(key) % len(self._queues)].put_nowait((task, args))
+        except Full:
+            return False
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers once they have finished the submitted tasks."""
+        for queue in self._queues:
+            queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def _work(self, queue: Queue) -> None:
+        while True:
+            item: Optional[tuple] = queue.get()
+            if item is None:
+                return
+            task, args = item
+            try:
+                task(*args)
+            except Exception:
+                logger.info('Task of "%s" failed.', self._name, exc_info=True)
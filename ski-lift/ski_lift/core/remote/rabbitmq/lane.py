@@ -0,0 +1,13 @@
+"""Priority lanes."""
+
+from enum import IntEnum
+
+
+class Lane(IntEnum):
+    """Priority lanes of the outgoing traffic, lower value means higher
+    priority."""
+
+    COMMAND = 0
+    REPORT = 1
+    STATUS = 2
+    TELEMETRY = 3
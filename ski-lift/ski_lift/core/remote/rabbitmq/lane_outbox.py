@@ -0,0 +1,115 @@
+"""Outbox with priority lanes."""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from ski_lift.core.remote.rabbitmq.lane import Lane
+from ski_lift.core.remote.rabbitmq.outbox import Outbox
+from ski_lift.core.remote.rabbitmq.outgoing_message import OutgoingMessage
+from ski_lift.core.remote.rabbitmq.routing import topic_matches
+
+
+class LaneOutbox(object):
+    """Outbox with priority lanes.
+
+    Keeps a separate `Outbox` for every lane and always serves the highest
+    priority lane first. Messages are put into the outbox of their `lane`,
+    so the order is kept within each lane.
+
+    Routing keys matching one of the `conflate` topic patterns are kept in a
+    last-value cache instead: an undelivered message is replaced by the newer
+    message of the same routing key (keeping its place in the queue), so only
+    the latest value of each key is published. Re-queued (e.g. nacked)
+    messages of such keys are dropped if a newer value is already waiting.
+    Within a lane the messages of the outbox are served before the cached
+    values.
+
+    Has the same interface as `Outbox`, plus `shed` to drop the messages of
+    the lower lanes under backpressure.
+    """
+
+    def __init__(self, outboxes: Optional[Dict[Lane, Outbox]] = None, conflate: Iterable[str] = ()):
+        outboxes = outboxes or {}
+        self._outboxes: Dict[Lane, Outbox] = {
+            lane: outboxes[lane] if lane in outboxes else Outbox() for lane in Lane
+        }
+        self._latest: Dict[Lane, OrderedDict[str, OutgoingMessage]] = {lane: OrderedDict() for lane in Lane}
+        self._conflate_patterns: tuple = tuple(conflate)
+        self._conflate_cache: Dict[str, bool] = {}
+        self._conflated_count: int = 0
+
+    def __len__(self) -> int:
+        return sum(len(outbox) for outbox in self._outboxes.values()) + sum(map(len, self._latest.values()))
+
+    def __bool__(self) -> bool:
+        return any(self._outboxes.values()) or any(self._latest.values())
+
+    def __getitem__(self, lane: Lane) -> Outbox:
+        return self._outboxes[lane]
+
+    @property
+    def dropped_count(self) -> int:
+        return sum(outbox.dropped_count for outbox in self._outboxes.values())
+
+    @property
+    def conflated_count(self) -> int:
+        """Number of messages replaced by a newer one or dropped as stale."""
+        return self._conflated_count
+
+    def is_conflated(self, routing_key: str) -> bool:
+        if routing_key not in self._conflate_cache:
+            self._conflate_cache[routing_key] = any(
+                topic_matches(pattern, routing_key) for pattern in self._conflate_patterns
+            )
+        return self._conflate_cache[routing_key]
+
+    def append(self, message: OutgoingMessage) -> None:
+        if not self.is_conflated(message.routing_key):
+            self._outboxes[message.lane].append(message)
+            return
+        latest: OrderedDict[str, OutgoingMessage] = self._latest[message.lane]
+        if message.routing_key in latest:
+            self._conflated_count += 1
+        latest[message.routing_key] = message
+
+    def extendleft(self, messages: Iterable[OutgoingMessage]) -> None:
+        """Put messages back to the front of their lanes, like `deque.extendleft`."""
+        for message in messages:
+            if not self.is_conflated(message.routing_key):
+                self._outboxes[message.lane].extendleft((message,))
+                continue
+            latest: OrderedDict[str, OutgoingMessage] = self._latest[message.lane]
+            if message.routing_key in latest:
+                # a newer value is already waiting
+                self._conflated_count += 1
+                continue
+            latest[message.routing_key] = message
+            latest.move_to_end(message.routing_key, last=False)
+
+    def popleft(self) -> OutgoingMessage:
+        for lane, outbox in self._outboxes.items():
+            if outbox:
+                return outbox.popleft()
+            if self._latest[lane]:
+                return self._latest[lane].popitem(last=False)[1]
+        raise IndexError('pop from an empty outbox')
+
+    def shed(self, lanes: Iterable[Lane]) -> int:
+        """Drop every message of the given lanes.
+
+        Returns:
+            int: Number of dropped messages.
+        """
+        count: int = 0
+        for lane in lanes:
+            count += self._outboxes[lane].clear() + len(self._latest[lane])
+            self._latest[lane].clear()
+        return count
+
+    def close(self) -> None:
+        """Persist the cached values into their outboxes and close them."""
+        for lane, outbox in self._outboxes.items():
+            for message in self._latest[lane].values():
+                outbox.append(message)
+            self._latest[lane].clear()
+            outbox.close()
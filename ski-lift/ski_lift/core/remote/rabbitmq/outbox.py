@@ -0,0 +1,228 @@
+"""Bounded, disk spilling outbox."""
+
+import json
+import logging
+import mmap
+import os
+import struct
+from collections import deque
+from typing import Deque, Iterable, Optional
+
+from ski_lift.core.remote.rabbitmq.lane import Lane
+from ski_lift.core.remote.rabbitmq.outgoing_message import OutgoingMessage
+
+logger = logging.getLogger(__name__)
+
+# segment header: offset of the first unread record
+SEGMENT_HEADER = struct.Struct('>Q')
+# record header: length of the metadata and length of the body
+RECORD_HEADER = struct.Struct('>II')
+
+
+class Outbox(object):
+    """Bounded, disk spilling outbox.
+
+    FIFO queue of outgoing messages which keeps its memory usage flat no
+    matter how long the broker is unreachable.
+
+    The newest `memory_limit` messages are kept in memory. When the limit is
+    exceeded the oldest in-memory messages are spilled to an append-only
+    segment file, which is read back in order via `mmap`. Messages put back
+    to the front of the queue (e.g. nacked ones) are kept in a small in-memory
+    head which is always served first. The resulting order is:
+
+        head (re-queued) -> segment file (oldest) -> tail (newest)
+
+    The segment survives restarts: `close` compacts every remaining message
+    into the segment, and a new outbox created with the same path replays
+    them. After a crash the messages read since the last compaction may be
+    replayed again.
+
+    Without a `segment_path` the outbox does not spill, it drops the oldest
+    messages instead.
+    """
+
+    def __init__(self, memory_limit: int = 10000, segment_path: Optional[str] = None):
+        self._memory_limit: int = memory_limit
+        self._segment_path: Optional[str] = segment_path
+        self._head: Deque[OutgoingMessage] = deque()
+        self._tail: Deque[OutgoingMessage] = deque()
+        self._segment = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._read_offset: int = SEGMENT_HEADER.size
+        self._write_offset: int = SEGMENT_HEADER.size
+        self._spilled_count: int = 0
+        self._dropped_count: int = 0
+        if segment_path is not None:
+            self._open_segment()
+
+    def __len__(self) -> int:
+        return len(self._head) + self._spilled_count + len(self._tail)
+
+    def __bool__(self) -> bool:
+        return bool(self._head) or self._spilled_count > 0 or bool(self._tail)
+
+    @property
+    def spilled_count(self) -> int:
+        """Number of messages currently stored in the segment file."""
+        return self._spilled_count
+
+    @property
+    def dropped_count(self) -> int:
+        """Number of messages dropped because the outbox could not spill."""
+        return self._dropped_count
+
+    def append(self, message: OutgoingMessage) -> None:
+        self._tail.append(message)
+        if len(self._tail) > self._memory_limit:
+            self._spill(self._tail.popleft())
+
+    def extendleft(self, messages: Iterable[OutgoingMessage]) -> None:
+        """Put messages back to the front, like `deque.extendleft`."""
+        self._head.extendleft(messages)
+
+    def popleft(self) -> OutgoingMessage:
+        if self._head:
+            return self._head.popleft()
+        if self._spilled_count:
+            return self._read_record()
+        return self._tail.popleft()
+
+    def clear(self) -> int:
+        """Drop every message.
+
+        Returns:
+            int: Number of dropped messages.
+        """
+        count: int = len(self)
+        self._head.clear()
+        self._tail.clear()
+        if self._spilled_count:
+            self._spilled_count = 0
+            self._reset_segment()
+        return count
+
+    def close(self) -> None:
+        """Compact every remaining message into the segment file."""
+        if self._segment is None:
+            return
+        messages = list(self._head)
+        while self._spilled_count:
+            messages.append(self._read_record())
+        messages.extend(self._tail)
+        self._head.clear()
+        self._tail.clear()
+        self._close_mmap()
+        self._segment.close()
+        compacted_path: str = self._segment_path + '.compact'
+        with open(compacted_path, 'wb') as compacted:
+            compacted.write(SEGMENT_HEADER.pack(SEGMENT_HEADER.size))
+            for message in messages:
+                compacted.write(self._encode(message))
+        os.replace(compacted_path, self._segment_path)
+        self._segment = None
+
+    def _open_segment(self) -> None:
+        directory: str = os.path.dirname(self._segment_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        exists: bool = os.path.exists(self._segment_path) and os.path.getsize(self._segment_path) >= SEGMENT_HEADER.size
+        self._segment = open(self._segment_path, 'r+b' if exists else 'w+b')
+        if not exists:
+            self._reset_segment()
+            return
+        self._read_offset = SEGMENT_HEADER.unpack(self._segment.read(SEGMENT_HEADER.size))[0]
+        self._write_offset = self._segment.seek(0, os.SEEK_END)
+        self._spilled_count = self._count_records()
+        if self._spilled_count:
+            logger.info('Replaying %d message(s) from "%s".', self._spilled_count, self._segment_path)
+        else:
+            self._reset_segment()
+
+    def _count_records(self) -> int:
+        count: int = 0
+        offset: int = self._read_offset
+        self._map()
+        while offset + RECORD_HEADER.size <= self._write_offset:
+            meta_length, body_length = RECORD_HEADER.unpack_from(self._mmap, offset)
+            end: int = offset + RECORD_HEADER.size + meta_length + body_length
+            if end > self._write_offset:
+                # torn write at the end of the segment, ignore it
+                self._write_offset = offset
+                self._segment.truncate(offset)
+                self._close_mmap()
+                break
+            offset = end
+            count += 1
+        return count
+
+    def _reset_segment(self) -> None:
+        """Truncate the segment once every record has been read."""
+        self._close_mmap()
+        self._segment.seek(0)
+        self._segment.truncate()
+        self._segment.write(SEGMENT_HEADER.pack(SEGMENT_HEADER.size))
+        self._segment.flush()
+        self._read_offset = SEGMENT_HEADER.size
+        self._write_offset = SEGMENT_HEADER.size
+
+    def _spill(self, message: OutgoingMessage) -> None:
+        if self._segment is None:
+            self._dropped_count += 1
+            return
+        self._segment.seek(self._write_offset)
+        self._write_offset += self._segment.write(self._encode(message))
+        self._segment.flush()
+        self._spilled_count += 1
+
+    def _read_record(self) -> OutgoingMessage:
+        # records appended since the last mapping are only visible after remapping
+        if self._mmap is None or len(self._mmap) < self._read_offset + RECORD_HEADER.size:
+            self._map()
+        meta_length, body_length = RECORD_HEADER.unpack_from(self._mmap, self._read_offset)
+        meta_start: int = self._read_offset + RECORD_HEADER.size
+        body_start: int = meta_start + meta_length
+        if len(self._mmap) < body_start + body_length:
+            self._map()
+        message: OutgoingMessage = self._decode(
+            self._mmap[meta_start:body_start], self._mmap[body_start:body_start + body_length],
+        )
+        self._read_offset = body_start + body_length
+        self._spilled_count -= 1
+        if self._spilled_count == 0:
+            self._reset_segment()
+        return message
+
+    def _map(self) -> None:
+        self._close_mmap()
+        self._mmap = mmap.mmap(self._segment.fileno(), self._write_offset, access=mmap.ACCESS_READ)
+
+    def _close_mmap(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    @staticmethod
+    def _encode(message: OutgoingMessage) -> bytes:
+        meta: bytes = json.dumps({
+            'routing_key': message.routing_key,
+            'headers': message.headers,
+            'content_type': message.content_type,
+            'content_encoding': message.content_encoding,
+            'lane': message.lane,
+            'message_id': message.message_id,
+        }).encode('utf-8')
+        return RECORD_HEADER.pack(len(meta), len(message.body)) + meta + message.body
+
+    @staticmethod
+    def _decode(meta: bytes, body: bytes) -> OutgoingMessage:
+        meta_dict: dict = json.loads(meta)
+        return OutgoingMessage(
+            routing_key=meta_dict['routing_key'],
+            body=body,
+            headers=meta_dict.get('headers'),
+            content_type=meta_dict.get('content_type'),
+            content_encoding=meta_dict.get('content_encoding'),
+            lane=Lane(meta_dict.get('lane', Lane.REPORT)),
+            message_id=meta_dict.get('message_id'),
+        )
@@ -0,0 +1,38 @@
+"""Outgoing message."""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pika
+
+from ski_lift.core.remote.rabbitmq.lane import Lane
+
+
+@dataclass(slots=True)
+class OutgoingMessage:
+    """Outgoing message.
+
+    Simple data class describing a message waiting to be published by the
+    `PikaProducer`.
+
+    Attributes:
+        routing_key (str): Routing key the message is published with.
+        body (bytes): Body of the message.
+        headers (dict): Optional AMQP headers of the message.
+        content_type (str): Optional MIME type of the body, see `PayloadCodec`.
+        content_encoding (str): Optional encoding of the body, e.g. `zlib`.
+        lane (Lane): Priority lane of the message.
+        message_id (str): Id stamped by the producer on the first publish
+            attempt, kept when the message is published again.
+        properties (pika.BasicProperties): Optional prebuilt properties matching
+            the fields above (see `Publisher`), built on publish if missing.
+    """
+
+    routing_key: str
+    body: bytes
+    headers: Optional[dict] = None
+    content_type: Optional[str] = None
+    content_encoding: Optional[str] = None
+    lane: Lane = Lane.REPORT
+    message_id: Optional[str] = None
+    properties: Optional[pika.BasicProperties] = field(default=None, repr=False, compare=False)
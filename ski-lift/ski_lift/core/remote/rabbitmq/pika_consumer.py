@@ -3,27 +3,102 @@
 import functools
 import logging
 import time
-from threading import Event, Thread
-from typing import Callable, Optional, overload
+import uuid
+from dataclasses import dataclass
+from threading import Event
+from typing import Callable, Hashable, List, Optional, overload
 
-import pika
 from pika.connection import ConnectionParameters
+from pika.exceptions import ChannelClosedByBroker
 from pika.exchange_type import ExchangeType
+from ski_lift.core.remote.rabbitmq.ack_tracker import AckTracker
+from ski_lift.core.remote.rabbitmq.batching import unpack_batch
 from ski_lift.core.remote.rabbitmq.connection_event_observer import ConnectionEventObserver
+from ski_lift.core.remote.rabbitmq.connection_manager import (
+    ChannelClient, ConnectionManager)
+from ski_lift.core.remote.rabbitmq.dedup import DedupIndex, message_key
+from ski_lift.core.remote.rabbitmq.keyed_executor import KeyedExecutor
+
+
+@dataclass
+class ConsumerStatistics:
+    """Consumer recovery and deduplication statistics.
+
+    Times are measured in seconds from losing the channel (e.g. because the
+    connection dropped) until consuming restarted (recovery time) and until
+    the first message was delivered again (first delivery time).
+
+    Attributes:
+        reconnects (int): Number of times the channel had to be recovered.
+        last_recovery_time (float): Recovery time of the last reconnect.
+        max_recovery_time (float): Highest recovery time seen so far.
+        last_first_delivery_time (float): First delivery time of the last
+            reconnect.
+        duplicates (int): Number of dropped duplicate messages.
+        requeued (int): Number of messages handed back to the broker because
+            the executor was full.
+    """
+
+    reconnects: int = 0
+    last_recovery_time: float = 0.0
+    max_recovery_time: float = 0.0
+    last_first_delivery_time: float = 0.0
+    duplicates: int = 0
+    requeued: int = 0
+
+
+def _check_executor_settings(prefetch_count: int, auto_ack: bool) -> None:
+    """Callbacks on worker threads need the prefetch to bound the messages in flight.
+
+    Raises:
+        ValueError: With `auto_ack` or without a `prefetch_count`.
+    """
+    if auto_ack or not prefetch_count:
+        raise ValueError('Callbacks on worker threads require manual acknowledgements and a prefetch_count.')
 
 
-class ExampleConsumer(object):
+class ExampleConsumer(ChannelClient):
     """This is an example consumer that will handle unexpected interactions
     with RabbitMQ such as channel and connection closures.
 
-    If RabbitMQ closes the connection, this class will stop and indicate
-    that reconnection is necessary. You should look at the output, as
-    there are limited reasons why the connection may be closed, which
-    usually are tied to permission related issues or socket timeouts.
+    The consumer does not own a connection, it consumes on a channel handed
+    out by a `ConnectionManager`. Whenever the manager opens a (new) channel,
+    after a reconnect for example, consuming restarts. The queue has a stable
+    name and survives the connection for `queue_expires_ms`, so after a
+    reconnect it is reused as it is. The topology (exchange, queue, binding)
+    is declared with `nowait`, all declarations are sent together without
+    waiting for a round trip each. If the queue is gone (e.g. the broker was
+    restarted) the broker closes the channel and the topology is declared
+    again on a new one, right away once per successful consume. Failing
+    again before consuming restarted (e.g. a declaration is rejected) leaves
+    the reopen to the `channel_reopen_delay` of the manager.
 
     If the channel is closed, it will indicate a problem with one of the
     commands that were issued and that should surface in the output as well.
 
+    At most `prefetch_count` unacknowledged messages are delivered at the same
+    time. With `auto_ack` the broker considers messages acknowledged as soon
+    as they are delivered, otherwise they are acknowledged cumulatively
+    (`multiple=True`) after every `ack_batch_size` handled messages or
+    `ack_interval_ms` milliseconds after the first unacknowledged one,
+    whichever comes first.
+
+    With an `executor` the callbacks run on its worker threads instead of the
+    IO loop thread, so slow callbacks do not stall heartbeats and deliveries.
+    Messages are submitted with their routing key, which keeps their order
+    per routing key. Once a callback finished its message is handed back to
+    the IO loop thread and acknowledged up to the watermark of the
+    `AckTracker`. The IO loop never waits for the executor: the prefetch
+    bounds the messages in flight, so an executor requires manual
+    acknowledgements and a `prefetch_count`, and a message finding the
+    executor full anyway is nacked and requeued.
+
+    With a `dedup_size` the message ids of the last `dedup_size` messages are
+    remembered for `dedup_ttl` seconds in a `DedupIndex`. Duplicates, e.g.
+    redeliveries after a reconnect or messages re-published by a producer,
+    are acknowledged and dropped before the body is decoded. Messages without
+    a message id are always handled.
+
     """
 
     def __init__(
@@ -31,112 +106,73 @@ class ExampleConsumer(object):
         exchange: str,
         exchange_type: ExchangeType,
         route_key: str,
-        connection_parameters: ConnectionParameters,
         callback: callable,
         observer: Optional[ConnectionEventObserver] = None,
+        prefetch_count: int = 1,
+        auto_ack: bool = False,
+        ack_batch_size: int = 1,
+        ack_interval_ms: int = 100,
+        executor: Optional[KeyedExecutor] = None,
+        queue_name: Optional[str] = None,
+        queue_expires_ms: int = 60000,
+        dedup_size: int = 0,
+        dedup_ttl: float = 300,
     ):
+        if executor is not None:
+            _check_executor_settings(prefetch_count, auto_ack)
         self._exchange = exchange
         self._exchange_type = exchange_type
         self._route_key = route_key
-        self._connection_parameters = connection_parameters
+        self._queue: str = queue_name or f'{exchange}.{route_key}.{uuid.uuid4().hex[:8]}'
+        self._queue_expires_ms = queue_expires_ms
+        self._is_topology_declared = False
+        # set once consuming started, the declarations were accepted then
+        self._may_reopen_immediately = False
+        self._channel_lost_at: Optional[float] = None
+        self._is_first_delivery_pending = False
+        self._statistics = ConsumerStatistics()
 
-        self.should_reconnect = False
         self.was_consuming = False
 
-        self._connection = None
         self._channel = None
         self._closing = False
         self._consumer_tag = None
         self._consuming = False
-        # In production, experiment with higher prefetch values
-        # for higher consumer throughput
-        self._prefetch_count = 1
+        self._prefetch_count = prefetch_count
+        self._auto_ack = auto_ack
+        # the broker stops delivering once prefetch_count messages are unacked
+        self._ack_batch_size = min(ack_batch_size, prefetch_count) if prefetch_count else ack_batch_size
+        self._ack_interval_ms = ack_interval_ms
+        self._last_unacked_tag = None
+        self._unacked_count = 0
+        self._ack_timer = None
+        self._executor = executor
+        self._ack_tracker = AckTracker()
+        self._dedup: Optional[DedupIndex] = DedupIndex(dedup_size, dedup_ttl) if dedup_size else None
         self._callback: Callable = callback
         self._observer = observer
-        self._queue: str = None
-
-    def connect(self):
-        """This method connects to RabbitMQ, returning the connection handle.
-        When the connection is established, the on_connection_open method
-        will be invoked by pika.
+        self._closed: Event = Event()
+        self._manager: Optional[ConnectionManager] = None
 
-        :rtype: pika.SelectConnection
+    @property
+    def statistics(self) -> ConsumerStatistics:
+        return self._statistics
 
-        """
-        return pika.SelectConnection(
-            parameters=self._connection_parameters,
-            on_open_callback=self.on_connection_open,
-            on_open_error_callback=self.on_connection_open_error,
-            on_close_callback=self.on_connection_closed
-        )
+    def on_connection_error(self, error):
+        """This method is called by the connection manager if the connection
+        to RabbitMQ can't be established.
 
-    def close_connection(self):
-        self._consuming = False
-        if self._connection.is_closing or self._connection.is_closed:
-            pass
-        else:
-            self._connection.close()
-
-    def on_connection_open(self, _unused_connection):
-        """This method is called by pika once the connection to RabbitMQ has
-        been established. It passes the handle to the connection object in
-        case we need it, but in this case, we'll just mark it unused.
-
-        :param pika.SelectConnection _unused_connection: The connection
-
-        """
-        self.open_channel()
-
-    def on_connection_open_error(self, _unused_connection, err):
-        """This method is called by pika if the connection to RabbitMQ
-        can't be established.
-
-        :param pika.SelectConnection _unused_connection: The connection
-        :param Exception err: The error
+        :param Exception error: The error
 
         """
         if self._observer is not None:
             self._observer.on_connected_error(self._exchange)
-        self.reconnect()
-
-    def on_connection_closed(self, _unused_connection, reason):
-        """This method is invoked by pika when the connection to RabbitMQ is
-        closed unexpectedly. Since it is unexpected, we will reconnect to
-        RabbitMQ if it disconnects.
-
-        :param pika.connection.Connection connection: The closed connection obj
-        :param Exception reason: exception representing reason for loss of
-            connection.
-
-        """
-        self._channel = None
-        if self._closing:
-            self._connection.ioloop.stop()
-        else:
-            self.reconnect()
-
-    def reconnect(self):
-        """Will be invoked if the connection can't be opened or is
-        closed. Indicates that a reconnect is necessary then stops the
-        ioloop.
-
-        """
-        self.should_reconnect = True
-        self.stop()
-
-    def open_channel(self):
-        """Open a new channel with RabbitMQ by issuing the Channel.Open RPC
-        command. When RabbitMQ responds that the channel is open, the
-        on_channel_open callback will be invoked by pika.
-
-        """
-        self._connection.channel(on_open_callback=self.on_channel_open)
 
     def on_channel_open(self, channel):
         """This method is invoked by pika when the channel has been opened.
         The channel object is passed in so we can make use of it.
 
-        Since the channel is now open, we'll declare the exchange to use.
+        Since the channel is now open, we'll set up the topology.
 
         :param pika.channel.Channel channel: The channel object
 
@@ -144,22 +180,14 @@ class ExampleConsumer(object):
         if self._observer is not None:
             self._observer.on_connected(self._exchange)
         self._channel = channel
-        self.add_on_channel_close_callback()
-        self.setup_exchange(self._exchange)
-
-    def add_on_channel_close_callback(self):
-        """This method tells pika to call the on_channel_closed method if
-        RabbitMQ unexpectedly closes the channel.
-
-        """
-        self._channel.add_on_close_callback(self.on_channel_closed)
+        self.setup_topology()
 
     def on_channel_closed(self, channel, reason):
-        """Invoked by pika when RabbitMQ unexpectedly closes the channel.
+        """Invoked by the connection manager when the channel is closed.
         Channels are usually closed if you attempt to do something that
         violates the protocol, such as re-declare an exchange or queue with
-        different parameters. In this case, we'll close the connection
-        to shutdown the object.
+        different parameters, or when the connection is lost. Unless we are
+        closing, the manager will open a new channel.
 
         :param pika.channel.Channel: The closed channel
         :param Exception reason: why the channel was closed
@@ -167,80 +195,51 @@ class ExampleConsumer(object):
         """
         if self._observer is not None:
             self._observer.on_closed(self._exchange)
-        self.close_connection()
-
-    def setup_exchange(self, exchange_name):
-        """Setup the exchange on RabbitMQ by invoking the Exchange.Declare RPC
-        command. When it is complete, the on_exchange_declareok method will
-        be invoked by pika.
-
-        :param str|unicode exchange_name: The name of the exchange to declare
-
-        """
-        # Note: using functools.partial is not required, it is demonstrating
-        # how arbitrary data can be passed to the callback when it is called
-        cb = functools.partial(
-            self.on_exchange_declareok, userdata=exchange_name)
-        self._channel.exchange_declare(
-            exchange=self._exchange,
-            exchange_type=self._exchange_type,
-            callback=cb,
-            durable=True,
-        )
-
-    def on_exchange_declareok(self, _unused_frame, userdata):
-        """Invoked by pika when RabbitMQ has finished the Exchange.Declare RPC
-        command.
-
-        :param pika.Frame.Method unused_frame: Exchange.DeclareOk response frame
-        :param str|unicode userdata: Extra user data (exchange name)
-
-        """
-        self.setup_queue()
-
-    def setup_queue(self):
-        """Setup the queue on RabbitMQ by invoking the Queue.Declare RPC
-        command. When it is complete, the on_queue_declareok method will
-        be invoked by pika.
-
-        :param str|unicode queue_name: The name of the queue to declare.
-
-        """
-        self._channel.queue_declare(queue='', exclusive=True, callback=self.on_queue_declareok)
-
-    def on_queue_declareok(self, method_frame):
-        """Method invoked by pika when the Queue.Declare RPC call made in
-        setup_queue has completed. In this method we will bind the queue
-        and exchange together with the routing key by issuing the Queue.Bind
-        RPC command. When this command is complete, the on_bindok method will
-        be invoked by pika.
-
-        :param pika.frame.Method _unused_frame: The Queue.DeclareOk frame
-        :param str|unicode userdata: Extra user data (queue name)
-
-        """
-        self._queue = method_frame.method.queue
-        self._channel.queue_bind(
-            self._queue,
-            self._exchange,
-            routing_key=self._route_key,
-            callback=self.on_bindok)
-
-    def on_bindok(self, _unused_frame):
-        """Invoked by pika when the Queue.Bind method has completed. At this
-        point we will set the prefetch count for the channel.
-
-        :param pika.frame.Method _unused_frame: The Queue.BindOk response frame
-        :param str|unicode userdata: Extra user data (queue name)
+        self._channel = None
+        self._consuming = False
+        # unacknowledged messages are redelivered by the broker
+        self._reset_acks()
+        self._ack_tracker.reset()
+        if self._closing:
+            self._closed.set()
+            return
+        if self._channel_lost_at is None:
+            self._channel_lost_at = time.monotonic()
+        if isinstance(reason, ChannelClosedByBroker) and self._is_topology_declared:
+            # most likely the queue is gone, declare everything on a new channel
+            self._is_topology_declared = False
+            if self._may_reopen_immediately:
+                self._may_reopen_immediately = False
+                self._manager.open_channel(self)
+
+    def setup_topology(self):
+        """Declare the exchange, the queue and the binding unless they were
+        declared already. The declarations use nowait (no callback), so they
+        are sent right after each other and the prefetch is set up without
+        waiting for them.
 
         """
+        if not self._is_topology_declared:
+            self._channel.exchange_declare(
+                exchange=self._exchange,
+                exchange_type=self._exchange_type,
+                durable=True,
+            )
+            self._channel.queue_declare(
+                queue=self._queue,
+                arguments={'x-expires': self._queue_expires_ms},
+            )
+            self._channel.queue_bind(
+                self._queue,
+                self._exchange,
+                routing_key=self._route_key,
+            )
+            self._is_topology_declared = True
         self.set_qos()
 
     def set_qos(self):
-        """This method sets up the consumer prefetch to only be delivered
-        one message at a time. The consumer must acknowledge this message
-        before RabbitMQ will deliver another one. You should experiment
-        with different prefetch values to achieve desired performance.
+        """This method sets up the consumer prefetch, at most prefetch_count
+        messages are delivered before the consumer has to acknowledge them.
 
         """
         self._channel.basic_qos(prefetch_count=self._prefetch_count, callback=self.on_basic_qos_ok)
@@ -266,10 +265,27 @@ class ExampleConsumer(object):
 
         """
         self.add_on_cancel_callback()
-        self._consumer_tag = self._channel.basic_consume(self._queue, self.on_message)
+        self._consumer_tag = self._channel.basic_consume(
+            self._queue, self.on_message, auto_ack=self._auto_ack, callback=self.on_consumeok,
+        )
         self.was_consuming = True
         self._consuming = True
 
+    def on_consumeok(self, _unused_frame):
+        """Invoked by pika when RabbitMQ confirmed the Basic.Consume RPC
+        command. Records the recovery time if the channel was lost before.
+
+        :param pika.frame.Method _unused_frame: The Basic.ConsumeOk frame
+
+        """
+        self._may_reopen_immediately = True
+        if self._channel_lost_at is not None:
+            recovery_time = time.monotonic() - self._channel_lost_at
+            self._statistics.reconnects += 1
+            self._statistics.last_recovery_time = recovery_time
+            self._statistics.max_recovery_time = max(self._statistics.max_recovery_time, recovery_time)
+            self._is_first_delivery_pending = True
+
     def add_on_cancel_callback(self):
         """Add a callback that will be invoked if RabbitMQ cancels the consumer
         for some reason. If RabbitMQ does cancel the consumer,
@@ -285,6 +301,8 @@ class ExampleConsumer(object):
         :param pika.frame.Method method_frame: The Basic.Cancel frame
 
         """
+        # the queue was most likely deleted
+        self._is_topology_declared = False
         self._channel.close()
 
     def on_message(self, channel, basic_deliver, properties, body):
@@ -295,23 +313,134 @@ class ExampleConsumer(object):
         instance of BasicProperties with the message properties and the body
         is the message that was sent.
 
+        Batch envelopes are unpacked and the callback is invoked for each of
+        the packed messages. Bodies are passed to the callback decompressed,
+        so the content encoding is cleared from the properties.
+
         :param pika.channel.Channel _unused_channel: The channel object
         :param pika.Spec.Basic.Deliver: basic_deliver method
         :param pika.Spec.BasicProperties: properties
         :param bytes body: The message body
 
         """
-        self._callback(channel, basic_deliver, properties, body)
-        self.acknowledge_message(basic_deliver.delivery_tag)
+        if self._is_first_delivery_pending:
+            self._is_first_delivery_pending = False
+            self._statistics.last_first_delivery_time = time.monotonic() - self._channel_lost_at
+        self._channel_lost_at = None
+        key: Optional[Hashable] = message_key(properties) if self._dedup is not None else None
+        if key is not None and self._dedup.is_duplicate(key):
+            self.drop_duplicate(channel, basic_deliver.delivery_tag)
+            return
+        bodies: List[bytes] = unpack_batch(properties, body)
+        properties.content_encoding = None
+        if self._executor is None:
+            self.handle_message(channel, basic_deliver, properties, bodies)
+            if not self._auto_ack:
+                self.acknowledge_message(basic_deliver.delivery_tag)
+            return
+        if not self._executor.try_submit(
+            basic_deliver.routing_key, self.handle_message_in_worker, channel, basic_deliver, properties, bodies
+        ):
+            self.requeue_message(channel, basic_deliver.delivery_tag, key)
+            return
+        # workers hand their messages back through the IO loop, so the
+        # delivery is tracked before its completion can arrive
+        self._ack_tracker.deliver(basic_deliver.delivery_tag)
+
+    def requeue_message(self, channel, delivery_tag, key):
+        """Hand a message back to the broker without handling it.
+
+        :param pika.channel.Channel channel: The channel of the delivery
+        :param int delivery_tag: The delivery tag from the Basic.Deliver frame
+        :param key: The deduplication key of the message, if any
 
-    def acknowledge_message(self, delivery_tag):
-        """Acknowledge the message delivery from RabbitMQ by sending a
-        Basic.Ack RPC method for the delivery tag.
+        """
+        self._statistics.requeued += 1
+        if key is not None:
+            self._dedup.forget(key)
+        channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
 
+    def drop_duplicate(self, channel, delivery_tag):
+        """Acknowledge a duplicate message without handling it.
+
+        :param pika.channel.Channel channel: The channel of the delivery
         :param int delivery_tag: The delivery tag from the Basic.Deliver frame
 
         """
-        self._channel.basic_ack(delivery_tag)
+        self._statistics.duplicates += 1
+        if self._auto_ack:
+            return
+        if self._executor is None:
+            self.acknowledge_message(delivery_tag)
+        else:
+            self._ack_tracker.deliver(delivery_tag)
+            self.on_message_handled(channel, delivery_tag)
+
+    def handle_message(self, channel, basic_deliver, properties, bodies):
+        """Invoke the callback for each body of the delivered message."""
+        for message_body in bodies:
+            self._callback(channel, basic_deliver, properties, message_body)
+
+    def handle_message_in_worker(self, channel, basic_deliver, properties, bodies):
+        """Invoke the callback on a worker thread of the executor, then hand
+        the message back to the IO loop thread to be acknowledged.
+
+        """
+        try:
+            self.handle_message(channel, basic_deliver, properties, bodies)
+        finally:
+            if not self._auto_ack:
+                self._manager.call_threadsafe(
+                    functools.partial(self.on_message_handled, channel, basic_deliver.delivery_tag)
+                )
+
+    def on_message_handled(self, channel, delivery_tag):
+        """Invoked on the IO loop thread once the callback of a message
+        finished. Acknowledges every message up to the new watermark.
+
+        :param pika.channel.Channel channel: The channel of the delivery
+        :param int delivery_tag: The delivery tag from the Basic.Deliver frame
+
+        """
+        if channel is not self._channel:
+            # the channel was closed in the meantime, the broker redelivers
+            return
+        watermark, count = self._ack_tracker.complete(delivery_tag)
+        if count:
+            self.acknowledge_message(watermark, count)
+
+    def acknowledge_message(self, delivery_tag, count=1):
+        """Acknowledge the message delivery from RabbitMQ. Acks are batched,
+        the Basic.Ack RPC method is only sent once ack_batch_size messages
+        are waiting for it or when the ack timer fires.
+
+        :param int delivery_tag: The delivery tag from the Basic.Deliver frame
+        :param int count: Number of messages acknowledged by the delivery tag
+
+        """
+        self._last_unacked_tag = delivery_tag
+        self._unacked_count += count
+        if self._unacked_count >= self._ack_batch_size:
+            self.flush_acks()
+        elif self._ack_timer is None:
+            self._ack_timer = self._manager.ioloop.call_later(self._ack_interval_ms / 1000, self.flush_acks)
+
+    def flush_acks(self):
+        """Acknowledge every handled message with a single Basic.Ack RPC
+        method (multiple=True acks everything up to the delivery tag).
+
+        """
+        if self._unacked_count and self._channel is not None and self._channel.is_open:
+            self._channel.basic_ack(self._last_unacked_tag, multiple=self._unacked_count > 1)
+        self._reset_acks()
+
+    def _reset_acks(self):
+        # the ack tracker is kept, callbacks of later deliveries may still run
+        if self._ack_timer is not None:
+            self._manager.ioloop.remove_timeout(self._ack_timer)
+            self._ack_timer = None
+        self._last_unacked_tag = None
+        self._unacked_count = 0
 
     def stop_consuming(self):
         """Tell RabbitMQ that you would like to stop consuming by sending the
@@ -319,6 +448,7 @@ class ExampleConsumer(object):
 
         """
         if self._channel:
+            self.flush_acks()
             cb = functools.partial(
                 self.on_cancelok, userdata=self._consumer_tag)
             self._channel.basic_cancel(self._consumer_tag, cb)
@@ -343,36 +473,47 @@ class ExampleConsumer(object):
         """
         self._channel.close()
 
-    def run(self):
-        """Run the example consumer by connecting to RabbitMQ and then
-        starting the IOLoop to block and allow the SelectConnection to operate.
+    def attach_to(self, manager: ConnectionManager):
+        """Attach the consumer to a connection manager, a channel is opened
+        as soon as the manager is connected.
 
         """
-        self._connection = self.connect()
-        self._connection.ioloop.start()
+        self._manager = manager
+        self._closing = False
+        self._closed.clear()
+        manager.attach(self)
 
     def stop(self):
-        """Cleanly shutdown the connection to RabbitMQ by stopping the consumer
-        with RabbitMQ. When RabbitMQ confirms the cancellation, on_cancelok
-        will be invoked by pika, which will then closing the channel and
-        connection. The IOLoop is started again because this method is invoked
-        when CTRL-C is pressed raising a KeyboardInterrupt exception. This
-        exception stops the IOLoop which needs to be running for pika to
-        communicate with RabbitMQ. All of the commands issued prior to starting
-        the IOLoop will be buffered but not processed.
+        """Cleanly shutdown the consumer by stopping it with RabbitMQ. When
+        RabbitMQ confirms the cancellation, on_cancelok will be invoked by
+        pika, which will then close the channel. Must be invoked from the IO
+        loop thread, use `wait_until_closed` to wait for the channel to close.
 
         """
         if not self._closing:
             self._closing = True
+            self._manager.detach(self)
             if self._consuming:
                 self.stop_consuming()
-            elif self._connection is not None:
-                self._connection.ioloop.stop()
+            elif self._channel is not None and self._channel.is_open:
+                self.close_channel()
+            elif self._channel is None:
+                self._closed.set()
+
+    def wait_until_closed(self):
+        self._closed.wait()
 
 
 class PikaConsumer(object):
-    """This is an example consumer that will reconnect if the nested
-    ExampleConsumer indicates that a reconnect is necessary.
+    """Consumer which runs an ExampleConsumer on the channel of a connection
+    manager. The connection can be shared with other consumers and producers,
+    without a `connection_manager` the consumer creates its own one from the
+    `connection_parameters`.
+
+    Callbacks run on `callback_workers` worker threads (ordered per routing
+    key), 0 runs them inline on the IO loop thread. Worker threads require
+    manual acknowledgements and a `prefetch_count`. Duplicate messages are
+    dropped if `dedup_size` is set, see `ExampleConsumer`.
 
     """
 
@@ -381,58 +522,69 @@ class PikaConsumer(object):
         exchange: str,
         exchange_type: ExchangeType,
         route_key: str,
-        connection_parameters: ConnectionParameters,
+        connection_parameters: Optional[ConnectionParameters],
         callback: Callable,
         observer: Optional[ConnectionEventObserver] = None,
+        connection_manager: Optional[ConnectionManager] = None,
+        prefetch_count: int = 1,
+        auto_ack: bool = False,
+        ack_batch_size: int = 1,
+        ack_interval_ms: int = 100,
+        callback_workers: int = 1,
+        dedup_size: int = 0,
+        dedup_ttl: float = 300,
     ):
-        self._reconnect_delay = 0
-    
+        if callback_workers:
+            _check_executor_settings(prefetch_count, auto_ack)
         self._exchange = exchange
         self._exchange_type = exchange_type
         self._route_key = route_key
-        self._connection_parameters = connection_parameters
         self._callback = callback
         self._observer = observer
-
-        self._consumer = ExampleConsumer(exchange, exchange_type, route_key, connection_parameters, callback, observer)
-        self._thread = None
-        self._stop_event = None
+        self._prefetch_count = prefetch_count
+        self._auto_ack = auto_ack
+        self._ack_batch_size = ack_batch_size
+        self._ack_interval_ms = ack_interval_ms
+        self._callback_workers = callback_workers
+        self._dedup_size = dedup_size
+        self._dedup_ttl = dedup_ttl
+        self._executor: Optional[KeyedExecutor] = None
+        self._manager: ConnectionManager = connection_manager or ConnectionManager(connection_parameters)
+
+        self._consumer = None
+
+    @property
+    def statistics(self) -> Optional[ConsumerStatistics]:
+        return self._consumer.statistics if self._consumer is not None else None
 
     def start(self):
-        if self._thread is None:
-            self._thread = Thread(target=self.run)
-            self._stop_event = Event()
-            self._thread.start()
-
-    def stop(self):
-        self._stop_event.set()
-        self._consumer.stop()
-        self._thread.join()
-        self._thread = None
-
-    def run(self):
-        while not self._stop_event.is_set():
-            try:
-                self._consumer.run()
-            except KeyboardInterrupt:
-                self._consumer.stop()
-                break
-            self._maybe_reconnect()
-
-    def _maybe_reconnect(self):
-        if self._consumer.should_reconnect:
-            self._consumer.stop()
-            reconnect_delay = self._get_reconnect_delay()
-            time.sleep(reconnect_delay)
+        if self._consumer is None:
+            if self._callback_workers:
+                self._executor = KeyedExecutor(
+                    max_workers=self._callback_workers,
+                    max_pending=max(self._prefetch_count, 1) * 2,
+                    name=f'{self._exchange}-callbacks',
+                )
+                self._executor.start()
             self._consumer = ExampleConsumer(
-                self._exchange, self._exchange_type, self._route_key, self._connection_parameters, self._callback, self._observer
+                self._exchange, self._exchange_type, self._route_key, self._callback, self._observer,
+                prefetch_count=self._prefetch_count,
+                auto_ack=self._auto_ack,
+                ack_batch_size=self._ack_batch_size,
+                ack_interval_ms=self._ack_interval_ms,
+                executor=self._executor,
+                dedup_size=self._dedup_size,
+                dedup_ttl=self._dedup_ttl,
             )
+            self._consumer.attach_to(self._manager)
+            self._manager.acquire()
 
-    def _get_reconnect_delay(self):
-        if self._consumer.was_consuming:
-            self._reconnect_delay = 0
-        else:
-            self._reconnect_delay += 1
-        if self._reconnect_delay > 30:
-            self._reconnect_delay = 30
-        return self._reconnect_delay
+    def stop(self):
+        if self._consumer is not None:
+            if self._manager.call_threadsafe(self._consumer.stop):
+                self._consumer.wait_until_closed()
+            self._manager.release()
+            self._consumer = None
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -1,34 +1,188 @@
 import logging
-from threading import Event, Thread
-from time import sleep
-from typing import Any, List, Optional, Tuple
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from threading import Event, Lock
+from typing import Any, Deque, Dict, FrozenSet, Iterable, Optional, Tuple
 
 import pika
-from pika.adapters import SelectConnection
+from pika.adapters.select_connection import IOLoop
 from pika.channel import Channel
 from pika.connection import ConnectionParameters
 from pika.exchange_type import ExchangeType
 
+from ski_lift.core.remote.rabbitmq.backoff import ExponentialBackoff
+from ski_lift.core.remote.rabbitmq.batching import (BATCH_HEADER, BatchPolicy,
+                                                    MessageBatcher)
+from ski_lift.core.remote.rabbitmq.codec import (JSONCodec, PayloadCodec,
+                                                 compress)
+from ski_lift.core.remote.rabbitmq.connection_manager import (
+    ChannelClient, ConnectionManager)
+from ski_lift.core.remote.rabbitmq.lane import Lane
+from ski_lift.core.remote.rabbitmq.lane_outbox import LaneOutbox
+from ski_lift.core.remote.rabbitmq.outgoing_message import OutgoingMessage
+from ski_lift.core.remote.rabbitmq.publisher import Publisher
+from ski_lift.core.remote.rabbitmq.routing import topic_matches
+from ski_lift.core.remote.rabbitmq.token_bucket import TokenBucket
+
 logger = logging.getLogger(__name__)
 
 
-class PikaProducer(object):
-    """."""
+@dataclass
+class ConfirmStatistics:
+    """Publisher confirm statistics.
+
+    Latencies are measured in seconds between publishing a message and
+    receiving the broker's confirmation (ack or nack) for it.
+
+    Attributes:
+        acked (int): Number of messages acknowledged by the broker.
+        nacked (int): Number of messages rejected by the broker.
+        requeued (int): Number of unconfirmed messages re-queued because the
+            channel was closed before the confirmation arrived.
+        last_latency (float): Confirm latency of the last confirmed message.
+        max_latency (float): Highest confirm latency seen so far.
+        total_latency (float): Sum of all confirm latencies.
+    """
+
+    acked: int = 0
+    nacked: int = 0
+    requeued: int = 0
+    last_latency: float = 0.0
+    max_latency: float = 0.0
+    total_latency: float = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        confirmed: int = self.acked + self.nacked
+        return self.total_latency / confirmed if confirmed else 0.0
+
+    def record(self, latency: float, acked: bool) -> None:
+        if acked:
+            self.acked += 1
+        else:
+            self.nacked += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+
+
+class PikaProducer(ChannelClient):
+    """Pika producer.
+
+    Asynchronous producer publishing on a channel of a `ConnectionManager`.
+    The connection can be shared with other producers and consumers, without
+    a `connection_manager` the producer creates its own one from the
+    `connection_parameters`.
+
+    The pika connection and its channels are not thread-safe, therefore only
+    the IO loop thread is allowed to touch them. `publish_message` can be
+    called from any thread: it only appends the message to the thread-safe
+    publish queue and wakes up the IO loop via `add_callback_threadsafe`. The
+    IO loop then drains the queue in batches of `publish_batch_size` messages
+    and yields back to the loop between batches.
+
+    Messages which cannot be published because the channel is not open are
+    kept in the pending messages and are sent once the channel is ready again.
+    The pending messages are stored in a `LaneOutbox`: every message belongs
+    to a priority `Lane` and higher lanes are always published first. Each
+    lane has a bounded `Outbox`, which spills older messages to disk during
+    long outages and is closed (persisted) together with the producer.
+
+    While the broker blocks the connection (memory or disk alarm) nothing is
+    published, and the messages of the `shed_lanes` (status updates and
+    telemetry by default) are dropped, so commands and reports go out first
+    once the connection is unblocked.
+
+    Every message is stamped with a unique `message_id` on its first publish
+    attempt and keeps it when it is published again, so consumers can drop
+    the copies (see `DedupIndex`).
+
+    Publisher confirms are tracked by delivery tag. At most `max_unconfirmed`
+    messages can wait for their confirmation at the same time, publishing
+    pauses until the broker catches up. Nacked messages, as well as the ones
+    left unconfirmed when the channel closes, are put back to the front of the
+    pending messages so they are published again. Confirm latencies are
+    collected in `confirm_statistics`.
+
+    Lost connections are re-established by the connection manager with
+    exponential backoff and jitter, so lifts do not reconnect in lockstep
+    after a broker restart. Once the channel is ready the backlog of pending
+    messages is flushed right away, paced by a token bucket of `publish_rate`
+    messages per second until it first empties. Later messages are published
+    without rate limiting. Both go out in chunks that yield back to the IO
+    loop in between.
+
+    Optionally messages can be batched per routing key: `batch_policies` maps
+    topic patterns to `BatchPolicy` objects, matching messages are packed into
+    a single envelope (see `MessageBatcher`) when the batch is full or its
+    time window has passed.
+
+    `publish_payload` encodes payloads with the codec selected by the routing
+    key: `codecs` maps topic patterns to `PayloadCodec` objects, unmatched
+    routing keys use JSON. Bodies larger than `compress_threshold` bytes are
+    compressed with zlib. The content type and encoding are set on the message
+    properties, so consumers can pick the decoder (see `decode_payload`).
+    Hot paths should publish through a `publisher` handle, which caches the
+    codec and message properties of its routing key.
+    """
 
     def __init__(
         self,
         exchange: str,
         exchange_type: ExchangeType,
-        connection_parameters: ConnectionParameters,
+        connection_parameters: Optional[ConnectionParameters] = None,
+        publish_batch_size: int = 100,
+        max_unconfirmed: int = 1000,
+        outbox: Optional[LaneOutbox] = None,
+        publish_rate: float = 500,
+        reconnect_backoff: Optional[ExponentialBackoff] = None,
+        batch_policies: Optional[Dict[str, BatchPolicy]] = None,
+        codecs: Optional[Dict[str, PayloadCodec]] = None,
+        compress_threshold: Optional[int] = None,
+        connection_manager: Optional[ConnectionManager] = None,
+        shed_lanes: Iterable[Lane] = (Lane.STATUS, Lane.TELEMETRY),
     ):
         self._exchange: str = exchange
         self._exchange_type: ExchangeType = exchange_type
-        self._connection_parameters: ConnectionParameters = connection_parameters
-        self._thread: Thread = None
-        self._stop_event: Event = None
-        self._connection: SelectConnection  = None
+        self._manager: ConnectionManager = connection_manager or ConnectionManager(
+            connection_parameters, reconnect_backoff=reconnect_backoff,
+        )
+        self._publish_batch_size: int = publish_batch_size
+        self._max_unconfirmed: int = max_unconfirmed
+        self._is_started: bool = False
+        self._stopping: bool = False
+        self._stopped_event: Event = Event()
         self._channel: Channel = None
-        self._pending_messages: List[Tuple] = []
+        self._is_exchange_ready: bool = False
+        self._is_blocked: bool = False
+        self._shed_lanes: FrozenSet[Lane] = frozenset(shed_lanes)
+        self._shed_count: int = 0
+        self._flush_timer: Any = None
+        self._rate_limiter: TokenBucket = TokenBucket(rate=publish_rate, capacity=publish_batch_size)
+        # set when the channel gets ready, cleared once the backlog is sent
+        self._is_draining_backlog: bool = False
+        # multi producer single consumer queue, only the IO loop pops from it
+        self._publish_queue: Deque[OutgoingMessage] = deque()
+        self._drain_lock: Lock = Lock()
+        self._drain_scheduled: bool = False
+        # only accessed from the IO loop thread
+        self._pending_messages: LaneOutbox = outbox if outbox is not None else LaneOutbox()
+        self._delivery_tag: int = 0
+        self._message_id_prefix: str = uuid.uuid4().hex
+        self._message_count: int = 0
+        self._unconfirmed: OrderedDict[int, Tuple[OutgoingMessage, float]] = OrderedDict()
+        self._confirm_statistics: ConfirmStatistics = ConfirmStatistics()
+        self._batcher: Optional[MessageBatcher] = (
+            MessageBatcher(batch_policies, compress_threshold=compress_threshold) if batch_policies else None
+        )
+        self._batch_timers: Dict[str, Any] = {}
+        self._codecs: Dict[str, PayloadCodec] = codecs or {}
+        self._codec_cache: Dict[str, PayloadCodec] = {}
+        self._default_codec: PayloadCodec = JSONCodec()
+        self._compress_threshold: Optional[int] = compress_threshold
+        self._publishers: Dict[Tuple[str, Lane], Publisher] = {}
 
     def __enter__(self):
         self.start()
@@ -38,31 +192,36 @@ class PikaProducer(object):
         self.stop()
         return False
 
-    def connect(self) -> SelectConnection:
-        return pika.SelectConnection(
-            self._connection_parameters,
-            on_open_callback=self.on_connection_open,
-            on_open_error_callback=self.on_connection_open_error,
-            on_close_callback=self.on_connection_closed,
-        )
+    @property
+    def is_ready(self) -> bool:
+        """Whether the channel is open and the exchange has been declared."""
+        return self._is_exchange_ready and self._channel is not None and self._channel.is_open
 
-    def on_connection_open(self, connection) -> None:
-        self._connection = connection
-        self._connection.channel(on_open_callback=self.on_channel_open)
+    @property
+    def _ioloop(self) -> IOLoop:
+        return self._manager.ioloop
 
-    def on_connection_open_error(self, _unused_connection, err) -> None:
-        self._connection.ioloop.call_later(5, self._connection.ioloop.stop)
+    @property
+    def confirm_statistics(self) -> ConfirmStatistics:
+        return self._confirm_statistics
 
-    def on_connection_closed(self, _unused_connection, reason) -> None:
-        self._channel = None
-        if self._stopping:
-            self._connection.ioloop.stop()
-        else:
-            self._connection.ioloop.call_later(5, self._connection.ioloop.stop)
+    @property
+    def unconfirmed_count(self) -> int:
+        return len(self._unconfirmed)
+
+    @property
+    def is_blocked(self) -> bool:
+        """Whether the broker blocked the connection."""
+        return self._is_blocked
+
+    @property
+    def shed_count(self) -> int:
+        """Number of messages dropped while the connection was blocked."""
+        return self._shed_count
 
     def on_channel_open(self, channel) -> None:
         self._channel = channel
-        self._channel.add_on_close_callback(self.on_channel_closed)
+        self._delivery_tag = 0
         self._channel.confirm_delivery(self.on_delivery_confirmation)
         self._channel.exchange_declare(
             exchange=self._exchange,
@@ -73,60 +232,300 @@ class PikaProducer(object):
 
     def on_channel_closed(self, channel, reason) -> None:
         self._channel = None
-        if not self._stopping:
-            self._connection.close()
+        self._is_exchange_ready = False
+        self._requeue_in_flight()
+        if self._stopping:
+            self._persist_pending()
+            self._stopped_event.set()
+
+    def on_connection_blocked(self) -> None:
+        self._is_blocked = True
+        shed: int = self._pending_messages.shed(self._shed_lanes)
+        if shed:
+            logger.info('Dropped %d low priority message(s) while blocked.', shed)
+        self._shed_count += shed
+
+    def on_connection_unblocked(self) -> None:
+        self._is_blocked = False
+        self.send_pending_messages()
 
     def on_delivery_confirmation(self, method_frame) -> None:
-        pass
+        """Handle a Basic.Ack or Basic.Nack confirmation from the broker.
+
+        Confirmations with the multiple flag settle every unconfirmed message
+        up to and including the given delivery tag.
+        """
+        confirmation = method_frame.method
+        acked: bool = isinstance(confirmation, pika.spec.Basic.Ack)
+        confirmed_at: float = time.monotonic()
+        nacked = []
+        for tag in self._settled_tags(confirmation.delivery_tag, confirmation.multiple):
+            message, published_at = self._unconfirmed.pop(tag)
+            self._confirm_statistics.record(confirmed_at - published_at, acked)
+            if not acked:
+                nacked.append(message)
+        if nacked:
+            logger.info('%d message(s) were nacked by the broker, re-queueing them.', len(nacked))
+            self._pending_messages.extendleft(reversed(nacked))
+        self.send_pending_messages()
+
+    def _settled_tags(self, delivery_tag: int, multiple: bool):
+        if not multiple:
+            return [delivery_tag] if delivery_tag in self._unconfirmed else []
+        tags = []
+        for tag in self._unconfirmed:
+            if tag > delivery_tag:
+                break
+            tags.append(tag)
+        return tags
+
+    def _requeue_in_flight(self) -> None:
+        """Put batched and unconfirmed messages back to the pending ones.
+
+        Unconfirmed messages are older than the batched ones, so they end up
+        in the front.
+        """
+        if self._batcher:
+            self._pending_messages.extendleft(reversed(self._batcher.drain()))
+        for timer in self._batch_timers.values():
+            self._ioloop.remove_timeout(timer)
+        self._batch_timers.clear()
+        if self._unconfirmed:
+            self._confirm_statistics.requeued += len(self._unconfirmed)
+            self._pending_messages.extendleft(
+                reversed([message for message, _ in self._unconfirmed.values()])
+            )
+            self._unconfirmed.clear()
 
     def setup_exchange_ok(self, _unused_frame) -> None:
-        self._connection.ioloop.call_later(10, self.send_pending_messages)
+        self._is_exchange_ready = True
+        self._is_draining_backlog = True
+        self.send_pending_messages()
 
     def send_pending_messages(self) -> None:
-        for pending in self._pending_messages:
-            self.publish_message(*pending)
-        self._pending_messages.clear()
-    
-    def publish_message(self, routing_key: str, message: Any, headers: Optional[dict] = None) -> bool:
-        if self._channel is None or not self._channel.is_open:
-            self._pending_messages.append((routing_key, message, headers))
-            return False
-        self._channel.basic_publish(
-            self._exchange,
-            routing_key,
-            message,
-            properties=pika.BasicProperties(headers=headers or {}),
+        """Publish at most one chunk of pending messages.
+
+        Must be called from the IO loop thread. The chunk size is limited by
+        `publish_batch_size`, and while the backlog of a reconnect is drained
+        by the tokens available in the rate limiter. If messages remain the
+        next chunk is scheduled (when tokens become available), so other IO
+        events can be processed in between. Publishing stops when the
+        unconfirmed window is full, confirmations restart it.
+        """
+        if not self._has_window:
+            return
+        allowed: int = min(
+            self._publish_batch_size,
+            len(self._pending_messages),
+            self._max_unconfirmed - len(self._unconfirmed),
         )
-        return True
-
-    def run(self) -> None:
-        while not self._stop_event.is_set():
-            self._connection = None
-            try:
-                self._connection = self.connect()
-                self._connection.ioloop.start()   
-            except Exception as err:
-                if self._connection is not None and not self._connection.is_closed:
-                    self._connection.close()  # Close the connection if it exists and is not closed
-                sleep(5)
+        if self._is_draining_backlog:
+            allowed = self._rate_limiter.take(allowed)
+        for _ in range(allowed):
+            self._send(self._pending_messages.popleft())
+        if not self._pending_messages:
+            self._is_draining_backlog = False
+        elif self._has_window:
+            self._schedule_flush(self._rate_limiter.seconds_until_available() if self._is_draining_backlog else 0)
+
+    def _schedule_flush(self, delay: float) -> None:
+        if self._flush_timer is None:
+            self._flush_timer = self._ioloop.call_later(delay, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_timer = None
+        self.send_pending_messages()
+
+    @property
+    def _has_window(self) -> bool:
+        return self.is_ready and not self._is_blocked and len(self._unconfirmed) < self._max_unconfirmed
+
+    def _send(self, message: OutgoingMessage) -> None:
+        """Publish the message or add it to its batch."""
+        if self._batcher is None or self._batcher.policy_for(message.routing_key) is None:
+            self._publish(message)
+        elif message.headers and BATCH_HEADER in message.headers:
+            # re-queued envelope
+            self._publish(message)
+        else:
+            envelope: Optional[OutgoingMessage] = self._batcher.add(message)
+            if envelope is not None:
+                # a batch can fill up before its timer is armed
+                timer: Any = self._batch_timers.pop(message.routing_key, None)
+                if timer is not None:
+                    self._ioloop.remove_timeout(timer)
+                self._publish(envelope)
+            elif message.routing_key not in self._batch_timers:
+                policy: BatchPolicy = self._batcher.policy_for(message.routing_key)
+                self._batch_timers[message.routing_key] = self._ioloop.call_later(
+                    policy.max_delay_ms / 1000, lambda: self._flush_batch(message.routing_key),
+                )
+
+    def _flush_batch(self, routing_key: str) -> None:
+        self._batch_timers.pop(routing_key, None)
+        if not self.is_ready:
+            return
+        envelope: Optional[OutgoingMessage] = self._batcher.flush(routing_key)
+        if envelope is None:
+            return
+        if self._has_window:
+            self._publish(envelope)
+        else:
+            # wait for the unconfirmed window like the other pending messages
+            self._pending_messages.extendleft([envelope])
+
+    def _publish(self, message: OutgoingMessage) -> None:
+        if message.message_id is None:
+            self._message_count += 1
+            message.message_id = f'{self._message_id_prefix}.{self._message_count}'
+        properties: Optional[pika.BasicProperties] = message.properties
+        if properties is None:
+            properties = pika.BasicProperties(
+                headers=message.headers or {},
+                content_type=message.content_type,
+                content_encoding=message.content_encoding,
+                message_id=message.message_id,
+            )
+        else:
+            # shared by the messages of a publisher handle, safe to stamp as
+            # basic_publish encodes it right away on this (IO loop) thread
+            properties.message_id = message.message_id
+        self._channel.basic_publish(self._exchange, message.routing_key, message.body, properties=properties)
+        self._delivery_tag += 1
+        self._unconfirmed[self._delivery_tag] = (message, time.monotonic())
+
+    def publish_message(
+        self,
+        routing_key: str,
+        message: Any,
+        headers: Optional[dict] = None,
+        content_type: Optional[str] = None,
+        content_encoding: Optional[str] = None,
+        lane: Lane = Lane.REPORT,
+    ) -> bool:
+        """Publish a message.
+
+        Thread-safe, the message is only put into the publish queue and the
+        actual publishing happens on the IO loop thread.
+
+        Returns:
+            bool: True if the channel is currently ready, False if the message
+                will remain pending until the connection is restored.
+        """
+        return self.enqueue(OutgoingMessage(routing_key, message, headers, content_type, content_encoding, lane))
+
+    def enqueue(self, message: OutgoingMessage) -> bool:
+        """Put a message into the publish queue.
+
+        Thread-safe, returns the same as `publish_message`.
+        """
+        self._publish_queue.append(message)
+        self._schedule_drain()
+        return self.is_ready
+
+    def publish_payload(
+        self,
+        routing_key: str,
+        payload: Any,
+        headers: Optional[dict] = None,
+        lane: Lane = Lane.REPORT,
+    ) -> bool:
+        """Encode and publish a payload.
+
+        The payload is encoded on the calling thread with the codec of the
+        routing key and compressed if it exceeds the compression threshold.
+
+        Returns:
+            bool: Same as `publish_message`.
+        """
+        codec: PayloadCodec = self.codec_for(routing_key)
+        body, content_encoding = compress(codec.encode(payload), self._compress_threshold)
+        return self.publish_message(routing_key, body, headers, codec.content_type, content_encoding, lane)
+
+    def publisher(self, routing_key: str, headers: Optional[dict] = None, lane: Lane = Lane.REPORT) -> Publisher:
+        """Get the publisher handle of a routing key.
+
+        Handles are cached per routing key and lane, the headers of the first
+        call are kept.
+        """
+        publisher: Optional[Publisher] = self._publishers.get((routing_key, lane))
+        if publisher is None:
+            publisher = Publisher(
+                self, routing_key, headers, lane, self.codec_for(routing_key), self._compress_threshold,
+            )
+            self._publishers[(routing_key, lane)] = publisher
+        return publisher
+
+    def codec_for(self, routing_key: str) -> PayloadCodec:
+        codec: Optional[PayloadCodec] = self._codec_cache.get(routing_key)
+        if codec is None:
+            codec = next(
+                (codec for pattern, codec in self._codecs.items() if topic_matches(pattern, routing_key)),
+                self._default_codec,
+            )
+            self._codec_cache[routing_key] = codec
+        return codec
+
+    def _schedule_drain(self) -> None:
+        with self._drain_lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        if not self._manager.call_threadsafe(self._drain_publish_queue):
+            with self._drain_lock:
+                self._drain_scheduled = False
+
+    def _drain_publish_queue(self) -> None:
+        with self._drain_lock:
+            self._drain_scheduled = False
+        while self._publish_queue:
+            message: OutgoingMessage = self._publish_queue.popleft()
+            if self._is_blocked and message.lane in self._shed_lanes:
+                self._shed_count += 1
+                continue
+            self._pending_messages.append(message)
+        if self.is_ready:
+            self.send_pending_messages()
 
     def start(self) -> None:
-        if self._thread is None:
-            self._thread = Thread(target=self.run)
-            self._stop_event = Event()
-            self._thread.start()
+        if not self._is_started:
+            self._is_started = True
+            self._stopping = False
+            self._stopped_event.clear()
+            self._manager.attach(self)
+            self._manager.acquire()
+            self._schedule_drain()
 
     def stop(self) -> None:
-        self._stop_event.set()
-        self.close_channel()
-        self.close_connection()
-        self._thread.join()
-        self._thread = None
-
-    def close_channel(self) -> None:
-        if self._channel is not None:
+        """Close the channel and persist the messages which were not sent."""
+        if self._is_started:
+            if self._manager.call_threadsafe(self.shutdown):
+                self._stopped_event.wait()
+            else:
+                # no IO loop is running, nothing else touches the outbox
+                self._persist_pending()
+            self._manager.release()
+            self._is_started = False
+
+    def shutdown(self) -> None:
+        """Close the channel from the IO loop thread."""
+        self._stopping = True
+        if self._flush_timer is not None:
+            self._ioloop.remove_timeout(self._flush_timer)
+            self._flush_timer = None
+        self._requeue_in_flight()
+        self._manager.detach(self)
+        if self._channel is None:
+            self._persist_pending()
+            self._stopped_event.set()
+        elif self._channel.is_open:
             self._channel.close()
 
-    def close_connection(self) -> None: 
-        if self._connection is not None and self._connection.is_open:
-            self._connection.close()
+    def _persist_pending(self) -> None:
+        """Keep what could not be sent for the next run.
+
+        Runs on the IO loop thread once the channel is closed, the outbox is
+        not thread-safe.
+        """
+        self._drain_publish_queue()
+        self._pending_messages.close()
@@ -0,0 +1,63 @@
+"""Publisher handle."""
+
+from typing import TYPE_CHECKING, Any, Optional
+
+import pika
+
+from ski_lift.core.remote.rabbitmq.codec import ZLIB_ENCODING, PayloadCodec, compress
+from ski_lift.core.remote.rabbitmq.lane import Lane
+from ski_lift.core.remote.rabbitmq.outgoing_message import OutgoingMessage
+
+if TYPE_CHECKING:
+    from ski_lift.core.remote.rabbitmq.pika_producer import PikaProducer
+
+
+class Publisher(object):
+    """Publisher handle of a single routing key.
+
+    Created once per lift and message kind by `PikaProducer.publisher`, it
+    resolves the routing key, headers, codec and `pika.BasicProperties` up
+    front, so publishing only encodes the body. The headers and properties
+    are shared by every message of the handle and must not be modified, only
+    the producer stamps the message id on the IO loop thread.
+    """
+
+    __slots__ = (
+        '_producer', 'routing_key', 'headers', 'lane', 'codec', '_compress_threshold',
+        '_properties', '_compressed_properties',
+    )
+
+    def __init__(
+        self,
+        producer: 'PikaProducer',
+        routing_key: str,
+        headers: Optional[dict],
+        lane: Lane,
+        codec: PayloadCodec,
+        compress_threshold: Optional[int],
+    ):
+        self._producer: 'PikaProducer' = producer
+        self.routing_key: str = routing_key
+        self.headers: dict = headers or {}
+        self.lane: Lane = lane
+        self.codec: PayloadCodec = codec
+        self._compress_threshold: Optional[int] = compress_threshold
+        self._properties: pika.BasicProperties = pika.BasicProperties(
+            headers=self.headers, content_type=codec.content_type,
+        )
+        self._compressed_properties: pika.BasicProperties = pika.BasicProperties(
+            headers=self.headers, content_type=codec.content_type, content_encoding=ZLIB_ENCODING,
+        )
+
+    def publish(self, payload: Any) -> bool:
+        """Encode and publish a payload, see `PikaProducer.publish_payload`."""
+        body, content_encoding = compress(self.codec.encode(payload), self._compress_threshold)
+        return self._producer.enqueue(OutgoingMessage(
+            self.routing_key,
+            body,
+            self.headers,
+            self.codec.content_type,
+            content_encoding,
+            self.lane,
+            properties=self._properties if content_encoding is None else self._compressed_properties,
+        ))
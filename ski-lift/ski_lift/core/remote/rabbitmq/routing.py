@@ -0,0 +1,30 @@
+"""Routing key helpers."""
+
+from typing import List
+
+
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    """Check whether a routing key matches a topic exchange binding pattern.
+
+    Follows the RabbitMQ topic semantics: `*` substitutes exactly one word,
+    `#` substitutes zero or more words.
+
+    Args:
+        pattern (str): Binding pattern, e.g. `skilift.*.logs.#`.
+        routing_key (str): Routing key to check.
+
+    Returns:
+        bool: True if the routing key matches the pattern.
+    """
+    return _words_match(pattern.split('.'), routing_key.split('.'))
+
+
+def _words_match(pattern: List[str], words: List[str]) -> bool:
+    if not pattern:
+        return not words
+    head, rest = pattern[0], pattern[1:]
+    if head == '#':
+        return any(_words_match(rest, words[index:]) for index in range(len(words) + 1))
+    if not words:
+        return False
+    return (head == '*' or head == words[0]) and _words_match(rest, words[1:])
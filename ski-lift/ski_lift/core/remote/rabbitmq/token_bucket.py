@@ -0,0 +1,37 @@
+"""Token bucket."""
+
+import time
+
+
+class TokenBucket(object):
+    """Token bucket rate limiter.
+
+    The bucket holds at most `capacity` tokens and is refilled with `rate`
+    tokens per second. Taking tokens never blocks, callers are expected to
+    retry after `seconds_until_available`.
+
+    Not thread-safe, meant to be used from a single IO loop thread.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self._rate: float = rate
+        self._capacity: float = capacity
+        self._tokens: float = capacity
+        self._updated_at: float = time.monotonic()
+
+    def take(self, requested: int) -> int:
+        """Take up to `requested` whole tokens and return how many were taken."""
+        self._refill()
+        taken: int = min(requested, int(self._tokens))
+        self._tokens -= taken
+        return taken
+
+    def seconds_until_available(self, tokens: int = 1) -> float:
+        self._refill()
+        missing: float = tokens - self._tokens
+        return max(0.0, missing / self._rate)
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
@@ -1,5 +1,6 @@
 """RabbitMQ suggestion forwarder."""
 
+import logging
 from typing import TYPE_CHECKING
 
 from ski_lift.core.remote.suggestion.suggestion import Suggestion
@@ -10,6 +11,8 @@ if TYPE_CHECKING:
     from ski_lift.core.remote.rabbitmq.pika_consumer import PikaConsumer
     from ski_lift.core.view.base_view import BaseView
 
+logger = logging.getLogger(__name__)
+
 
 class RabbitMQSuggestionForwarder(SuggestionForwarder):
 
@@ -22,6 +25,10 @@ class RabbitMQSuggestionForwarder(SuggestionForwarder):
             lift_id=view.lift_id,
             callback=self.suggestion_callback,
             observer=view,
+            # suggestions arrive in bursts from the control room
+            prefetch_count=50,
+            ack_batch_size=25,
+            ack_interval_ms=200,
         )
         super().__init__(view=view)
 
@@ -32,4 +39,9 @@ class RabbitMQSuggestionForwarder(SuggestionForwarder):
         self._consumer.stop()
 
     def suggestion_callback(self, ch, method, properties, body):
-        self._view.display_suggestion(Suggestion.from_json(body.decode('utf-8')))
\ No newline at end of file
+        try:
+            suggestion: Suggestion = Suggestion.from_message(properties, body)
+        except Exception:
+            logger.exception('Decoding a suggestion failed.')
+            return
+        self._view.display_suggestion(suggestion)
\ No newline at end of file
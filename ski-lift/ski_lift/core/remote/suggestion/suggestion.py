@@ -7,6 +7,8 @@ from enum import Enum
 
 from camel_converter import dict_to_snake
 
+from ski_lift.core.remote.rabbitmq.codec import decode_payload
+
 
 class SuggestionCategory(Enum):
 
@@ -69,3 +71,11 @@ class Suggestion:
     @classmethod
     def from_json(cls, json_str: str) -> 'Suggestion':
         return cls.from_dict(dict_to_snake(json.loads(json_str)))
+
+    @classmethod
+    def from_message(cls, properties, body: bytes) -> 'Suggestion':
+        """Create a suggestion from a received message.
+
+        The decoder is picked based on the content type of the message.
+        """
+        return cls.from_dict(dict_to_snake(decode_payload(properties, body)))
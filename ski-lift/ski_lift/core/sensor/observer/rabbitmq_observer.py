@@ -1,26 +1,39 @@
-import json
+from typing import Dict, Tuple
 
+from ski_lift.core.remote.rabbitmq.lane import Lane
 from ski_lift.core.remote.rabbitmq.pika_producer import PikaProducer
+from ski_lift.core.remote.rabbitmq.publisher import Publisher
 from ski_lift.core.sensor.factory.base_sensor import SensorReading
 from ski_lift.core.sensor.observer.sensor_observer import SensorObserver
 
 
 class RabbitMQObserver(SensorObserver):
-    """Sends sensor readings to RabbitMQ."""
+    """Sends sensor readings to RabbitMQ.
+
+    Publisher handles are cached per lift and sensor type.
+    """
     def __init__(self, pika_producer: PikaProducer):
         self._pika_producer = pika_producer
+        self._publishers: Dict[Tuple[str, str], Tuple[str, Publisher]] = {}
 
     def update(self, reading: SensorReading) -> None:
-        reading_type: str = reading.sensor_type.split('.')[1]
-        message = {
+        key: Tuple[str, str] = (reading.lift_id, reading.sensor_type)
+        entry = self._publishers.get(key)
+        if entry is None:
+            entry = self._publishers[key] = self._create_publisher(reading)
+        reading_type, publisher = entry
+        publisher.publish({
             'messageKind': 'sensor',
             'type': reading_type,
             'value': reading.value,
             'timestamp': reading.timestamp.isoformat(),
             'location': reading.location,
-        }
-        self._pika_producer.publish_message(
-            routing_key=f'skilift.{reading.lift_id}.logs.sensor.{reading_type}',
-            message=json.dumps(message).encode('utf-8'),
+        })
+
+    def _create_publisher(self, reading: SensorReading) -> Tuple[str, Publisher]:
+        reading_type: str = reading.sensor_type.split('.')[1]
+        return reading_type, self._pika_producer.publisher(
+            f'skilift.{reading.lift_id}.logs.sensor.{reading_type}',
             headers={'lift_id': reading.lift_id},
+            lane=Lane.TELEMETRY,
         )
@@ -5,6 +5,7 @@ from typing import Optional
 
 from ski_lift.core.command.command_panel import CommandPanel
 from ski_lift.core.controller import Controller
+from ski_lift.core.monitor.result.delivery import SYNCHRONOUS_DELIVERY
 from ski_lift.core.monitor.result.result_monitor import CommandResultMonitor
 from ski_lift.core.remote.suggestion.suggestion import Suggestion
 from ski_lift.core.remote.rabbitmq.connection_event_observer import ConnectionEventObserver
@@ -22,10 +23,13 @@ class BaseView(CommandPanel, CommandResultMonitor, ConnectionEventObserver):
     which enables the creation and execution of commands on a controller.
     Additionally, they inherit from the CommandResultMonitor class, allowing
     them to receive results and provide appropriate feedback to the user.
+
+    Results are delivered to views synchronously, so the feedback of a command
+    is displayed before the view handles the next user input.
     """ 
 
     def __init__(self, controller: Controller, *args, **kwargs) -> None:
-        controller.register_result_monitor(self)
+        controller.register_result_monitor(self, SYNCHRONOUS_DELIVERY)
         super().__init__(controller=controller, *args, **kwargs)
 
     @property
@@ -1,24 +1,32 @@
 """Ski lift use cases."""
 
 import os
+from functools import cache
 from threading import Thread
-from typing import Callable, List, Optional
+from typing import Callable, Dict, List, Optional
 
 import pika
 
 from ski_lift.app.entity import SkiLiftAuthorizer, SkiLiftController
 from ski_lift.core.auth import BaseAuthenticator, InMemoryAuthenticator
+from ski_lift.core.command.descriptor.executor.journal import \
+    DelayedCommandJournal
 from ski_lift.core.command.descriptor.serializer import (
     JSONBytesDescriptorSerializer, PrettyStringDescriptorSerializer)
 from ski_lift.core.command.result.serializer import (
-    JSONBytesResultSerializer, PrettyResultStringSerializer)
+    PrettyResultStringSerializer, PythonDictResultSerializer)
 from ski_lift.core.controller import Controller
 from ski_lift.core.engine import Engine
 from ski_lift.core.math.erlang_c import ErlangCModel
 from ski_lift.core.monitor.logger import (FileCommandLogger,
                                           RabbitMQCommandLogger)
+from ski_lift.core.monitor.result import DeliveryPolicy, OverflowPolicy
 from ski_lift.core.remote import (PikaConsumer, PikaProducer,
                                   RabbitMQCommunicator, ConnectionEventObserver)
+from ski_lift.core.remote.rabbitmq import (CODEC_NAMES, BatchPolicy,
+                                           ConnectionManager, EndpointPool,
+                                           Lane, LaneOutbox, Outbox,
+                                           PayloadCodec)
 from ski_lift.core.sensor import RabbitMQObserver, SensorDataGenerator
 
 
@@ -50,7 +58,7 @@ def attach_rabbit_mq_logger_to(controller: Controller, producer: PikaProducer):
         producer (PikaProducer): _description_
     """
     rabbit_logger = RabbitMQCommandLogger(
-        result_serializer=JSONBytesResultSerializer(),
+        result_serializer=PythonDictResultSerializer(convert_to_camel=True),
         pika_producer=producer,
         lift_id=controller.lift_id,
     )
@@ -66,6 +74,36 @@ def create_controller(lift_id: str, producer: PikaProducer) -> Controller:
         authorizer=SkiLiftAuthorizer(authenticator=create_authenticate_from_env()),
         remote_communicator=RabbitMQCommunicator(producer=producer),
         queue_status=create_erlang_c_model(),
+        journal=create_delayed_command_journal(lift_id),
+        result_delivery=create_result_delivery_policy(),
+    )
+
+
+def create_result_delivery_policy() -> DeliveryPolicy:
+    """Create the delivery policy of the result monitors.
+
+    `RESULT_MONITOR_OVERFLOW` is one of `block`, `drop_oldest` and `sample`,
+    `RESULT_MONITOR_MAX_PENDING=0` delivers the results synchronously.
+    """
+    return DeliveryPolicy(
+        max_pending=int(os.environ.get('RESULT_MONITOR_MAX_PENDING', 1000)),
+        overflow=OverflowPolicy[os.environ.get('RESULT_MONITOR_OVERFLOW', 'block').upper()],
+        sample_every=int(os.environ.get('RESULT_MONITOR_SAMPLE_EVERY', 10)),
+    )
+
+
+def create_delayed_command_journal(lift_id: str) -> DelayedCommandJournal:
+    """Create the journal of the delayed commands of a lift.
+
+    Recovered commands overdue by more than `DELAYED_COMMAND_MAX_LATENESS`
+    seconds are dropped (emergency stops are always executed), a negative
+    value executes them all.
+    """
+    max_lateness: float = float(os.environ.get('DELAYED_COMMAND_MAX_LATENESS', 60))
+    return DelayedCommandJournal(
+        path=os.path.join(os.environ.get('DELAYED_COMMAND_JOURNAL_DIR', 'journal'), f'{lift_id}.delayed.jsonl'),
+        compact_threshold=int(os.environ.get('DELAYED_COMMAND_JOURNAL_COMPACT_THRESHOLD', 1000)),
+        max_lateness=max_lateness if max_lateness >= 0 else None,
     )
 
 
@@ -96,16 +134,79 @@ def create_authenticate_from_env() -> BaseAuthenticator:
     return authenticator
 
 
-def create_pika_producer() -> PikaProducer:
+def create_pika_producer(lift_id: str) -> PikaProducer:
     """Create a dedicated pika producer.
 
+    Args:
+        lift_id (str): id of the lift, used to name the outbox segment file
+
     Returns:
         PikaProducer: dedicated pika producer
     """
     return PikaProducer(
         exchange='topic_skilift',
         exchange_type='topic',
-        connection_parameters=create_pika_connection_parameters(),
+        connection_manager=get_connection_manager(),
+        outbox=create_outbox(lift_id),
+        publish_rate=float(os.environ.get('RABBITMQ_PUBLISH_RATE', 500)),
+        batch_policies=create_batch_policies(),
+        codecs=create_payload_codecs(),
+        # 0 disables compression
+        compress_threshold=int(os.environ.get('RABBITMQ_COMPRESS_THRESHOLD', 0)) or None,
+    )
+
+
+def create_payload_codecs() -> Dict[str, PayloadCodec]:
+    """Create the payload codecs of the message kinds.
+
+    Codecs are selected per message kind via `RABBITMQ_CODECS`, e.g.
+    `sensor=msgpack,status_update=msgpack`. The kind is the word after `logs`
+    in the routing key, kinds not listed use JSON.
+    """
+    codecs: Dict[str, PayloadCodec] = {}
+    for entry in filter(None, os.environ.get('RABBITMQ_CODECS', '').split(',')):
+        kind, codec_name = entry.split('=')
+        codecs[f'skilift.*.logs.{kind.strip()}.#'] = CODEC_NAMES[codec_name.strip()]
+    return codecs
+
+
+def create_batch_policies() -> Optional[Dict[str, BatchPolicy]]:
+    """Create the batch policies of the telemetry topics.
+
+    Batching is opt-in (`RABBITMQ_BATCH_TELEMETRY=1`), since every consumer of
+    these topics has to unpack the batch envelopes.
+    """
+    if os.environ.get('RABBITMQ_BATCH_TELEMETRY', '0') != '1':
+        return None
+    policy: BatchPolicy = BatchPolicy(
+        max_messages=int(os.environ.get('RABBITMQ_BATCH_MAX_MESSAGES', 50)),
+        max_delay_ms=int(os.environ.get('RABBITMQ_BATCH_MAX_DELAY_MS', 1000)),
+    )
+    return {
+        'skilift.*.logs.sensor.#': policy,
+        'skilift.*.logs.status_update': policy,
+    }
+
+
+def create_outbox(lift_id: str) -> LaneOutbox:
+    """Create a disk spilling outbox for the pending messages of a lift.
+
+    Every priority lane gets its own segment file. Only the latest undelivered
+    status update and sensor reading per routing key is kept, the patterns
+    can be changed via `RABBITMQ_CONFLATE` (empty disables conflation).
+    """
+    directory: str = os.environ.get('RABBITMQ_OUTBOX_DIR', 'outbox')
+    return LaneOutbox(
+        outboxes={
+            lane: Outbox(
+                memory_limit=int(os.environ.get('RABBITMQ_OUTBOX_MEMORY_LIMIT', 10000)),
+                segment_path=os.path.join(directory, f'{lift_id}.{lane.name.lower()}.segment'),
+            )
+            for lane in Lane
+        },
+        conflate=filter(None, os.environ.get(
+            'RABBITMQ_CONFLATE', 'skilift.*.logs.status_update,skilift.*.logs.sensor.#',
+        ).split(',')),
     )
 
 
@@ -130,23 +231,84 @@ def create_pika_consumer(
     lift_id: str,
     callback: Callable,
     observer: Optional[ConnectionEventObserver] = None,
+    prefetch_count: int = 1,
+    auto_ack: bool = False,
+    ack_batch_size: int = 1,
+    ack_interval_ms: int = 100,
+    dedup_size: int = 1024,
+    dedup_ttl: float = 300,
 ) -> PikaConsumer:
+    """Create a consumer on the shared connection.
+
+    Args:
+        exchange_name (str): exchange to consume from
+        exchange_type (str): type of the exchange
+        lift_id (str): id of the lift, used as the routing key
+        callback (Callable): invoked with every received message
+        observer (Optional[ConnectionEventObserver]): notified about connection events
+        prefetch_count (int): maximum number of unacknowledged deliveries
+        auto_ack (bool): let the broker acknowledge the messages on delivery
+        ack_batch_size (int): number of messages acknowledged together
+        ack_interval_ms (int): maximum delay of an acknowledgement
+        dedup_size (int): number of remembered messages to drop duplicates, 0 disables it
+        dedup_ttl (float): seconds a message is remembered
+
+    Returns:
+        PikaConsumer: consumer sharing the connection of the lift
+    """
     return PikaConsumer(
         exchange=exchange_name,
         exchange_type=exchange_type,
         route_key=lift_id,
-        connection_parameters=create_pika_connection_parameters(),
+        connection_parameters=None,
         callback=callback,
         observer=observer,
+        connection_manager=get_connection_manager(),
+        prefetch_count=prefetch_count,
+        auto_ack=auto_ack,
+        ack_batch_size=ack_batch_size,
+        ack_interval_ms=ack_interval_ms,
+        dedup_size=dedup_size,
+        dedup_ttl=dedup_ttl,
     )
 
 
-def create_pika_connection_parameters() -> pika.ConnectionParameters:
-    return pika.ConnectionParameters(
-        host=os.environ.get('RABBITMQ_HOST', 'localhost'),
-        port=int(os.environ.get('RABBITMQ_PORT', 5672)),
-        credentials=pika.PlainCredentials(
-            username=os.environ.get('RABBITMQ_USER', 'guest'),
-            password=os.environ.get('RABBITMQ_PASSWORD', 'guest'),
-        ),
-    )
\ No newline at end of file
+@cache
+def get_connection_manager() -> ConnectionManager:
+    """Get the connection manager shared by every producer and consumer.
+
+    Each lift process uses a single connection to RabbitMQ, failing over
+    between the configured broker nodes.
+    """
+    return ConnectionManager(EndpointPool(
+        create_pika_connection_parameters(),
+        reset_timeout=float(os.environ.get('RABBITMQ_ENDPOINT_RESET_TIMEOUT', 30)),
+    ))
+
+
+def create_pika_connection_parameters() -> List[pika.ConnectionParameters]:
+    """Create the connection parameters of every broker node.
+
+    The nodes are listed in `RABBITMQ_HOSTS` as comma separated `host:port`
+    pairs (the port defaults to `RABBITMQ_PORT`), `RABBITMQ_HOST` is used if
+    it is not set. `RABBITMQ_CONNECT_TIMEOUT` bounds a connection attempt,
+    and therefore the failover to the next node.
+    """
+    default_port: int = int(os.environ.get('RABBITMQ_PORT', 5672))
+    connect_timeout: float = float(os.environ.get('RABBITMQ_CONNECT_TIMEOUT', 5))
+    credentials = pika.PlainCredentials(
+        username=os.environ.get('RABBITMQ_USER', 'guest'),
+        password=os.environ.get('RABBITMQ_PASSWORD', 'guest'),
+    )
+    hosts: str = os.environ.get('RABBITMQ_HOSTS') or os.environ.get('RABBITMQ_HOST', 'localhost')
+    parameters: List[pika.ConnectionParameters] = []
+    for address in filter(None, (item.strip() for item in hosts.split(','))):
+        host, _, port = address.partition(':')
+        parameters.append(pika.ConnectionParameters(
+            host=host,
+            port=int(port) if port else default_port,
+            credentials=credentials,
+            socket_timeout=connect_timeout,
+            stack_timeout=connect_timeout,
+        ))
+    return parameters
\ No newline at end of file
@@ -0,0 +1,47 @@
+import unittest
+
+from ski_lift.app.entity.ski_lift_authorizer import SkiLiftAuthorizer
+from ski_lift.core.auth import BaseAuthenticator, InMemoryAuthenticator
+from ski_lift.core.command.descriptor.factory import CommandDescriptorFactory
+from ski_lift.core.command.descriptor.object import \
+    ChangeStateCommandDescriptor
+from ski_lift.core.command.result.object import (ChangeStateCommandResult,
+                                                 CommandResult)
+
+
+def change_state(user_card: str = 'card-1') -> ChangeStateCommandDescriptor:
+    return CommandDescriptorFactory.create_change_state(
+        user_card=user_card, new_state=ChangeStateCommandDescriptor.Option.STOP,
+    )
+
+
+class AuthorizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.authenticator = InMemoryAuthenticator()
+        self.authenticator.add('card-1')
+        self.authorizer = SkiLiftAuthorizer(authenticator=self.authenticator)
+
+    def test_check_returns_nothing_for_authorized_commands(self):
+        self.assertIsNone(self.authorizer.check(CommandDescriptorFactory.create_insert_card(card_to_insert='card-1')))
+        self.assertIsNone(self.authorizer.check(change_state()))
+
+    def test_check_returns_the_failed_result(self):
+        result = self.authorizer.check(change_state())
+        self.assertIsInstance(result, ChangeStateCommandResult)
+        self.assertEqual(result.outcome, CommandResult.OutCome.FAILED)
+        self.assertIsInstance(result.exception, BaseAuthenticator.NotAuthenticatedError)
+
+    def test_authorize_builds_the_successful_result(self):
+        command = change_state()
+        command.secret = self.authenticator.generate_secret()
+        result = self.authorizer.authorize(command)
+        self.assertIsInstance(result, ChangeStateCommandResult)
+        self.assertTrue(result.is_successful)
+
+        # one-time secret
+        self.assertFalse(self.authorizer.authorize(command).is_successful)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from ski_lift.core.remote.rabbitmq.backoff import ExponentialBackoff
+
+
+class ExponentialBackoffTest(unittest.TestCase):
+
+    def test_ceiling_grows_exponentially(self):
+        backoff = ExponentialBackoff(initial=0.5, maximum=30, multiplier=2)
+        for attempt in range(8):
+            self.assertLessEqual(backoff.next_delay(), min(30, 0.5 * 2 ** attempt))
+
+    def test_long_outage(self):
+        backoff = ExponentialBackoff(initial=0.5, maximum=30, multiplier=2)
+        # a few hours of reconnect attempts
+        for _ in range(5000):
+            self.assertLessEqual(backoff.next_delay(), 30)
+        self.assertEqual(backoff.attempts, 5000)
+
+    def test_reset(self):
+        backoff = ExponentialBackoff(initial=0.5, maximum=30)
+        for _ in range(2000):
+            backoff.next_delay()
+        backoff.reset()
+        self.assertLessEqual(backoff.next_delay(), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import json
+import unittest
+
+import msgpack
+from pika import BasicProperties
+
+from ski_lift.core.remote.rabbitmq.codec import (JSONCodec, MsgPackCodec,
+                                                 compress, decode_payload,
+                                                 get_codec)
+
+PAYLOAD: dict = {'message': 'Wind', 'abortTime': 15, 'user': 'op-1'}
+
+
+class ContentTypeTest(unittest.TestCase):
+
+    def test_codecs_are_picked_by_content_type(self):
+        self.assertIsInstance(get_codec('application/json'), JSONCodec)
+        self.assertIsInstance(get_codec('application/msgpack'), MsgPackCodec)
+
+    def test_missing_and_opaque_content_types_are_json(self):
+        for content_type in (None, 'application/octet-stream', 'text/plain'):
+            with self.subTest(content_type=content_type):
+                self.assertIsInstance(get_codec(content_type), JSONCodec)
+
+    def test_decode_payload(self):
+        cases = [
+            (BasicProperties(), json.dumps(PAYLOAD).encode()),
+            (BasicProperties(content_type='application/octet-stream'), json.dumps(PAYLOAD).encode()),
+            (BasicProperties(content_type='application/msgpack'), msgpack.packb(PAYLOAD)),
+        ]
+        for properties, body in cases:
+            with self.subTest(content_type=properties.content_type):
+                self.assertEqual(decode_payload(properties, body), PAYLOAD)
+
+    def test_compressed_payload(self):
+        body, content_encoding = compress(json.dumps(PAYLOAD).encode(), threshold=0)
+        properties = BasicProperties(content_type='application/json', content_encoding=content_encoding)
+        self.assertEqual(decode_payload(properties, body), PAYLOAD)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+
+from pika import BasicProperties
+
+from ski_lift.core.remote.rabbitmq.dedup import DedupIndex, message_key
+
+
+class DedupIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        patcher = mock.patch('ski_lift.core.remote.rabbitmq.dedup.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_duplicates_within_the_ttl(self):
+        index = DedupIndex(max_size=10, ttl=300)
+        self.assertFalse(index.is_duplicate('a'))
+        self.now = 299
+        self.assertTrue(index.is_duplicate('a'))
+        self.assertEqual(index.duplicate_count, 1)
+
+    def test_keys_expire(self):
+        index = DedupIndex(max_size=10, ttl=300)
+        index.is_duplicate('a')
+        self.now = 300
+        self.assertFalse(index.is_duplicate('a'))
+
+    def test_seeing_a_key_again_renews_it(self):
+        index = DedupIndex(max_size=10, ttl=300)
+        index.is_duplicate('a')
+        self.now = 200
+        index.is_duplicate('a')
+        self.now = 400
+        self.assertTrue(index.is_duplicate('a'))
+
+    def test_least_recently_seen_keys_are_evicted(self):
+        index = DedupIndex(max_size=2, ttl=300)
+        for key in ('a', 'b', 'a', 'c'):
+            index.is_duplicate(key)
+        self.assertEqual(len(index), 2)
+        self.assertTrue(index.is_duplicate('a'))
+        self.assertFalse(index.is_duplicate('b'))
+
+    def test_message_key(self):
+        self.assertEqual(message_key(BasicProperties(message_id='prefix.1')), 'prefix.1')
+        self.assertIsNone(message_key(BasicProperties()))
+
+
+if __name__ == '__main__':
+    unittest.main()
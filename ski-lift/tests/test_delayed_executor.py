@@ -0,0 +1,167 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from threading import Event
+from typing import List
+
+from ski_lift.core.command.descriptor.executor.delayed import \
+    DelayedCommandExecutor
+from ski_lift.core.command.descriptor.executor.journal import \
+    DelayedCommandJournal
+from ski_lift.core.command.descriptor.factory import CommandDescriptorFactory
+from ski_lift.core.command.descriptor.object import (
+    ChangeStateCommandDescriptor, CommandDescriptor)
+
+
+class RecordingExecutor(DelayedCommandExecutor):
+
+    def __init__(self, *args, **kwargs):
+        self.collapsed: List[CommandDescriptor] = []
+        self.recovered: List[CommandDescriptor] = []
+        super().__init__(*args, **kwargs)
+
+    def handle_collapsed(self, command: CommandDescriptor):
+        self.collapsed.append(command)
+
+    def handle_recovered(self, command: CommandDescriptor):
+        self.recovered.append(command)
+
+
+def emergency_stop(delay: int) -> CommandDescriptor:
+    return CommandDescriptorFactory.create_emergency_stop(user_card='card', delay=delay)
+
+
+def change_state(delay: int, option: str) -> CommandDescriptor:
+    return CommandDescriptorFactory.create_change_state(
+        user_card='card', delay=delay, new_state=ChangeStateCommandDescriptor.Option(option),
+    )
+
+
+class CoalescedAbortTest(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = RecordingExecutor()
+
+    def pending_ids(self) -> List[int]:
+        return [command.id for command in self.executor.pending_commands]
+
+    def test_aborting_a_replaced_state_change_keeps_the_new_one(self):
+        old, new = change_state(100, 'STOP'), change_state(100, 'MAX_STEAM')
+        self.executor.handle_delayed(old)
+        self.executor.handle_delayed(new)
+        self.assertEqual(self.executor.collapsed, [old])
+
+        self.executor.abort(old.id)
+        self.assertEqual(self.pending_ids(), [new.id])
+
+    def test_aborting_a_merged_emergency_stop_withdraws_it_only(self):
+        kept, later = emergency_stop(100), emergency_stop(200)
+        self.executor.handle_delayed(kept)
+        self.executor.handle_delayed(later)
+        self.assertEqual(self.executor.collapsed, [later])
+
+        self.executor.abort(later.id)
+        self.assertEqual(self.pending_ids(), [kept.id])
+        self.executor.abort(kept.id)
+        self.assertEqual(self.pending_ids(), [])
+
+    def test_aborting_the_kept_emergency_stop_promotes_a_requester(self):
+        stops = [emergency_stop(300), emergency_stop(100), emergency_stop(200)]
+        for stop in stops:
+            self.executor.handle_delayed(stop)
+        self.assertEqual(self.pending_ids(), [stops[1].id])
+
+        self.executor.abort(stops[1].id)
+        self.assertEqual(self.pending_ids(), [stops[2].id])
+        self.executor.abort(stops[0].id)
+        self.assertEqual(self.pending_ids(), [stops[2].id])
+        self.executor.abort(stops[2].id)
+        self.assertEqual(self.pending_ids(), [])
+
+
+class FailingExecutor(DelayedCommandExecutor):
+    """Fails to execute its first due command."""
+
+    def __init__(self, *args, **kwargs):
+        self.executed: List[CommandDescriptor] = []
+        self.second_executed: Event = Event()
+        super().__init__(*args, **kwargs)
+
+    def execute(self, descriptor: CommandDescriptor):
+        if descriptor.id in self._due_ids:
+            self.executed.append(descriptor)
+            if len(self.executed) == 1:
+                raise RuntimeError('engine unreachable')
+            self.second_executed.set()
+        return super().execute(descriptor)
+
+
+class SchedulerTest(unittest.TestCase):
+
+    def test_failing_command_does_not_stop_the_scheduler(self):
+        first, second = change_state(0, 'STOP'), emergency_stop(0)
+        with FailingExecutor() as executor:
+            with self.assertLogs('ski_lift.core.command.descriptor.executor.delayed', level='ERROR'):
+                executor.handle_delayed(first)
+                executor.handle_delayed(second)
+                self.assertTrue(executor.second_executed.wait(5))
+        self.assertEqual(executor.executed, [first, second])
+
+
+class JournalRecoveryTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'lift.delayed.jsonl')
+
+    def restart(self, max_lateness=None) -> RecordingExecutor:
+        executor = RecordingExecutor(journal=DelayedCommandJournal(self.path, max_lateness=max_lateness))
+        executor.start()
+        self.addCleanup(executor.stop)
+        return executor
+
+    def test_requesters_survive_a_restart(self):
+        stops = [emergency_stop(300), emergency_stop(100), emergency_stop(200)]
+        with RecordingExecutor(journal=DelayedCommandJournal(self.path)) as executor:
+            for stop in stops:
+                executor.handle_delayed(stop)
+            executor.abort(stops[0].id)
+
+        executor = self.restart()
+        self.assertEqual([command.id for command in executor.pending_commands], [stops[1].id])
+        executor.abort(stops[1].id)
+        self.assertEqual([command.id for command in executor.pending_commands], [stops[2].id])
+        executor.abort(stops[2].id)
+        self.assertEqual(executor.pending_commands, [])
+
+    def test_secrets_are_not_journaled(self):
+        command = change_state(300, 'STOP')
+        command.secret = 'one-time-secret'
+        with RecordingExecutor(journal=DelayedCommandJournal(self.path)) as executor:
+            executor.handle_delayed(command)
+        with open(self.path, encoding='utf-8') as file:
+            self.assertNotIn('one-time-secret', file.read())
+
+        executor = self.restart()
+        self.assertEqual([command.id for command in executor.recovered], [command.id])
+        self.assertIsNone(executor.recovered[0].secret)
+
+    def test_commands_overdue_for_too_long_are_dropped(self):
+        journal = DelayedCommandJournal(self.path)
+        late_change, late_stop, recent_change = change_state(60, 'STOP'), emergency_stop(60), change_state(60, 'STOP')
+        for command in (late_change, late_stop):
+            command.time = datetime.now() - timedelta(hours=2)
+        recent_change.time = datetime.now() - timedelta(seconds=90)
+        for command in (late_change, late_stop, recent_change):
+            journal.append_registered(command)
+        journal.close()
+
+        with self.assertLogs('ski_lift.core.command.descriptor.executor.delayed', level='WARNING'):
+            executor = self.restart(max_lateness=60)
+        self.assertEqual([command.id for command in executor.recovered], [late_stop.id, recent_change.id])
+
+
+if __name__ == '__main__':
+    unittest.main()
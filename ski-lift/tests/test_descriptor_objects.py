@@ -0,0 +1,39 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from ski_lift.core.command.descriptor.factory import CommandDescriptorFactory
+from ski_lift.core.command.descriptor.object import CommandDescriptor
+from ski_lift.core.command.descriptor_result_factory import \
+    DESCRIPTOR_RESULT_FACTORY
+from ski_lift.core.command.result.object import CommandResult
+
+
+def create_ids(count: int) -> List[int]:
+    return [CommandDescriptorFactory.create_display_status(user_card='card').id for _ in range(count)]
+
+
+class DescriptorObjectTest(unittest.TestCase):
+
+    def test_descriptors_and_results_are_slotted(self):
+        command = CommandDescriptorFactory.create_display_status(user_card='card')
+        result = DESCRIPTOR_RESULT_FACTORY.build(command, CommandResult.OutCome.SUCCESSFUL)
+        for obj in (command, result):
+            with self.subTest(obj=type(obj).__name__):
+                self.assertFalse(hasattr(obj, '__dict__'))
+                with self.assertRaises(AttributeError):
+                    obj.extra = 1
+
+    def test_ids_are_unique_across_threads(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            ids = [command_id for chunk in executor.map(create_ids, [1000] * 8) for command_id in chunk]
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_restored_ids_are_not_reused(self):
+        restored: int = create_ids(1)[0] + 100
+        CommandDescriptor._advance_id_counter(restored)
+        self.assertGreater(create_ids(1)[0], restored)
+
+
+if __name__ == '__main__':
+    unittest.main()
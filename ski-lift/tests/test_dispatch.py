@@ -0,0 +1,92 @@
+import unittest
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Tuple
+
+from ski_lift.core.command.descriptor.object import (
+    CommandDescriptor, EmergencyStopCommandDescriptor,
+    InsertCardCommandDescriptor)
+from ski_lift.core.command.descriptor.processor import (DESCRIPTOR_DISPATCH,
+                                                        DescriptorProcessor)
+from ski_lift.core.command.descriptor_result_factory import \
+    DESCRIPTOR_RESULT_FACTORY
+from ski_lift.core.command.result.object import (CommandResult,
+                                                 EmergencyStopCommandResult,
+                                                 InsertCardCommandResult)
+from ski_lift.core.command.result.processor import (RESULT_DISPATCH,
+                                                    ResultProcessor)
+from tests.test_serializer_codegen import descriptors, results
+
+
+class EmergencyStopDescriptorProcessor(DescriptorProcessor):
+
+    def process_descriptor_universally(self, command: CommandDescriptor) -> Tuple[str, Any]:
+        return 'universal', command
+
+    def process_emergency_stop_descriptor(self, command: EmergencyStopCommandDescriptor) -> Tuple[str, Any]:
+        return 'emergency_stop', command
+
+
+class EmergencyStopResultProcessor(ResultProcessor):
+
+    def process_result_universally(self, result: CommandResult) -> Tuple[str, Any]:
+        return 'universal', result
+
+    def process_emergency_stop_result(self, result: EmergencyStopCommandResult) -> Tuple[str, Any]:
+        return 'emergency_stop', result
+
+
+@dataclass(kw_only=True, slots=True)
+class BadgeInsertedCommandDescriptor(InsertCardCommandDescriptor):
+    """Class missing from the dispatch table."""
+
+
+class DispatchTest(unittest.TestCase):
+
+    def test_same_process_function_as_accept(self):
+        descriptor_processor = EmergencyStopDescriptorProcessor()
+        for command in descriptors():
+            with self.subTest(command=type(command).__name__):
+                self.assertEqual(descriptor_processor.process_descriptor(command), command.accept(descriptor_processor))
+                self.assertIs(
+                    type(DESCRIPTOR_RESULT_FACTORY.process_descriptor(command)),
+                    type(command.accept(DESCRIPTOR_RESULT_FACTORY)),
+                )
+        result_processor = EmergencyStopResultProcessor()
+        for result in results():
+            with self.subTest(result=type(result).__name__):
+                self.assertEqual(result_processor.process_result(result), result.accept(result_processor))
+
+    def test_falling_back_functions_resolve_to_the_universal_one(self):
+        table = DESCRIPTOR_DISPATCH.table(EmergencyStopDescriptorProcessor)
+        for command_class, handler in table.items():
+            with self.subTest(command_class=command_class.__name__):
+                expected = (
+                    EmergencyStopDescriptorProcessor.process_emergency_stop_descriptor
+                    if command_class is EmergencyStopCommandDescriptor
+                    else EmergencyStopDescriptorProcessor.process_descriptor_universally
+                )
+                self.assertIs(handler, expected)
+
+    def test_handled_classes(self):
+        self.assertEqual(
+            DESCRIPTOR_DISPATCH.handled_classes(
+                EmergencyStopDescriptorProcessor, EmergencyStopDescriptorProcessor.process_descriptor_universally,
+            ),
+            {EmergencyStopCommandDescriptor},
+        )
+        self.assertEqual(
+            RESULT_DISPATCH.handled_classes(
+                EmergencyStopResultProcessor, EmergencyStopResultProcessor.process_result_universally,
+            ),
+            {EmergencyStopCommandResult},
+        )
+
+    def test_unknown_classes_are_dispatched_through_accept(self):
+        command = BadgeInsertedCommandDescriptor(user_card=None, time=datetime.now(), card_to_insert='badge')
+        self.assertEqual(DESCRIPTOR_DISPATCH.dispatch(EmergencyStopDescriptorProcessor(), command), ('universal', command))
+        self.assertIsInstance(DESCRIPTOR_RESULT_FACTORY.process_descriptor(command), InsertCardCommandResult)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+from typing import Callable, List, Tuple
+from unittest import mock
+
+from pika.connection import ConnectionParameters
+
+from ski_lift.core.remote.rabbitmq.connection_manager import \
+    ConnectionManager
+from ski_lift.core.remote.rabbitmq.endpoint_pool import (CircuitBreaker,
+                                                         EndpointPool)
+
+
+class ClockTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('ski_lift.core.remote.rabbitmq.endpoint_pool.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class CircuitBreakerTest(ClockTestCase):
+
+    def test_opens_after_the_failure_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        self.assertTrue(breaker.allows())
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+        self.assertFalse(breaker.allows())
+
+    def test_half_open_after_the_reset_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        self.now += 30
+        self.assertTrue(breaker.allows())
+
+        # the trial attempt fails
+        breaker.record_failure()
+        self.assertFalse(breaker.allows())
+        self.now += 30
+        breaker.record_success()
+        self.assertFalse(breaker.is_open)
+
+
+def pool(*hosts: str, **kwargs) -> EndpointPool:
+    with mock.patch('ski_lift.core.remote.rabbitmq.endpoint_pool.random.randrange', lambda count: 0):
+        return EndpointPool([ConnectionParameters(host=host) for host in hosts], **kwargs)
+
+
+class EndpointPoolTest(ClockTestCase):
+
+    def test_requires_an_endpoint(self):
+        with self.assertRaises(ValueError):
+            EndpointPool([])
+
+    def test_round_robin_between_healthy_endpoints(self):
+        endpoints = pool('node-1', 'node-2', 'node-3')
+        self.assertEqual([repr(endpoints.select()) for _ in range(4)], [
+            'node-1:5672', 'node-2:5672', 'node-3:5672', 'node-1:5672',
+        ])
+
+    def test_fails_over_to_the_available_endpoints(self):
+        endpoints = pool('node-1', 'node-2')
+        endpoints.select().record_failure()
+        self.assertTrue(endpoints.has_available())
+        self.assertEqual([repr(endpoints.select()) for _ in range(2)], ['node-2:5672', 'node-2:5672'])
+
+    def test_prefers_the_healthier_endpoint(self):
+        endpoints = pool('node-1', 'node-2', reset_timeout=0)
+        node_1, node_2 = endpoints.endpoints
+        node_1.record_failure()
+        node_1.record_success()
+        self.assertLess(node_1.score, node_2.score)
+        self.assertIs(endpoints.select(), node_2)
+        self.assertIs(endpoints.select(), node_2)
+
+    def test_oldest_failure_is_retried_when_every_breaker_is_open(self):
+        endpoints = pool('node-1', 'node-2')
+        node_1, node_2 = endpoints.endpoints
+        node_2.record_failure()
+        self.now += 1
+        node_1.record_failure()
+        self.assertFalse(endpoints.has_available())
+        self.assertIs(endpoints.select(), node_2)
+
+
+class StubIOLoop(object):
+
+    def __init__(self):
+        self.timers: List[Tuple[float, Callable]] = []
+
+    def call_later(self, delay: float, callback: Callable) -> Tuple[float, Callable]:
+        self.timers.append((delay, callback))
+        return delay, callback
+
+    def stop(self) -> None:
+        pass
+
+
+class FailoverTest(ClockTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.manager = ConnectionManager(pool('node-1', 'node-2'))
+        self.manager._ioloop = StubIOLoop()
+        self.connected: List[str] = []
+        self.manager.connect = self.connect
+
+    def connect(self) -> None:
+        self.manager._endpoint = self.manager._endpoints.select()
+        self.connected.append(repr(self.manager._endpoint))
+
+    def fail_attempt(self) -> float:
+        self.manager.on_connection_open_error(None, Exception('connection refused'))
+        delay, callback = self.manager._ioloop.timers.pop()
+        callback()
+        return delay
+
+    def test_next_node_is_tried_right_away(self):
+        self.manager.reconnect()
+        self.assertEqual(self.fail_attempt(), 0)
+        self.assertEqual(self.connected, ['node-1:5672', 'node-2:5672'])
+
+    def test_backs_off_once_every_node_failed(self):
+        self.manager.reconnect()
+        self.fail_attempt()
+        with self.assertLogs('ski_lift.core.remote.rabbitmq.connection_manager', level='INFO') as logs:
+            self.fail_attempt()
+        self.assertIn('Reconnecting to RabbitMQ', logs.output[-1])
+        self.assertEqual(self.connected, ['node-1:5672', 'node-2:5672', 'node-1:5672'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import time
+import unittest
+from typing import Callable, List
+
+import pika
+from pika import frame, spec
+from pika.exceptions import ChannelClosedByBroker
+
+from ski_lift.core.remote.rabbitmq.fake_broker import FakeBroker, _Connection
+
+
+class FrameParsingTest(unittest.TestCase):
+
+    def test_frames_split_across_reads(self):
+        frames: List[frame.Frame] = [
+            frame.Method(1, spec.Basic.Publish(exchange='exchange', routing_key='lift-1')),
+            frame.Header(1, 5, spec.BasicProperties(content_type='application/json')),
+            frame.Body(1, b'hello'),
+        ]
+        data: bytes = frame.ProtocolHeader().marshal() + b''.join(f.marshal() for f in frames)
+        connection = _Connection(broker=None)
+        for index in range(len(data)):
+            connection.data_received(data[index:index + 1])
+
+        decoded: List[frame.Frame] = []
+        while not connection._incoming.empty():
+            decoded.append(connection._incoming.get_nowait())
+        self.assertIsInstance(decoded[0], frame.ProtocolHeader)
+        self.assertEqual(decoded[1].method.routing_key, 'lift-1')
+        self.assertEqual(decoded[2].body_size, 5)
+        self.assertEqual(decoded[3].fragment, b'hello')
+        self.assertEqual(len(connection._buffer), 0)
+
+
+class FakeBrokerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.broker = FakeBroker()
+        self.broker.start()
+        self.addCleanup(self.broker.stop)
+        self.connection = pika.BlockingConnection(
+            pika.ConnectionParameters(host=self.broker.host, port=self.broker.port)
+        )
+        self.addCleanup(lambda: self.connection.is_open and self.connection.close())
+        self.channel = self.connection.channel()
+
+    def wait_for(self, predicate: Callable[[], bool], timeout: float = 5) -> bool:
+        deadline: float = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                return False
+            self.connection.process_data_events(time_limit=0.01)
+        return True
+
+    def test_unused_queue_expires(self):
+        self.channel.queue_declare('lift-1', arguments={'x-expires': 100})
+        self.assertTrue(self.broker.has_queue('lift-1'))
+        self.assertTrue(self.wait_for(lambda: not self.broker.has_queue('lift-1')))
+        self.assertEqual(self.broker.stats.expired, 1)
+
+        with self.assertRaises(ChannelClosedByBroker) as context:
+            self.channel.queue_declare('lift-1', passive=True)
+        self.assertEqual(context.exception.reply_code, 404)
+
+    def test_consumed_queue_does_not_expire(self):
+        self.channel.queue_declare('lift-1', arguments={'x-expires': 100})
+        self.channel.basic_consume('lift-1', lambda *args: None)
+        self.connection.process_data_events(time_limit=0.3)
+        self.assertTrue(self.broker.has_queue('lift-1'))
+
+    def test_publishing_is_throttled_while_blocked(self):
+        blocked: List[bool] = []
+        self.connection.add_on_connection_blocked_callback(lambda *args: blocked.append(True))
+        self.connection.add_on_connection_unblocked_callback(lambda *args: blocked.append(False))
+        self.channel.queue_declare('lift-1')
+
+        self.broker.block_connections()
+        self.assertTrue(self.wait_for(lambda: blocked == [True]))
+        self.channel.basic_publish('', 'lift-1', b'telemetry')
+        self.assertTrue(self.wait_for(lambda: self.broker.stats.throttled == 1))
+        self.assertEqual(self.broker.stats.published, 0)
+
+        self.broker.unblock_connections()
+        self.assertTrue(self.wait_for(lambda: blocked == [True, False]))
+        self.assertTrue(self.wait_for(lambda: self.broker.queue_depth('lift-1') == 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from typing import List
+
+from ski_lift.core.remote.rabbitmq.lane import Lane
+from ski_lift.core.remote.rabbitmq.lane_outbox import LaneOutbox
+from ski_lift.core.remote.rabbitmq.outbox import Outbox
+from ski_lift.core.remote.rabbitmq.outgoing_message import OutgoingMessage
+
+
+def drain(outbox: LaneOutbox) -> List[bytes]:
+    bodies: List[bytes] = []
+    while outbox:
+        bodies.append(outbox.popleft().body)
+    return bodies
+
+
+class LanePriorityTest(unittest.TestCase):
+
+    def test_higher_lanes_are_served_first(self):
+        outbox = LaneOutbox()
+        outbox.append(OutgoingMessage('lift-1.telemetry', b'telemetry-1', lane=Lane.TELEMETRY))
+        outbox.append(OutgoingMessage('lift-1.status', b'status', lane=Lane.STATUS))
+        outbox.append(OutgoingMessage('lift-1.telemetry', b'telemetry-2', lane=Lane.TELEMETRY))
+        outbox.append(OutgoingMessage('lift-1', b'command', lane=Lane.COMMAND))
+        self.assertEqual(len(outbox), 4)
+        self.assertEqual(drain(outbox), [b'command', b'status', b'telemetry-1', b'telemetry-2'])
+
+    def test_requeued_messages_go_to_the_front_of_their_lane(self):
+        outbox = LaneOutbox()
+        outbox.append(OutgoingMessage('lift-1.report', b'report-2'))
+        outbox.append(OutgoingMessage('lift-1.status', b'status', lane=Lane.STATUS))
+        outbox.extendleft([OutgoingMessage('lift-1.report', b'report-1')])
+        self.assertEqual(drain(outbox), [b'report-1', b'report-2', b'status'])
+
+    def test_shed_drops_only_the_given_lanes(self):
+        outbox = LaneOutbox()
+        outbox.append(OutgoingMessage('lift-1', b'command', lane=Lane.COMMAND))
+        for index in range(3):
+            outbox.append(OutgoingMessage('lift-1.telemetry', str(index).encode(), lane=Lane.TELEMETRY))
+        self.assertEqual(outbox.shed([Lane.STATUS, Lane.TELEMETRY]), 3)
+        self.assertEqual(drain(outbox), [b'command'])
+
+
+def status(body: bytes, routing_key: str = 'lift-1.status') -> OutgoingMessage:
+    return OutgoingMessage(routing_key, body, lane=Lane.STATUS)
+
+
+class ConflationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.outbox = LaneOutbox(conflate=['*.status'])
+
+    def test_newer_value_replaces_the_pending_one_in_place(self):
+        self.outbox.append(status(b'lift-1 old'))
+        self.outbox.append(status(b'lift-2', 'lift-2.status'))
+        self.outbox.append(status(b'lift-1 new'))
+        self.assertEqual(self.outbox.conflated_count, 1)
+        self.assertEqual(drain(self.outbox), [b'lift-1 new', b'lift-2'])
+
+    def test_other_routing_keys_are_kept(self):
+        for body in (b'report-1', b'report-2'):
+            self.outbox.append(OutgoingMessage('lift-1.report', body))
+        self.assertFalse(self.outbox.is_conflated('lift-1.report'))
+        self.assertEqual(drain(self.outbox), [b'report-1', b'report-2'])
+
+    def test_requeued_stale_value_is_dropped(self):
+        self.outbox.append(status(b'new'))
+        self.outbox.extendleft([status(b'nacked')])
+        self.assertEqual(self.outbox.conflated_count, 1)
+        self.assertEqual(drain(self.outbox), [b'new'])
+
+    def test_requeued_value_goes_to_the_front(self):
+        self.outbox.append(status(b'lift-2', 'lift-2.status'))
+        self.outbox.extendleft([status(b'nacked')])
+        self.assertEqual(drain(self.outbox), [b'nacked', b'lift-2'])
+
+    def test_latest_values_are_persisted_on_close(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'status.segment')
+        outbox = LaneOutbox({Lane.STATUS: Outbox(segment_path=path)}, conflate=['*.status'])
+        outbox.append(status(b'old'))
+        outbox.append(status(b'new'))
+        outbox.close()
+
+        reopened = LaneOutbox({Lane.STATUS: Outbox(segment_path=path)}, conflate=['*.status'])
+        self.assertEqual(drain(reopened), [b'new'])
+        reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+from datetime import datetime
+from typing import List
+
+from ski_lift.core.command.descriptor.object import (
+    CommandDescriptor, EmergencyStopCommandDescriptor)
+from ski_lift.core.command.descriptor.processor import DESCRIPTOR_DISPATCH
+from ski_lift.core.command.result.object import (CommandResult,
+                                                 EmergencyStopCommandResult)
+from ski_lift.core.command.result.processor import RESULT_DISPATCH
+from ski_lift.core.monitor.descriptor.descriptor_monitor import (
+    CommandDescriptorMonitor, CommandDescriptorMonitorSource)
+from ski_lift.core.monitor.result.delivery import SYNCHRONOUS_DELIVERY
+from ski_lift.core.monitor.result.result_monitor import (
+    CommandResultMonitor, CommandResultMonitorSource)
+from tests.test_dispatch import BadgeInsertedCommandDescriptor
+from tests.test_serializer_codegen import descriptors, results
+
+
+class EmergencyStopResultMonitor(CommandResultMonitor):
+
+    def __init__(self):
+        self.received: List[CommandResult] = []
+
+    def process_emergency_stop_result(self, result: EmergencyStopCommandResult) -> None:
+        self.received.append(result)
+
+
+class DeclaredResultMonitor(EmergencyStopResultMonitor):
+
+    result_types = (CommandResult,)
+
+
+class UniversalResultMonitor(EmergencyStopResultMonitor):
+
+    def process_result_universally(self, result: CommandResult) -> None:
+        self.received.append(result)
+
+
+class OverriddenResultMonitor(EmergencyStopResultMonitor):
+
+    def monitor_result(self, result: CommandResult) -> None:
+        self.received.append(result)
+
+
+class ResultSubscriptionTest(unittest.TestCase):
+
+    def forward(self, *monitors: EmergencyStopResultMonitor) -> CommandResultMonitorSource:
+        source = CommandResultMonitorSource(result_delivery=SYNCHRONOUS_DELIVERY)
+        for monitor in monitors:
+            source.register_result_monitor(monitor)
+        for result in results():
+            source.forward_command_result(result)
+        return source
+
+    def test_monitors_receive_only_the_overridden_classes(self):
+        monitor = EmergencyStopResultMonitor()
+        self.assertEqual(EmergencyStopResultMonitor.subscribed_result_types(), {EmergencyStopCommandResult})
+        self.forward(monitor)
+        self.assertTrue(monitor.received)
+        self.assertTrue(all(type(result) is EmergencyStopCommandResult for result in monitor.received))
+
+    def test_declared_result_types_replace_the_overridden_classes(self):
+        self.assertEqual(DeclaredResultMonitor.subscribed_result_types(), frozenset(RESULT_DISPATCH.handler_names))
+
+    def test_universal_monitors_receive_every_result(self):
+        for monitor_class in (UniversalResultMonitor, OverriddenResultMonitor):
+            with self.subTest(monitor_class=monitor_class.__name__):
+                monitor = monitor_class()
+                self.forward(monitor)
+                self.assertEqual(len(monitor.received), len(results()))
+
+    def test_removed_monitors_are_dropped_from_the_index(self):
+        monitor, other = EmergencyStopResultMonitor(), EmergencyStopResultMonitor()
+        source = self.forward(monitor, other)
+        source.remove_result_monitor(monitor)
+        received = len(monitor.received)
+        for result in results():
+            source.forward_command_result(result)
+        self.assertEqual(len(monitor.received), received)
+        self.assertEqual(len(other.received), 2 * received)
+
+
+class EmergencyStopDescriptorMonitor(CommandDescriptorMonitor):
+
+    def __init__(self):
+        self.received: List[CommandDescriptor] = []
+
+    def process_emergency_stop_descriptor(self, command: EmergencyStopCommandDescriptor) -> None:
+        self.received.append(command)
+
+
+class DeclaredDescriptorMonitor(EmergencyStopDescriptorMonitor):
+
+    command_types = (CommandDescriptor,)
+
+
+class RecordingDescriptorMonitor(EmergencyStopDescriptorMonitor):
+
+    command_types = (EmergencyStopCommandDescriptor,)
+
+    def process_descriptor_universally(self, command: CommandDescriptor) -> None:
+        self.received.append(command)
+
+
+class DescriptorSubscriptionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.source = CommandDescriptorMonitorSource()
+        self.monitor = EmergencyStopDescriptorMonitor()
+        self.source.register_descriptor_monitor(self.monitor)
+
+    def test_monitors_receive_only_the_overridden_classes(self):
+        for command in descriptors():
+            self.source.forward_command_descriptor(command)
+        self.assertTrue(self.monitor.received)
+        self.assertTrue(all(type(command) is EmergencyStopCommandDescriptor for command in self.monitor.received))
+        self.assertEqual(
+            DeclaredDescriptorMonitor.subscribed_command_types(), frozenset(DESCRIPTOR_DISPATCH.handler_names),
+        )
+
+    def test_unknown_classes_are_forwarded_to_every_monitor(self):
+        command = BadgeInsertedCommandDescriptor(user_card=None, time=datetime.now(), card_to_insert='badge')
+        monitor = RecordingDescriptorMonitor()
+        self.source.register_descriptor_monitor(monitor)
+        self.assertNotIn(type(command), monitor.subscribed_command_types())
+        self.source.forward_command_descriptor(command)
+        self.assertEqual(monitor.received, [command])
+
+    def test_removed_monitors_are_dropped_from_the_index(self):
+        self.source.remove_descriptor_monitor(self.monitor)
+        for command in descriptors():
+            self.source.forward_command_descriptor(command)
+        self.assertEqual(self.monitor.received, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from typing import List
+
+from ski_lift.core.remote.rabbitmq.lane import Lane
+from ski_lift.core.remote.rabbitmq.outbox import Outbox
+from ski_lift.core.remote.rabbitmq.outgoing_message import OutgoingMessage
+
+
+def message(body: bytes) -> OutgoingMessage:
+    return OutgoingMessage('lift-1.status', body, headers={'lift-id': 'lift-1'}, lane=Lane.STATUS, message_id=body.decode())
+
+
+def drain(outbox: Outbox) -> List[bytes]:
+    bodies: List[bytes] = []
+    while outbox:
+        bodies.append(outbox.popleft().body)
+    return bodies
+
+
+class OutboxTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'outbox', 'lift-1.segment')
+
+    def open(self, memory_limit: int = 2) -> Outbox:
+        outbox = Outbox(memory_limit=memory_limit, segment_path=self.path)
+        self.addCleanup(outbox.close)
+        return outbox
+
+    def test_oldest_messages_are_spilled_in_order(self):
+        outbox = self.open()
+        for index in range(5):
+            outbox.append(message(str(index).encode()))
+        self.assertEqual(outbox.spilled_count, 3)
+        self.assertEqual(len(outbox), 5)
+        self.assertEqual(drain(outbox), [b'0', b'1', b'2', b'3', b'4'])
+
+    def test_requeued_messages_are_served_first(self):
+        outbox = self.open()
+        for index in range(4):
+            outbox.append(message(str(index).encode()))
+        first = outbox.popleft()
+        outbox.extendleft([first])
+        self.assertEqual(drain(outbox), [b'0', b'1', b'2', b'3'])
+
+    def test_spilled_messages_keep_their_fields(self):
+        outbox = self.open(memory_limit=0)
+        outbox.append(message(b'spilled'))
+        self.assertEqual(outbox.popleft(), message(b'spilled'))
+
+    def test_remaining_messages_are_replayed_after_a_restart(self):
+        outbox = self.open()
+        for index in range(5):
+            outbox.append(message(str(index).encode()))
+        outbox.popleft()
+        outbox.close()
+
+        self.assertEqual(drain(self.open()), [b'1', b'2', b'3', b'4'])
+
+    def test_torn_last_record_is_ignored(self):
+        outbox = self.open(memory_limit=0)
+        for index in range(2):
+            outbox.append(message(str(index).encode()))
+        outbox.close()
+        # as if the process crashed in the middle of the second write
+        with open(self.path, 'r+b') as segment:
+            segment.truncate(os.path.getsize(self.path) - 1)
+
+        with self.assertLogs('ski_lift.core.remote.rabbitmq.outbox', level='INFO'):
+            reopened = Outbox(memory_limit=0, segment_path=self.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(drain(reopened), [b'0'])
+
+    def test_oldest_messages_are_dropped_without_a_segment(self):
+        outbox = Outbox(memory_limit=2)
+        for index in range(4):
+            outbox.append(message(str(index).encode()))
+        self.assertEqual(outbox.dropped_count, 2)
+        self.assertEqual(drain(outbox), [b'2', b'3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
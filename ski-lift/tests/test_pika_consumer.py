@@ -0,0 +1,221 @@
+import unittest
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
+
+from pika import BasicProperties
+from pika.exceptions import ChannelClosedByBroker
+
+from ski_lift.core.remote.rabbitmq.pika_consumer import ExampleConsumer
+
+
+class StubChannel(object):
+
+    def __init__(self):
+        self.is_open: bool = True
+        self.acks: List[Tuple[int, bool]] = []
+        self.nacks: List[Tuple[int, bool]] = []
+
+    def basic_ack(self, delivery_tag: int, multiple: bool = False) -> None:
+        self.acks.append((delivery_tag, multiple))
+
+    def basic_nack(self, delivery_tag: int, requeue: bool = True) -> None:
+        self.nacks.append((delivery_tag, requeue))
+
+
+class StubIOLoop(object):
+
+    def __init__(self):
+        self.timers: List[Callable] = []
+
+    def call_later(self, delay: float, callback: Callable) -> Callable:
+        self.timers.append(callback)
+        return callback
+
+    def remove_timeout(self, timer: Callable) -> None:
+        self.timers.remove(timer)
+
+
+class StubManager(object):
+
+    def __init__(self):
+        self.ioloop: StubIOLoop = StubIOLoop()
+        self.opened: int = 0
+
+    def open_channel(self, client) -> None:
+        self.opened += 1
+
+    def call_threadsafe(self, callback: Callable) -> bool:
+        callback()
+        return True
+
+
+class StubExecutor(object):
+    """Keeps the submitted callbacks, the test runs them in any order."""
+
+    def __init__(self, max_pending: int = 100):
+        self.max_pending: int = max_pending
+        self.tasks: dict = {}
+
+    def try_submit(self, key, task: Callable, *args) -> bool:
+        if len(self.tasks) >= self.max_pending:
+            return False
+        _, basic_deliver, _, _ = args
+        self.tasks[basic_deliver.delivery_tag] = (task, args)
+        return True
+
+    def run(self, delivery_tag: int) -> None:
+        task, args = self.tasks.pop(delivery_tag)
+        task(*args)
+
+
+class OutOfOrderAckTest(unittest.TestCase):
+
+    def setUp(self):
+        self.handled: List[bytes] = []
+        self.executor = StubExecutor()
+        self.consumer = ExampleConsumer(
+            exchange='exchange',
+            exchange_type='topic',
+            route_key='lift-1',
+            callback=lambda channel, basic_deliver, properties, body: self.handled.append(body),
+            prefetch_count=10,
+            ack_batch_size=2,
+            executor=self.executor,
+        )
+        self.manager = StubManager()
+        self.consumer._manager = self.manager
+        self.channel = StubChannel()
+        self.consumer._channel = self.channel
+
+    def deliver(self, *delivery_tags: int) -> None:
+        for delivery_tag in delivery_tags:
+            self.consumer.on_message(
+                self.channel,
+                SimpleNamespace(delivery_tag=delivery_tag, routing_key='lift-1'),
+                BasicProperties(),
+                str(delivery_tag).encode(),
+            )
+
+    def fire_ack_timer(self) -> None:
+        for timer in list(self.manager.ioloop.timers):
+            timer()
+
+    def test_completions_after_a_flush_are_acknowledged(self):
+        self.deliver(1, 2, 3, 4)
+        self.executor.run(2)
+        self.executor.run(1)
+        self.assertEqual(self.channel.acks, [(2, True)])
+
+        self.executor.run(4)
+        self.executor.run(3)
+        self.assertEqual(self.channel.acks, [(2, True), (4, True)])
+        self.assertEqual(len(self.handled), 4)
+
+    def test_unfinished_deliveries_are_not_acknowledged(self):
+        self.deliver(1, 2, 3)
+        self.executor.run(1)
+        self.executor.run(3)
+        self.fire_ack_timer()
+        self.assertEqual(self.channel.acks, [(1, False)])
+
+        self.executor.run(2)
+        self.fire_ack_timer()
+        self.assertEqual(self.channel.acks, [(1, False), (3, True)])
+
+    def test_messages_finding_the_executor_full_are_requeued(self):
+        self.executor.max_pending = 2
+        self.deliver(1, 2, 3)
+        self.assertEqual(self.channel.nacks, [(3, True)])
+        self.assertEqual(self.consumer.statistics.requeued, 1)
+
+        self.executor.run(1)
+        self.executor.run(2)
+        self.assertEqual(self.channel.acks, [(2, True)])
+        self.assertEqual(len(self.consumer._ack_tracker), 0)
+
+    def test_executor_requires_manual_acks_and_prefetch(self):
+        for settings in ({'auto_ack': True, 'prefetch_count': 10}, {'auto_ack': False, 'prefetch_count': 0}):
+            with self.subTest(**settings), self.assertRaises(ValueError):
+                ExampleConsumer(
+                    exchange='exchange', exchange_type='topic', route_key='lift-1', callback=lambda *args: None,
+                    executor=self.executor, **settings,
+                )
+
+    def test_closing_the_channel_forgets_the_deliveries(self):
+        self.deliver(1, 2)
+        self.consumer.on_channel_closed(self.channel, Exception('connection lost'))
+        self.assertEqual(len(self.consumer._ack_tracker), 0)
+
+
+class DeduplicationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.handled: List[bytes] = []
+        self.consumer = ExampleConsumer(
+            exchange='exchange',
+            exchange_type='direct',
+            route_key='lift-1',
+            callback=lambda channel, basic_deliver, properties, body: self.handled.append(body),
+            dedup_size=10,
+        )
+        self.consumer._manager = StubManager()
+        self.channel = StubChannel()
+        self.consumer._channel = self.channel
+
+    def deliver(self, delivery_tag: int, body: bytes, message_id=None) -> None:
+        self.consumer.on_message(
+            self.channel,
+            SimpleNamespace(delivery_tag=delivery_tag, routing_key='lift-1'),
+            BasicProperties(message_id=message_id),
+            body,
+        )
+
+    def test_messages_without_id_are_never_dropped(self):
+        # the web client re-sending the same emergency stop
+        body = b'{"message": "Wind", "abortTime": 15}'
+        self.deliver(1, body)
+        self.deliver(2, body)
+        self.assertEqual(self.handled, [body, body])
+
+    def test_copies_of_a_message_id_are_dropped(self):
+        self.deliver(1, b'report', message_id='prefix.1')
+        self.deliver(2, b'report', message_id='prefix.1')
+        self.assertEqual(self.handled, [b'report'])
+        self.assertEqual(self.consumer._statistics.duplicates, 1)
+
+
+class ChannelReopenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.consumer = ExampleConsumer(
+            exchange='exchange', exchange_type='topic', route_key='lift-1', callback=lambda *args: None,
+        )
+        self.manager = StubManager()
+        self.consumer._manager = self.manager
+
+    def close_by_broker(self) -> None:
+        self.consumer._channel = StubChannel()
+        self.consumer._is_topology_declared = True
+        self.consumer.on_channel_closed(self.consumer._channel, ChannelClosedByBroker(406, 'PRECONDITION_FAILED'))
+
+    def test_reopens_right_away_once_per_consume(self):
+        self.consumer.on_consumeok(None)
+        self.close_by_broker()
+        self.assertEqual(self.manager.opened, 1)
+        self.close_by_broker()
+        self.close_by_broker()
+        self.assertEqual(self.manager.opened, 1)
+
+        self.consumer.on_consumeok(None)
+        self.close_by_broker()
+        self.assertEqual(self.manager.opened, 2)
+
+    def test_failing_declarations_are_left_to_the_manager(self):
+        for _ in range(3):
+            self.close_by_broker()
+        self.assertEqual(self.manager.opened, 0)
+        self.assertFalse(self.consumer._is_topology_declared)
+
+
+if __name__ == '__main__':
+    unittest.main()
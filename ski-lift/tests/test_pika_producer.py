@@ -0,0 +1,340 @@
+import queue
+import threading
+import unittest
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+
+from pika import BasicProperties
+from pika.exchange_type import ExchangeType
+from pika.spec import Basic
+
+from ski_lift.core.remote.rabbitmq.batching import BatchPolicy
+from ski_lift.core.remote.rabbitmq.codec import MsgPackCodec, decode_payload
+from ski_lift.core.remote.rabbitmq.lane import Lane
+from ski_lift.core.remote.rabbitmq.outgoing_message import OutgoingMessage
+from ski_lift.core.remote.rabbitmq.pika_producer import PikaProducer
+
+
+class StubChannel(object):
+
+    def __init__(self):
+        self.is_open: bool = True
+        self.published: List[bytes] = []
+        self.message_ids: List[str] = []
+        self.content_encodings: List[Optional[str]] = []
+
+    def basic_publish(self, exchange: str, routing_key: str, body: bytes, properties=None) -> None:
+        self.published.append(body)
+        # the properties of a publisher handle are shared, keep what was sent
+        self.message_ids.append(properties.message_id)
+        self.content_encodings.append(properties.content_encoding)
+
+
+class StubIOLoop(object):
+
+    def __init__(self):
+        self.timers: List[Callable] = []
+
+    def call_later(self, delay: float, callback: Callable) -> Callable:
+        self.timers.append(callback)
+        return callback
+
+    def remove_timeout(self, timer: Callable) -> None:
+        self.timers.remove(timer)
+
+    def run_timers(self, rounds: int = 10) -> None:
+        """Run the timers, and the ones they schedule, a few times."""
+        for _ in range(rounds):
+            timers, self.timers = self.timers, []
+            for timer in timers:
+                timer()
+
+
+class StubManager(object):
+
+    def __init__(self):
+        self.ioloop: StubIOLoop = StubIOLoop()
+
+    def call_threadsafe(self, callback: Callable) -> bool:
+        callback()
+        return True
+
+
+class LoopManager(object):
+    """Runs the callbacks on its own thread, like the IO loop."""
+
+    def __init__(self):
+        self.ioloop: StubIOLoop = StubIOLoop()
+        self.callbacks: queue.Queue = queue.Queue()
+        self.thread: threading.Thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            callback: Optional[Callable] = self.callbacks.get()
+            if callback is None:
+                return
+            callback()
+
+    def call_threadsafe(self, callback: Callable) -> bool:
+        self.callbacks.put(callback)
+        return True
+
+    def attach(self, client) -> None:
+        pass
+
+    def detach(self, client) -> None:
+        pass
+
+    def acquire(self) -> None:
+        pass
+
+    def release(self) -> None:
+        self.callbacks.put(None)
+        self.thread.join()
+
+
+class PublishRateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = StubManager()
+        # practically no tokens are refilled during the test
+        self.producer = PikaProducer(
+            exchange='exchange',
+            exchange_type=ExchangeType.topic,
+            publish_batch_size=2,
+            publish_rate=0.001,
+            connection_manager=self.manager,
+        )
+        self.channel = StubChannel()
+        self.producer._channel = self.channel
+
+    def add_pending(self, count: int) -> None:
+        for index in range(count):
+            self.producer._pending_messages.append(OutgoingMessage('lift-1', str(index).encode()))
+
+    def test_reconnect_backlog_is_paced(self):
+        self.add_pending(5)
+        self.producer.setup_exchange_ok(None)
+        self.manager.ioloop.run_timers()
+        self.assertEqual(len(self.channel.published), 2)
+        self.assertEqual(len(self.producer._pending_messages), 3)
+
+    def test_messages_after_the_backlog_are_not_paced(self):
+        self.add_pending(2)
+        self.producer.setup_exchange_ok(None)
+        self.assertEqual(len(self.channel.published), 2)
+
+        self.add_pending(5)
+        self.producer.send_pending_messages()
+        self.manager.ioloop.run_timers()
+        self.assertEqual(len(self.channel.published), 7)
+
+
+def confirmation(method) -> SimpleNamespace:
+    return SimpleNamespace(method=method)
+
+
+class ConfirmWindowTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = StubManager()
+        self.producer = PikaProducer(
+            exchange='exchange', exchange_type=ExchangeType.topic, max_unconfirmed=2, connection_manager=self.manager,
+        )
+        self.channel = StubChannel()
+        self.producer._channel = self.channel
+        self.producer.setup_exchange_ok(None)
+
+    def publish(self, *bodies: bytes) -> None:
+        for body in bodies:
+            self.producer.publish_message('lift-1.report', body)
+
+    def test_publishing_stops_while_the_window_is_full(self):
+        self.publish(b'1', b'2', b'3', b'4')
+        self.assertEqual(self.channel.published, [b'1', b'2'])
+
+        self.producer.on_delivery_confirmation(confirmation(Basic.Ack(delivery_tag=2, multiple=True)))
+        self.assertEqual(self.channel.published, [b'1', b'2', b'3', b'4'])
+        self.assertEqual(self.producer.confirm_statistics.acked, 2)
+        self.assertEqual(self.producer.unconfirmed_count, 2)
+
+    def test_nacked_messages_are_published_again_first(self):
+        self.publish(b'1', b'2', b'3')
+        self.producer.on_delivery_confirmation(confirmation(Basic.Nack(delivery_tag=1, multiple=False)))
+        self.assertEqual(self.channel.published, [b'1', b'2', b'1'])
+        # the broker can deduplicate the copies
+        self.assertEqual(self.channel.message_ids[0], self.channel.message_ids[2])
+        self.assertEqual(self.producer.confirm_statistics.nacked, 1)
+
+    def test_unconfirmed_messages_are_requeued_when_the_channel_closes(self):
+        self.publish(b'1', b'2', b'3')
+        self.producer.on_channel_closed(self.channel, Exception('connection lost'))
+        self.assertEqual(self.producer.confirm_statistics.requeued, 2)
+        self.assertEqual(self.producer.unconfirmed_count, 0)
+
+        self.channel = StubChannel()
+        self.producer._channel = self.channel
+        self.producer.setup_exchange_ok(None)
+        self.producer.on_delivery_confirmation(confirmation(Basic.Ack(delivery_tag=4, multiple=True)))
+        self.assertEqual(self.channel.published, [b'1', b'2', b'3'])
+
+
+class FlowControlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = StubManager()
+        self.producer = PikaProducer(
+            exchange='exchange', exchange_type=ExchangeType.topic, connection_manager=self.manager,
+        )
+        self.channel = StubChannel()
+        self.producer._channel = self.channel
+        self.producer.setup_exchange_ok(None)
+
+    def publish(self, routing_key: str, lane: Lane) -> None:
+        self.producer.publish_message(routing_key, routing_key.encode(), lane=lane)
+
+    def test_low_lanes_are_shed_while_blocked(self):
+        self.producer.on_connection_blocked()
+        self.publish('lift-1', Lane.COMMAND)
+        self.publish('lift-1.status', Lane.STATUS)
+        self.publish('lift-1.telemetry', Lane.TELEMETRY)
+        self.assertEqual(self.channel.published, [])
+        self.assertEqual(self.producer.shed_count, 2)
+
+        self.producer.on_connection_unblocked()
+        self.assertEqual(self.channel.published, [b'lift-1'])
+
+    def test_blocking_sheds_the_pending_low_lane_messages(self):
+        self.producer._channel = None
+        self.publish('lift-1.telemetry', Lane.TELEMETRY)
+        self.publish('lift-1.report', Lane.REPORT)
+        with self.assertLogs('ski_lift.core.remote.rabbitmq.pika_producer', level='INFO'):
+            self.producer.on_connection_blocked()
+        self.assertEqual(self.producer.shed_count, 1)
+        self.assertEqual(len(self.producer._pending_messages), 1)
+
+
+class PublisherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = StubManager()
+        self.producer = PikaProducer(
+            exchange='exchange',
+            exchange_type=ExchangeType.topic,
+            codecs={'*.telemetry': MsgPackCodec()},
+            compress_threshold=100,
+            connection_manager=self.manager,
+        )
+        self.channel = StubChannel()
+        self.producer._channel = self.channel
+        self.producer.setup_exchange_ok(None)
+
+    def test_handles_are_cached_per_routing_key_and_lane(self):
+        publisher = self.producer.publisher('lift-1.status', {'lift-id': 'lift-1'}, Lane.STATUS)
+        self.assertIs(self.producer.publisher('lift-1.status', lane=Lane.STATUS), publisher)
+        self.assertIsNot(self.producer.publisher('lift-1.status'), publisher)
+        self.assertIsInstance(self.producer.publisher('lift-1.telemetry').codec, MsgPackCodec)
+
+    def test_every_message_gets_its_own_id(self):
+        publisher = self.producer.publisher('lift-1.telemetry', {'lift-id': 'lift-1'}, Lane.TELEMETRY)
+        publisher.publish({'wind': 1})
+        publisher.publish({'wind': 2})
+        self.assertEqual(len(set(self.channel.message_ids)), 2)
+        self.assertEqual(
+            decode_payload(BasicProperties(content_type='application/msgpack'), self.channel.published[1]),
+            {'wind': 2},
+        )
+
+    def test_large_payloads_are_compressed(self):
+        publisher = self.producer.publisher('lift-1.report')
+        publisher.publish({'message': 'x' * 200})
+        publisher.publish({'message': 'short'})
+        self.assertEqual(self.channel.content_encodings, ['zlib', None])
+        self.assertEqual(
+            decode_payload(BasicProperties(content_encoding='zlib'), self.channel.published[0]),
+            {'message': 'x' * 200},
+        )
+
+
+class BatchingTest(unittest.TestCase):
+
+    def create_producer(self, policy: BatchPolicy, max_unconfirmed: int = 1000) -> PikaProducer:
+        self.manager = StubManager()
+        producer = PikaProducer(
+            exchange='exchange',
+            exchange_type=ExchangeType.topic,
+            max_unconfirmed=max_unconfirmed,
+            batch_policies={'lift-1.telemetry': policy},
+            connection_manager=self.manager,
+        )
+        self.channel = StubChannel()
+        producer._channel = self.channel
+        producer.setup_exchange_ok(None)
+        return producer
+
+    def send(self, producer: PikaProducer, count: int) -> None:
+        for index in range(count):
+            producer._pending_messages.append(OutgoingMessage('lift-1.telemetry', str(index).encode()))
+        producer.send_pending_messages()
+
+    def test_batch_full_before_its_timer(self):
+        producer = self.create_producer(BatchPolicy(max_messages=1))
+        self.send(producer, 3)
+        self.assertEqual(len(self.channel.published), 3)
+
+    def test_batch_flush_waits_for_the_unconfirmed_window(self):
+        producer = self.create_producer(BatchPolicy(max_messages=10), max_unconfirmed=2)
+        self.send(producer, 1)
+        for body in (b'status-1', b'status-2'):
+            producer._pending_messages.append(OutgoingMessage('lift-1.status', body))
+        producer.send_pending_messages()
+        self.assertEqual(producer.unconfirmed_count, 2)
+
+        # the batch timer fires while the window is full
+        self.manager.ioloop.run_timers(rounds=1)
+        self.assertEqual(len(self.channel.published), 2)
+
+        producer.on_delivery_confirmation(SimpleNamespace(method=Basic.Ack(delivery_tag=1, multiple=False)))
+        self.assertEqual(len(self.channel.published), 3)
+        self.assertEqual(producer.unconfirmed_count, 2)
+
+
+class ShutdownTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = LoopManager()
+        self.producer = PikaProducer(
+            exchange='exchange', exchange_type=ExchangeType.topic, connection_manager=self.manager,
+        )
+        self.closed_on: List[threading.Thread] = []
+        close = self.producer._pending_messages.close
+
+        def recording_close() -> None:
+            self.closed_on.append(threading.current_thread())
+            close()
+
+        self.producer._pending_messages.close = recording_close
+
+    def test_outbox_is_closed_on_the_io_loop(self):
+        channel = StubChannel()
+        # the broker confirms the close later on
+        channel.close = lambda: self.manager.call_threadsafe(
+            lambda: self.producer.on_channel_closed(channel, None)
+        )
+        self.producer._channel = channel
+        self.producer.start()
+        self.producer.publish_message('lift-1', b'status')
+        self.producer.stop()
+
+        self.assertEqual(self.closed_on, [self.manager.thread])
+        self.assertEqual(len(self.producer._pending_messages), 1)
+
+    def test_outbox_is_closed_without_a_channel(self):
+        self.producer.start()
+        self.producer.stop()
+        self.assertEqual(self.closed_on, [self.manager.thread])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import unittest
+from types import SimpleNamespace
+from typing import List
+
+from pika import BasicProperties
+
+from ski_lift.core.remote.emergency_stop.rabbit_mq_emergency_stopper import \
+    RabbitMQEmergencyStopHandler
+from ski_lift.core.remote.suggestion.rabbit_mq_suggestion_forwarder import \
+    RabbitMQSuggestionForwarder
+from ski_lift.core.remote.suggestion.suggestion import Suggestion
+
+# properties of the messages published by the web client
+CLIENT_PROPERTIES = BasicProperties(
+    content_type='application/octet-stream',
+    headers={'lift-id': 'lift-1'},
+)
+
+
+class StubView(object):
+
+    lift_id: str = 'lift-1'
+
+    def __init__(self):
+        self.suggestions: List[Suggestion] = []
+        self.emergency_stops: List[int] = []
+
+    def display_suggestion(self, suggestion: Suggestion, **kwargs) -> None:
+        self.suggestions.append(suggestion)
+
+    def emergency_stop(self, delay: int) -> None:
+        self.emergency_stops.append(delay)
+
+
+def deliver(callback, body: dict) -> None:
+    callback(None, SimpleNamespace(routing_key='lift-1'), CLIENT_PROPERTIES, json.dumps(body).encode())
+
+
+class ClientMessageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.view = StubView()
+
+    def test_emergency_stop(self):
+        handler = RabbitMQEmergencyStopHandler(self.view)
+        deliver(handler.emergency_stop_callback, {
+            'message': 'Strong wind', 'abortTime': 20, 'user': 'op-1', 'timestamp': '2024-01-01T12:00:00.000',
+        })
+        self.assertEqual(self.view.emergency_stops, [20])
+        self.assertEqual(self.view.suggestions[0].category.name, 'DANGER')
+
+    def test_invalid_emergency_stop_is_logged(self):
+        handler = RabbitMQEmergencyStopHandler(self.view)
+        with self.assertLogs('ski_lift.core.remote.emergency_stop', level='ERROR'):
+            handler.emergency_stop_callback(None, None, CLIENT_PROPERTIES, b'not json')
+        self.assertEqual(self.view.emergency_stops, [])
+
+    def test_suggestion(self):
+        forwarder = RabbitMQSuggestionForwarder(self.view)
+        deliver(forwarder.suggestion_callback, {
+            'messageKind': 'suggestion', 'severity': 'INFO', 'message': 'Slow down',
+            'user': 'op-1', 'timestamp': '2024-01-01T12:00:00.000',
+        })
+        self.assertEqual(len(self.view.suggestions), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from typing import Any, List
+
+from ski_lift.core.command.result.object import CommandResult
+from ski_lift.core.command.result.serializer import (
+    PrettyResultStringSerializer, PythonDictResultSerializer)
+from ski_lift.core.command.result.serializer.cache import (
+    SERIALIZATION_CACHE, SerializationCache)
+from ski_lift.core.monitor.logger.base import BaseCommandLogger
+from ski_lift.core.monitor.result.delivery import (SYNCHRONOUS_DELIVERY,
+                                                   DeliveryPolicy)
+from ski_lift.core.monitor.result.result_monitor import \
+    CommandResultMonitorSource
+from tests.test_serializer_codegen import results
+
+
+class CountingSerializer(PythonDictResultSerializer):
+
+    count: int = 0
+
+    def serialize(self, result: CommandResult) -> dict:
+        CountingSerializer.count += 1
+        return super().serialize(result)
+
+
+class RecordingLogger(BaseCommandLogger):
+
+    def __init__(self, result_serializer) -> None:
+        super().__init__(result_serializer)
+        self.serialized: List[Any] = []
+
+    def process_result_universally(self, result: CommandResult) -> None:
+        self.serialized.append(self.serialize_result(result))
+
+
+class SerializationCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        CountingSerializer.count = 0
+        self.cache = SerializationCache()
+        self.result = results()[0]
+
+    def test_equal_formats_are_serialized_once(self):
+        self.cache.acquire(self.result)
+        first = self.cache.serialize(CountingSerializer(), self.result)
+        self.assertIs(self.cache.serialize(CountingSerializer(), self.result), first)
+        self.cache.serialize(CountingSerializer(convert_to_camel=True), self.result)
+        self.assertEqual(CountingSerializer.count, 2)
+
+    def test_results_are_cached_until_the_last_release(self):
+        self.cache.acquire(self.result, references=2)
+        self.cache.serialize(CountingSerializer(), self.result)
+        self.cache.release(self.result)
+        self.cache.serialize(CountingSerializer(), self.result)
+        self.assertEqual(CountingSerializer.count, 1)
+
+        self.cache.release(self.result)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_results_not_acquired_are_not_cached(self):
+        for _ in range(2):
+            self.cache.serialize(CountingSerializer(), self.result)
+        self.assertEqual(CountingSerializer.count, 2)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_serializers_without_format_key_are_not_cached(self):
+        class PlainSerializer(CountingSerializer):
+            format_key = None
+
+        self.cache.acquire(self.result)
+        for _ in range(2):
+            self.cache.serialize(PlainSerializer(), self.result)
+        self.assertEqual(CountingSerializer.count, 2)
+
+
+class SharedSerializationTest(unittest.TestCase):
+
+    def setUp(self):
+        CountingSerializer.count = 0
+
+    def forward(self, policy: DeliveryPolicy) -> List[RecordingLogger]:
+        source = CommandResultMonitorSource(result_delivery=policy)
+        loggers = [RecordingLogger(CountingSerializer()) for _ in range(3)]
+        pretty_logger = RecordingLogger(PrettyResultStringSerializer())
+        for logger in loggers + [pretty_logger]:
+            source.register_result_monitor(logger)
+        for result in results()[:5]:
+            source.forward_command_result(result)
+        source.close_result_monitors()
+        self.assertEqual(len(pretty_logger.serialized), 5)
+        return loggers
+
+    def test_loggers_sharing_a_format_serialize_once(self):
+        for policy in (SYNCHRONOUS_DELIVERY, DeliveryPolicy()):
+            with self.subTest(max_pending=policy.max_pending):
+                CountingSerializer.count = 0
+                loggers = self.forward(policy)
+                self.assertEqual(CountingSerializer.count, 5)
+                self.assertEqual(loggers[0].serialized, loggers[2].serialized)
+                self.assertEqual(len(SERIALIZATION_CACHE), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
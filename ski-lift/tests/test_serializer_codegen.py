@@ -0,0 +1,146 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, List
+
+from camel_converter import dict_to_camel
+
+from ski_lift.core.auth import BaseAuthenticator
+from ski_lift.core.command.descriptor.factory import CommandDescriptorFactory
+from ski_lift.core.command.descriptor.object import (
+    ChangeStateCommandDescriptor, CommandDescriptor,
+    MessageReportCommandDescriptor)
+from ski_lift.core.command.descriptor.processor import DESCRIPTOR_DISPATCH
+from ski_lift.core.command.descriptor.serializer import (
+    BaseDescriptorSerializer, JSONBytesDescriptorSerializer,
+    PrettyDescriptorSerializerConfig, PrettyStringDescriptorSerializer,
+    PythonDictDescriptorSerializer)
+from ski_lift.core.command.descriptor_result_factory import \
+    DESCRIPTOR_RESULT_FACTORY
+from ski_lift.core.command.result.object import CommandResult
+from ski_lift.core.command.result.processor import RESULT_DISPATCH
+from ski_lift.core.command.result.serializer import (
+    BaseResultSerializer, JSONBytesResultSerializer,
+    PrettyResultSerializerConfig, PrettyResultStringSerializer,
+    PythonDictResultSerializer)
+
+TIMES: List[datetime] = [
+    datetime(2024, 1, 1, 12, 0, 0),
+    datetime(2024, 1, 1, 12, 0, 0, 123456, tzinfo=timezone(timedelta(hours=2))),
+]
+USERS: List[str] = ['card', 'ü"\\{x}$id\n']
+
+
+def descriptors() -> List[CommandDescriptor]:
+    factory = CommandDescriptorFactory
+    commands: List[CommandDescriptor] = []
+    for time in TIMES:
+        for user in USERS:
+            commands += [
+                factory.create_insert_card(card_to_insert=user, time=time),
+                factory.create_remove_card(user_card=user, time=time),
+                factory.create_change_state(
+                    user_card=user, time=time, new_state=ChangeStateCommandDescriptor.Option.STOP,
+                ),
+                factory.create_display_status(user_card=user, time=time),
+                factory.create_abort_command(user_card=user, time=time, command_to_abort=3),
+                factory.create_emergency_stop(user_card=user, time=time, delay=2),
+                factory.create_message_report(
+                    user_card=user, time=time, message=user,
+                    severity=list(MessageReportCommandDescriptor.Severity)[-1],
+                ),
+            ]
+    return commands
+
+
+def results() -> List[CommandResult]:
+    outcomes = [
+        (CommandResult.OutCome.SUCCESSFUL, None),
+        (CommandResult.OutCome.FAILED, BaseAuthenticator.NotAuthenticatedError('not authenticated')),
+    ]
+    return [
+        DESCRIPTOR_RESULT_FACTORY.build(command, outcome, exception)
+        for command in descriptors()
+        for outcome, exception in outcomes
+    ]
+
+
+def visited(base: type, serializer: Any, camel: bool = False) -> Callable[[Any], Any]:
+    """Serialization through the process functions only."""
+    def serialize(obj: Any) -> Any:
+        serialized = base.serialize(serializer, obj)
+        return dict_to_camel(serialized) if camel else serialized
+    return serialize
+
+
+def visited_json(base: type, serializer: Any, camel: bool) -> Callable[[Any], bytes]:
+    return lambda obj: json.dumps(visited(base, serializer, camel)(obj)).encode('utf-8')
+
+
+class GeneratedSerializerTest(unittest.TestCase):
+    """The generated serializers give the output of the process functions."""
+
+    def assertSameOutput(self, serializer: Any, obj: Any, expected: Callable[[Any], Any]):
+        with self.subTest(serializer=type(serializer).__name__, obj=type(obj).__name__):
+            # the second call uses the cached generated function
+            for _ in range(2):
+                serialized = serializer.serialize(obj)
+                self.assertEqual(serialized, expected(obj))
+                self.assertIs(type(serialized), type(expected(obj)))
+
+    def test_samples_cover_every_class(self):
+        self.assertEqual({type(command) for command in descriptors()}, set(DESCRIPTOR_DISPATCH.handler_names))
+        self.assertEqual({type(result) for result in results()}, set(RESULT_DISPATCH.handler_names))
+
+    def test_descriptor_serializers(self):
+        pretty_configs = [
+            None,
+            PrettyDescriptorSerializerConfig(
+                template='{$type} $$id ${id} $time $delay $user',
+                arg_template='<$arg_name=${arg_value}>',
+                time_format='%c',
+            ),
+        ]
+        for command in descriptors():
+            serializer = PythonDictDescriptorSerializer()
+            self.assertSameOutput(serializer, command, visited(BaseDescriptorSerializer, serializer))
+            for camel in (False, True):
+                serializer = JSONBytesDescriptorSerializer(camel)
+                self.assertSameOutput(serializer, command, visited_json(BaseDescriptorSerializer, serializer, camel))
+            for config in pretty_configs:
+                serializer = PrettyStringDescriptorSerializer(config)
+                self.assertSameOutput(serializer, command, visited(BaseDescriptorSerializer, serializer))
+
+    def test_result_serializers(self):
+        pretty_configs = [
+            None,
+            PrettyResultSerializerConfig(
+                template='$$ {x} ${id}|$time|$user|$outcome|$exception',
+                arg_template='',
+                time_format='%H:%M:%S.%f {}',
+            ),
+        ]
+        for result in results():
+            for camel in (False, True):
+                serializer = PythonDictResultSerializer(camel)
+                self.assertSameOutput(serializer, result, visited(BaseResultSerializer, serializer, camel))
+                serializer = JSONBytesResultSerializer(camel)
+                self.assertSameOutput(serializer, result, visited_json(BaseResultSerializer, serializer, camel))
+            for config in pretty_configs:
+                serializer = PrettyResultStringSerializer(config)
+                self.assertSameOutput(serializer, result, visited(BaseResultSerializer, serializer))
+
+    def test_overridden_process_function_is_used(self):
+        class ExtendedSerializer(PythonDictResultSerializer):
+
+            def process_change_state_result(self, result):
+                result_dict: dict = super().process_change_state_result(result)
+                result_dict['extra'] = 1
+                return result_dict
+
+        result = next(r for r in results() if isinstance(r.command, ChangeStateCommandDescriptor))
+        self.assertEqual(ExtendedSerializer().serialize(result)['extra'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()